@@ -0,0 +1,266 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the source code for the KubaBatch class, which plays N games of Kuba in
+#               lockstep with NumPy. The boards are held as an (N, 7, 7) int8 array and every step applies
+#               one move to each board as array operations: push shifting, edge captures, capture counting,
+#               the reverse move ban, and the win checks of KubaGame.game_over_check(). Moves use the same
+#               cell numbers (row * 7 + col) and direction codes (L, R, F, B = 0, 1, 2, 3) as KubaBitboard.
+
+# %%
+import numpy as np
+
+from KubaBitboard import NEUTRAL_POSITIONS, PLAYER_1_POSITIONS, PLAYER_2_POSITIONS
+
+# cell values. OFF is only stored in the extra column after the 49 cells of each board, so that lookups of
+# cells past the edge of the board read OFF
+EMPTY = 0
+PLAYER_1 = 1
+PLAYER_2 = 2
+RED = 3
+OFF = 4
+OFF_CELL = 49
+
+
+def _build_tables():
+    """builds the index tables used to read lines of cells from the flattened boards. every table has an extra
+    row for OFF_CELL so that a rejected move can still be looked up. rays are 8 cells long so that even a ray
+    across the whole board ends in OFF_CELL"""
+    steps = ((0, -1), (0, 1), (-1, 0), (1, 0))
+    rays = np.full((50, 4, 8), OFF_CELL, dtype=np.intp)
+    behind = np.full((50, 4), OFF_CELL, dtype=np.intp)
+    for direction, (row_step, col_step) in enumerate(steps):
+        for row in range(7):
+            for col in range(7):
+                cell = row * 7 + col
+                for distance in range(7):
+                    ray_row = row + row_step * distance
+                    ray_col = col + col_step * distance
+                    if 0 <= ray_row <= 6 and 0 <= ray_col <= 6:
+                        rays[cell, direction, distance] = ray_row * 7 + ray_col
+                behind_row = row - row_step
+                behind_col = col - col_step
+                if 0 <= behind_row <= 6 and 0 <= behind_col <= 6:
+                    behind[cell, direction] = behind_row * 7 + behind_col
+    return rays, behind
+
+
+RAYS, BEHIND = _build_tables()
+
+
+class KubaBatch:
+    """represents N games of Kuba played in lockstep. player 1 of every game plays the first color passed and
+    player 2 the second. players are identified by index (0 or 1), and a winner or turn of -1 means none"""
+
+    def __init__(self, count: int, colors: tuple = ("W", "B")) -> None:
+        """initializes count new games in the Kuba starting position"""
+        self._count = count
+        self._colors = colors
+        self._cells = np.full((count, 50), OFF, dtype=np.int8)
+        self._cells[:, :49] = EMPTY
+        for positions, value in ((PLAYER_1_POSITIONS, PLAYER_1), (PLAYER_2_POSITIONS, PLAYER_2),
+                                 (NEUTRAL_POSITIONS, RED)):
+            for row, col in positions:
+                self._cells[:, row * 7 + col] = value
+        self._captured_neutral = np.zeros((count, 2), dtype=np.int8)
+        self._captured_opponent = np.zeros((count, 2), dtype=np.int8)
+        self._turn = np.full(count, -1, dtype=np.int8)
+        self._winner = np.full(count, -1, dtype=np.int8)
+        self._reverse_move = np.full(count, -1, dtype=np.int16)    # cell * 4 + direction, or -1
+        self._rows = np.arange(count)
+
+    def get_count(self) -> int:
+        """returns the number of games in the batch"""
+        return self._count
+
+    def get_boards(self) -> np.ndarray:
+        """returns the boards as an (N, 7, 7) view of cell values (EMPTY, PLAYER_1, PLAYER_2, or RED)"""
+        return self._cells[:, :49].reshape(self._count, 7, 7)
+
+    def get_turns(self) -> np.ndarray:
+        """returns the index of the player to move in every game, or -1 before the first move and after a win"""
+        return self._turn
+
+    def get_winners(self) -> np.ndarray:
+        """returns the index of the winner of every game, or -1 if the game is not over"""
+        return self._winner
+
+    def get_captured(self) -> np.ndarray:
+        """returns the number of red marbles captured by each player as an (N, 2) array"""
+        return self._captured_neutral
+
+    def get_captured_opponent(self) -> np.ndarray:
+        """returns the number of opponent marbles captured by each player as an (N, 2) array"""
+        return self._captured_opponent
+
+    def get_reverse_moves(self) -> np.ndarray:
+        """returns the banned reverse move of every game as cell * 4 + direction, or -1"""
+        return self._reverse_move
+
+    def get_marble_counts(self) -> np.ndarray:
+        """returns the number of white, black, and red marbles left on every board as an (N, 3) array"""
+        board = self._cells[:, :49]
+        counts = np.zeros((self._count, 3), dtype=np.int16)
+        for value, color in ((PLAYER_1, self._colors[0]), (PLAYER_2, self._colors[1])):
+            if color == "W":
+                counts[:, 0] += (board == value).sum(axis=1)
+            if color == "B":
+                counts[:, 1] += (board == value).sum(axis=1)
+        counts[:, 2] = (board == RED).sum(axis=1)
+        return counts
+
+    def legal_mask(self, players: np.ndarray, games: np.ndarray = None) -> np.ndarray:
+        """returns a (len(games), 49, 4) boolean array that is True for every (cell, direction) the player of each
+        game can push, using the same rules as make_move(). games is an array of game indexes, all games if None,
+        and players holds the player index for each of them"""
+        if games is None:
+            games = self._rows
+        movable = self.push_mask(players, games)
+
+        # finished games or players out of turn have no moves
+        turns = self._turn[games]
+        playing = (self._winner[games] < 0) & ((turns < 0) | (turns == np.asarray(players)))
+        return movable & playing[:, None, None]
+
+    def push_mask(self, players: np.ndarray, games: np.ndarray) -> np.ndarray:
+        """same as legal_mask() for the games passed, but whose turn it is and whether the game is over are not
+        checked, as KubaBitboard.legal_pushes() does"""
+        players = np.asarray(players)
+        count = len(games)
+        own = (players + 1).astype(np.int8)
+        board = self._cells[games]
+        cells = board[:, :49]
+        movable = ((cells == own[:, None]) | (cells == RED))[:, :, None]
+
+        # the cell behind the marble must be empty or off the board
+        behind = board[:, BEHIND[:49]]
+        movable = movable & ((behind == EMPTY) | (behind == OFF))
+
+        # pushing off your own marble is illegal. that happens when every cell from the marble to the edge is
+        # full and the marble on the edge is the player's
+        grid = cells.reshape(count, 7, 7)
+        occupied = grid != EMPTY
+        own_grid = grid == own[:, None, None]
+        full = np.logical_and.accumulate
+        self_capture = np.stack((
+            full(occupied, axis=2) & own_grid[:, :, :1],
+            full(occupied[:, :, ::-1], axis=2)[:, :, ::-1] & own_grid[:, :, 6:],
+            full(occupied, axis=1) & own_grid[:, :1, :],
+            full(occupied[:, ::-1, :], axis=1)[:, ::-1, :] & own_grid[:, 6:, :]), axis=3)
+        movable &= ~self_capture.reshape(count, 49, 4)
+
+        # the reverse of the last push is banned
+        movable = movable.reshape(count, 196)
+        reverse_moves = self._reverse_move[games]
+        banned = np.nonzero(reverse_moves >= 0)[0]
+        movable[banned, reverse_moves[banned]] = False
+        return movable.reshape(count, 49, 4)
+
+    def step(self, players: np.ndarray, cells: np.ndarray, directions: np.ndarray,
+             games: np.ndarray = None) -> np.ndarray:
+        """applies one move to each game: the player index, cell, and direction code at each position of the
+        arrays passed. games is an array of game indexes the moves are for, all games if None. illegal moves leave
+        their board unchanged. returns a boolean array that is True for every game in which the move was made"""
+        if games is None:
+            games = self._rows
+        players = np.asarray(players).astype(np.int8)
+        cells = np.asarray(cells)
+        directions = np.asarray(directions)
+        rows = np.arange(len(games))
+        board = self._cells
+        own = players + 1
+
+        # look up the moves, sending out of range cells and directions to the OFF_CELL row of the tables
+        in_range = (cells >= 0) & (cells < 49) & (directions >= 0) & (directions < 4)
+        safe_cells = np.where(in_range, cells, OFF_CELL)
+        safe_directions = np.where(in_range, directions, 0)
+        lines = board[games[:, None], RAYS[safe_cells, safe_directions]]
+        behind = board[games, BEHIND[safe_cells, safe_directions]]
+        ends = ((lines == EMPTY) | (lines == OFF)).argmax(axis=1)
+        falls = lines[rows, ends] == OFF
+        last_values = lines[rows, np.maximum(ends - 1, 0)]
+
+        # validate every move with the checks of KubaGame.validate_move() and the self-capture check
+        turns = self._turn[games]
+        valid = in_range & (self._winner[games] < 0) & ((turns < 0) | (turns == players))
+        valid &= (lines[:, 0] == own) | (lines[:, 0] == RED)
+        valid &= (behind == EMPTY) | (behind == OFF)
+        valid &= self._reverse_move[games] != safe_cells * 4 + safe_directions
+        valid &= ~(falls & (last_values == own))
+        if not valid.any():
+            return valid
+        moved = games[valid]
+
+        # shift every marble up to the end of the line one cell over
+        lines = lines[valid]
+        ends = ends[valid]
+        shifted = np.empty_like(lines)
+        shifted[:, 0] = EMPTY
+        shifted[:, 1:] = lines[:, :-1]
+        pushed = np.arange(8)[None, :] <= ends[:, None]
+        directions = safe_directions[valid]
+        ray_cells = RAYS[safe_cells[valid], directions]
+        board[moved[:, None], ray_cells] = np.where(pushed, shifted, lines)
+        board[moved, OFF_CELL] = OFF
+
+        # count captured marbles, and set the reverse move when nothing was captured
+        movers = players[valid]
+        falls = falls[valid]
+        last_values = last_values[valid]
+        neutral = falls & (last_values == RED)
+        opponent = falls & (last_values != RED)
+        self._captured_neutral[moved[neutral], movers[neutral]] += 1
+        self._captured_opponent[moved[opponent], movers[opponent]] += 1
+        kept = ~falls
+        self._reverse_move[moved[kept]] = ray_cells[kept, ends[kept]] * 4 + (directions[kept] ^ 1)
+
+        # check for a win in the same order as KubaGame.game_over_check()
+        neutral_counts = self._captured_neutral[moved]
+        opponent_counts = self._captured_opponent[moved]
+        has_moves = self.players_with_moves(moved)
+        winner = np.full(len(moved), -1, dtype=np.int8)
+        winner[~has_moves[:, 1]] = 0
+        winner[~has_moves[:, 0]] = 1
+        winner[(opponent_counts[:, 1] == 8) | (neutral_counts[:, 1] == 7)] = 1
+        winner[(opponent_counts[:, 0] == 8) | (neutral_counts[:, 0] == 7)] = 0
+        self._winner[moved] = winner
+        self._turn[moved] = np.where(winner >= 0, -1, 1 - movers)
+        return valid
+
+    def players_with_moves(self, games: np.ndarray) -> np.ndarray:
+        """returns an (len(games), 2) boolean array that is True when a player of the game has a push that
+        push_mask() allows, the moves KubaGame.game_over_check() looks for"""
+        count = len(games)
+        return np.stack((self.push_mask(np.zeros(count, dtype=np.int8), games).any(axis=(1, 2)),
+                         self.push_mask(np.ones(count, dtype=np.int8), games).any(axis=(1, 2))), axis=1)
+
+    def random_step(self, generator: np.random.Generator) -> tuple:
+        """plays a uniformly random legal move in every unfinished game. the first player of a game that has not
+        started is picked at random. returns the arrays (players, cells, directions, made) of the moves for every
+        game, where made is False for games that were over or had no legal move"""
+        games = np.nonzero(self._winner < 0)[0]
+        players = np.full(self._count, -1, dtype=np.int8)
+        cells = np.full(self._count, -1, dtype=np.intp)
+        directions = np.full(self._count, -1, dtype=np.intp)
+        made = np.zeros(self._count, dtype=bool)
+        if len(games) == 0:
+            return players, cells, directions, made
+
+        # pick the move with the highest random key among the legal moves of each game
+        turns = self._turn[games]
+        players[games] = np.where(turns >= 0, turns, generator.integers(0, 2, len(games)))
+        legal = self.legal_mask(players[games], games).reshape(len(games), 196)
+        keys = generator.random(legal.shape, dtype=np.float32)
+        choices = np.where(legal, keys, -1.0).argmax(axis=1)
+        cells[games] = np.where(legal.any(axis=1), choices // 4, -1)
+        directions[games] = choices % 4
+        made[games] = self.step(players[games], cells[games], directions[games], games)
+        return players, cells, directions, made
+
+    def play_random(self, generator: np.random.Generator, max_moves: int = 1000) -> int:
+        """plays random legal moves in every game until every game is over, no game can move, or max_moves steps
+        have been played. returns the number of steps played"""
+        for steps in range(max_moves):
+            made = self.random_step(generator)[3]
+            if not made.any():
+                return steps
+        return max_moves
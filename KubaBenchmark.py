@@ -0,0 +1,258 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains a benchmark suite for the KubaGame engine and a command line to run it,
+#               compare the results with stored baselines, and record them. Each benchmark times one kind of
+#               call on prepared games and reports the best time per call over several rounds, so setting up
+#               a position is never timed. Results are kept in a JSON file with the baseline time of each
+#               benchmark and a history of every saved run and the commit it was run on. A run that is slower
+#               than its baseline by more than the threshold is reported as a regression and the command exits
+#               with status 1, so it can gate a commit. KubaBenchmark.json is kept in the repository, so the
+#               baselines and the history of saved runs are tracked with the code they timed; commit the file
+#               with the change that saved it. Baselines are timings of one machine, so on another machine
+#               record baselines in a file of its own with --file. A run of a benchmark without a baseline
+#               also exits with status 1 and asks for one to be recorded first:
+#
+#                   python KubaBenchmark.py --save          # record the baselines on this machine
+#                   python KubaBenchmark.py                 # compare with the baselines
+#                   python KubaBenchmark.py --file local.json --save
+
+# %%
+import argparse
+import json
+import os
+import subprocess
+import time
+
+import KubaCodec
+from KubaGame import KubaGame
+from KubaNotation import random_game
+
+PLAYERS = (("A", "W"), ("B", "B"))
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "KubaBenchmark.json")
+THRESHOLD = 0.15            # a benchmark more than 15% slower than its baseline is a regression
+
+
+def make_position(edits: dict, captured_red: int = 0) -> bytes:
+    """returns the start position packed by to_bytes(), with the cells in edits, a dictionary of (row, col) to
+    KubaCodec cell value, changed and player A to move. player A has captured captured_red of the red marbles
+    taken off the board and player B the rest"""
+    cells = list(KubaCodec.unpack_position(KubaGame(*PLAYERS).to_bytes())[0])
+    for (row, col), value in edits.items():
+        cells[row * 7 + col] = value
+    return KubaCodec.pack_position(cells, 0, None, captured_red, None)
+
+
+# a position where player A can push the single marble at (6, 5) right into the empty corner
+SINGLE_PUSH = make_position({(6, 6): KubaCodec.EMPTY})
+
+# a position where row 3 is full, so player A pushing (3, 0) right moves seven marbles and captures one of B's
+FULL_ROW_PUSH = make_position({(1, 1): KubaCodec.EMPTY, (1, 5): KubaCodec.EMPTY,
+                               (3, 0): KubaCodec.PLAYER_1, (3, 6): KubaCodec.PLAYER_2})
+
+# a position with two marbles of each player and one red marble left
+SPARSE = make_position(dict([((row, col), KubaCodec.EMPTY) for row in range(7) for col in range(7)]
+                            + [((0, 0), KubaCodec.PLAYER_1), ((6, 6), KubaCodec.PLAYER_1),
+                               ((0, 6), KubaCodec.PLAYER_2), ((6, 0), KubaCodec.PLAYER_2),
+                               ((3, 3), KubaCodec.RED)]), 6)
+
+# illegal moves after player A's first move: a move out of turn, a push from an empty cell, and a push of a
+# marble blocked from behind
+REJECTED_MOVES = (("A", (6, 5), "F"), ("B", (3, 0), "R"), ("B", (1, 5), "L"))
+
+
+def make_games(rounds: int, position: bytes = None) -> list:
+    """returns rounds new games set up at the packed position passed, or at the start position"""
+    games = []
+    for _ in range(rounds):
+        game = KubaGame(*PLAYERS)
+        if position != None:
+            game.from_bytes(position)
+        games.append(game)
+    return games
+
+
+def bench_construction(rounds: int) -> float:
+    """times creating a new KubaGame"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        KubaGame(*PLAYERS)
+    return (time.perf_counter() - start) / rounds
+
+
+def bench_single_push(rounds: int) -> float:
+    """times make_move() pushing one marble"""
+    games = make_games(rounds, SINGLE_PUSH)
+    start = time.perf_counter()
+    for game in games:
+        game.make_move("A", (6, 5), "R")
+    return (time.perf_counter() - start) / rounds
+
+
+def bench_full_row_push(rounds: int) -> float:
+    """times make_move() pushing a full row of seven marbles and capturing one"""
+    games = make_games(rounds, FULL_ROW_PUSH)
+    start = time.perf_counter()
+    for game in games:
+        game.make_move("A", (3, 0), "R")
+    return (time.perf_counter() - start) / rounds
+
+
+def bench_rejected_moves(rounds: int) -> float:
+    """times validate_move() rejecting moves for several reasons"""
+    game = KubaGame(*PLAYERS)
+    game.make_move("A", (6, 6), "F")
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for player_name, coordinates, direction in REJECTED_MOVES:
+            game.validate_move(player_name, coordinates, direction)
+    return (time.perf_counter() - start) / (rounds * len(REJECTED_MOVES))
+
+
+def bench_game_over_crowded(rounds: int) -> float:
+    """times game_over_check() on the start position"""
+    game = KubaGame(*PLAYERS)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        game.game_over_check()
+    return (time.perf_counter() - start) / rounds
+
+
+def bench_game_over_sparse(rounds: int) -> float:
+    """times game_over_check() on a position with five marbles left"""
+    game = make_games(1, SPARSE)[0]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        game.game_over_check()
+    return (time.perf_counter() - start) / rounds
+
+
+def bench_marble_count(rounds: int) -> float:
+    """times get_marble_count()"""
+    game = KubaGame(*PLAYERS)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        game.get_marble_count()
+    return (time.perf_counter() - start) / rounds
+
+
+# the moves of the random games, made once on first use
+RANDOM_GAMES = []
+
+
+def bench_random_games(rounds: int) -> float:
+    """times playing a whole game of random legal moves with make_move(), from creating the game to its last
+    move"""
+    if len(RANDOM_GAMES) == 0:
+        RANDOM_GAMES.extend(random_game(f"benchmark:{number}") for number in range(20))
+    count = max(1, rounds // 1000)
+    start = time.perf_counter()
+    for number in range(count):
+        game = KubaGame(*PLAYERS)
+        for player_name, coordinates, direction in RANDOM_GAMES[number % len(RANDOM_GAMES)]:
+            game.make_move(player_name, coordinates, direction)
+    return (time.perf_counter() - start) / count
+
+
+# each benchmark with the number of calls timed per round
+BENCHMARKS = {
+    "construction": (bench_construction, 2000),
+    "make_move_single": (bench_single_push, 2000),
+    "make_move_full_row": (bench_full_row_push, 2000),
+    "validate_move_rejected": (bench_rejected_moves, 20000),
+    "game_over_check_crowded": (bench_game_over_crowded, 50000),
+    "game_over_check_sparse": (bench_game_over_sparse, 50000),
+    "get_marble_count": (bench_marble_count, 100000),
+    "random_game": (bench_random_games, 20000),
+}
+
+
+def run_benchmarks(names=None, repeat: int = 5, scale: float = 1.0) -> dict:
+    """runs the benchmarks named, or every benchmark, and returns a dictionary of name to the best time per
+    call in seconds over repeat rounds. scale multiplies the number of calls timed per round"""
+    results = {}
+    for name, (benchmark, rounds) in BENCHMARKS.items():
+        if names != None and name not in names:
+            continue
+        results[name] = min(benchmark(max(1, int(rounds * scale))) for _ in range(repeat))
+    return results
+
+
+def compare(results: dict, baselines: dict, threshold: float = THRESHOLD) -> list:
+    """returns the benchmarks slower than their baselines by more than threshold (0.15 for 15%) as a list of
+    (name, baseline seconds, seconds) tuples. benchmarks without a baseline are skipped"""
+    regressions = []
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        if baseline != None and seconds > baseline * (1 + threshold):
+            regressions.append((name, baseline, seconds))
+    return regressions
+
+
+def load_results(path: str) -> dict:
+    """returns the stored results in the file at path, or empty results if there is no such file"""
+    if not os.path.exists(path):
+        return {"baselines": {}, "history": []}
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+def save_results(path: str, stored: dict, results: dict, commit: str = None):
+    """makes results the baselines of the benchmarks they hold and adds them to the history, then writes the
+    stored results to the file at path"""
+    stored["baselines"].update(results)
+    stored["history"].append({"commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results})
+    with open(path, "w") as results_file:
+        json.dump(stored, results_file, indent=1)
+    return
+
+
+def current_commit() -> str:
+    """returns the short hash of the checked out git commit, or None outside a git checkout"""
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return output.stdout.strip() if output.returncode == 0 else None
+
+
+def main():
+    """parses the command line, runs the benchmarks and prints each result against its baseline. exits with
+    status 1 if any benchmark regressed or, unless the run is saved, has no baseline"""
+    parser = argparse.ArgumentParser(description="benchmark the KubaGame engine against stored baselines")
+    parser.add_argument("benchmarks", nargs="*", help=f"benchmarks to run, from {', '.join(BENCHMARKS)}")
+    parser.add_argument("--file", default=BASELINE_FILE, help="JSON file of baselines and history")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="slowdown reported as a regression")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per benchmark, the best is kept")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the calls timed per round")
+    parser.add_argument("--save", action="store_true", help="record the run as the new baselines")
+    args = parser.parse_args()
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}")
+
+    stored = load_results(args.file)
+    results = run_benchmarks(args.benchmarks or None, args.repeat, args.scale)
+    baselines = stored["baselines"]
+    for name, seconds in results.items():
+        line = f"{name:26} {seconds * 1e6:10.3f} us"
+        if name in baselines:
+            line += f"   baseline {baselines[name] * 1e6:10.3f} us   {(seconds / baselines[name] - 1) * 100:+6.1f}%"
+        print(line)
+    regressions = compare(results, baselines, args.threshold)
+    for name, baseline, seconds in regressions:
+        print(f"regression: {name} is {(seconds / baseline - 1) * 100:.1f}% slower than its baseline")
+    if args.save:
+        save_results(args.file, stored, results, current_commit())
+        raise SystemExit(1 if len(regressions) > 0 else 0)
+
+    # a benchmark without a baseline has not been checked, so it must not pass as if it had
+    missing = [name for name in results if name not in baselines]
+    if len(missing) > 0:
+        print(f"no baseline for {', '.join(missing)} in {args.file}; record the baselines on this machine "
+              f"with: python KubaBenchmark.py --save")
+    raise SystemExit(1 if len(regressions) > 0 or len(missing) > 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,568 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the source code for the KubaBitboard class, a compact board engine for
+#               a game of Kuba. Instead of a 7x7 list of Marble objects, the board is stored as one integer
+#               bitmask per marble color over the 49 cells, and pushes, captures, and adjacency checks are
+#               done with shifts and masks. The public methods behave the same as the KubaGame methods of
+#               the same name.
+
+# %%
+import KubaCodec
+import KubaRender
+from KubaGame import MoveStatus, ZOBRIST_MARBLES, ZOBRIST_TURN, ZOBRIST_CAPTURED_NEUTRAL, ZOBRIST_CAPTURED_OPPONENT
+
+# a cell (row, col) is bit row * 7 + col of a mask, so (0, 0) is bit 0 and (6, 6) is bit 48
+BOARD_MASK = (1 << 49) - 1
+
+# direction codes. opposite directions differ only in the lowest bit, and the odd codes (R and B) move
+# marbles toward higher cell numbers
+LEFT = 0
+RIGHT = 1
+FORWARD = 2
+BACKWARD = 3
+DIRECTION_CODES = {"l": LEFT, "r": RIGHT, "f": FORWARD, "b": BACKWARD}
+DIRECTION_NAMES = ("L", "R", "F", "B")
+SHIFTS = (-1, 1, -7, 7)
+
+# starting positions, identical to KubaGame.make_board()
+PLAYER_1_POSITIONS = ((0, 0), (0, 1), (1, 0), (1, 1), (5, 5), (5, 6), (6, 5), (6, 6))
+PLAYER_2_POSITIONS = ((0, 5), (0, 6), (1, 5), (1, 6), (5, 0), (5, 1), (6, 0), (6, 1))
+NEUTRAL_POSITIONS = ((1, 3), (2, 2), (2, 3), (2, 4), (3, 1), (3, 2), (3, 3),
+                     (3, 4), (3, 5), (4, 2), (4, 3), (4, 4), (5, 3))
+
+
+def positions_to_mask(positions) -> int:
+    """returns the bitmask with a bit set for every (row, col) coordinate passed"""
+    mask = 0
+    for row, col in positions:
+        mask |= 1 << (row * 7 + col)
+    return mask
+
+
+def mask_to_cells(mask: int) -> list:
+    """returns the cell (row * 7 + col) of every bit set in the mask, in cell order"""
+    cells = []
+    while mask:
+        low_bit = mask & -mask
+        cells.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return cells
+
+
+def mask_to_positions(mask: int) -> list:
+    """returns the (row, col) coordinates of every bit set in the mask, in cell order"""
+    return [(cell // 7, cell % 7) for cell in mask_to_cells(mask)]
+
+
+def count_bits(mask: int) -> int:
+    """returns the number of marbles in the mask"""
+    return bin(mask).count("1")
+
+
+def mask_hash(keys: tuple, mask: int) -> int:
+    """returns the XOR of the Zobrist keys of every cell set in the mask"""
+    position_hash = 0
+    while mask:
+        low_bit = mask & -mask
+        position_hash ^= keys[low_bit.bit_length() - 1]
+        mask ^= low_bit
+    return position_hash
+
+
+def _build_tables():
+    """builds the lookup tables used to push marbles. returns the rays (every cell from a cell to the edge in a
+    direction), the cell behind each cell for each direction, and the edge cells a marble falls off from"""
+    steps = ((0, -1), (0, 1), (-1, 0), (1, 0))
+    rays = [[0] * 49 for direction in range(4)]
+    behind = [[0] * 49 for direction in range(4)]
+    edges = [0] * 4
+    for direction, (row_step, col_step) in enumerate(steps):
+        for row in range(7):
+            for col in range(7):
+                cell = row * 7 + col
+
+                # every cell from this cell to the edge, inclusive
+                ray_row = row
+                ray_col = col
+                while 0 <= ray_row <= 6 and 0 <= ray_col <= 6:
+                    rays[direction][cell] |= 1 << (ray_row * 7 + ray_col)
+                    ray_row += row_step
+                    ray_col += col_step
+
+                # the cell that must be empty (or off the board) to push in this direction
+                behind_row = row - row_step
+                behind_col = col - col_step
+                if 0 <= behind_row <= 6 and 0 <= behind_col <= 6:
+                    behind[direction][cell] = 1 << (behind_row * 7 + behind_col)
+
+                # a marble in this cell is pushed off the board when moved in this direction
+                if not (0 <= row + row_step <= 6 and 0 <= col + col_step <= 6):
+                    edges[direction] |= 1 << cell
+    return rays, behind, edges
+
+
+RAYS, BEHIND, EDGES = _build_tables()
+EDGE_CELLS = EDGES[LEFT] | EDGES[RIGHT] | EDGES[FORWARD] | EDGES[BACKWARD]
+
+
+class KubaBitboard:
+    """represents a game of Kuba stored as three bitmasks: player 1's marbles, player 2's marbles, and the
+    neutral red marbles. takes the same parameters as KubaGame and supports the same make_move, get_marble,
+    get_marble_count, get_captured, get_current_turn, and get_winner calls. players are tracked by index
+    (0 for player 1, 1 for player 2) instead of Player objects."""
+
+    __slots__ = ("_names", "_colors", "_masks", "_captured_neutral", "_captured_opponent", "_status",
+                 "_current_turn", "_winner", "_reverse_move", "_hash", "_undo_stack", "_rejection")
+
+    def __init__(self, tuple_1: tuple, tuple_2: tuple) -> None:
+        """initializes a new game of Kuba. takes two tuples with parameters: (player name, player color) and
+        places the marbles in the same starting positions as KubaGame"""
+        self._names = (tuple_1[0], tuple_2[0])
+        self._colors = (tuple_1[1], tuple_2[1])
+        self._masks = [positions_to_mask(PLAYER_1_POSITIONS),
+                       positions_to_mask(PLAYER_2_POSITIONS),
+                       positions_to_mask(NEUTRAL_POSITIONS)]
+        self._captured_neutral = [0, 0]
+        self._captured_opponent = [0, 0]
+        self._status = "UNFINISHED"
+        self._current_turn = None       # index of the player to move, or None before the first move
+        self._winner = None             # index of the winning player
+        self._reverse_move = None       # (cell, direction code) of the move that would undo the last push
+        self._hash = self.compute_hash()
+        self._undo_stack = []
+        self._rejection = MoveStatus.LEGAL
+
+    def get_player_names(self) -> tuple:
+        """returns the names of player 1 and player 2 as a tuple"""
+        return self._names
+
+    def get_player_colors(self) -> tuple:
+        """returns the colors of player 1 and player 2 as a tuple"""
+        return self._colors
+
+    def get_masks(self) -> list:
+        """returns the bitmasks of player 1's marbles, player 2's marbles, and the red marbles"""
+        return self._masks
+
+    def get_status(self) -> str:
+        """returns the status of the game"""
+        return self._status
+
+    def get_reverse_move(self):
+        """returns the reverse of the last move entered in the game as ((row, col), direction), or None"""
+        if self._reverse_move is None:
+            return None
+        cell, direction = self._reverse_move
+        return ((cell // 7, cell % 7), DIRECTION_NAMES[direction])
+
+    def position_hash(self) -> int:
+        """returns the 64-bit Zobrist hash of the current position. a KubaGame in the same position has the
+        same hash"""
+        return self._hash
+
+    def compute_hash(self) -> int:
+        """computes the Zobrist hash of the current position from scratch"""
+        position_hash = 0
+        for index in (0, 1, 2):
+            position_hash ^= mask_hash(ZOBRIST_MARBLES[index], self._masks[index])
+        if self._current_turn is not None:
+            position_hash ^= ZOBRIST_TURN[self._current_turn]
+        for index in (0, 1):
+            position_hash ^= ZOBRIST_CAPTURED_NEUTRAL[index][self._captured_neutral[index]]
+            position_hash ^= ZOBRIST_CAPTURED_OPPONENT[index][self._captured_opponent[index]]
+        return position_hash
+
+    def get_current_turn(self) -> str:
+        """returns the name of the player who currently has the current turn"""
+        if self._current_turn is None:
+            return None
+        return self._names[self._current_turn]
+
+    def get_turn_index(self):
+        """returns the index of the player who has the current turn, or None"""
+        return self._current_turn
+
+    def get_winner_index(self):
+        """returns the index of the winner of the game, or None if the game is not over"""
+        return self._winner
+
+    def get_winner(self) -> str:
+        """returns the name of the winner of the game, or None if the game is not over"""
+        if self._winner is None:
+            return None
+        return self._names[self._winner]
+
+    def get_captured(self, playername: str) -> int:
+        """returns the number of red marbles captured by the player. takes a Player name as a parameter to
+        identify the Player in question"""
+        if playername == self._names[1]:
+            return self._captured_neutral[1]
+        return self._captured_neutral[0]
+
+    def get_marble(self, coordinates: tuple) -> str:
+        """returns the color of the marble currently present in the coordinate passed. returns "X" if no marble
+        is present in the requested cell"""
+        row = coordinates[0]
+        col = coordinates[1]
+        if row not in (0, 1, 2, 3, 4, 5, 6):
+            return "X"
+        if col not in (0, 1, 2, 3, 4, 5, 6):
+            return "X"
+        bit = 1 << (row * 7 + col)
+        if self._masks[0] & bit:
+            return self._colors[0]
+        if self._masks[1] & bit:
+            return self._colors[1]
+        if self._masks[2] & bit:
+            return "R"
+        return "X"
+
+    def get_marble_count(self) -> tuple:
+        """returns the number of white marbles, black marbles, and red marbles remaining on the board as a tuple
+        in order (W, B, R)"""
+        white = 0
+        black = 0
+        for index in (0, 1):
+            if self._colors[index] == "W":
+                white += count_bits(self._masks[index])
+            if self._colors[index] == "B":
+                black += count_bits(self._masks[index])
+        return (white, black, count_bits(self._masks[2]))
+
+    def get_player_marble_count(self, player: int) -> int:
+        """returns the number of marbles player 1 (0) or player 2 (1) has left on the board, whatever the
+        player's color"""
+        return count_bits(self._masks[player])
+
+    def get_board(self) -> list:
+        """returns the current state of the board as a two-dimensional list of marble colors and "X" """
+        return [[self.get_marble((row, col)) for col in range(7)] for row in range(7)]
+
+    def print_board(self):
+        """prints a representation of the current board state to the console"""
+        print(KubaRender.render_text(KubaRender.get_cells(self)), end="")
+        return
+
+    def resolve_move(self, player_name: str, coordinates: tuple, direction: str):
+        """parses and validates a move with the same checks as KubaGame.validate_move(). returns the move as a
+        tuple (player index, cell, direction code) if it is legal, otherwise returns None and get_rejection()
+        returns the reason"""
+
+        # check if the game is over
+        if self._status == "FINISHED":
+            self._rejection = MoveStatus.FINISHED
+            return None
+
+        # check if Player name is valid, then identify the player the same way KubaGame does
+        lowered = player_name.lower()
+        if lowered != self._names[0].lower() and lowered != self._names[1].lower():
+            self._rejection = MoveStatus.UNKNOWN_PLAYER
+            return None
+        player = 1 if player_name == self._names[1] else 0
+
+        # check if it is the Player's turn
+        if self._current_turn == 1 - player:
+            self._rejection = MoveStatus.WRONG_TURN
+            return None
+
+        # cell requested is out of range
+        row = coordinates[0]
+        col = coordinates[1]
+        if row < 0 or row > 6 or col < 0 or col > 6:
+            self._rejection = MoveStatus.OUT_OF_RANGE
+            return None
+
+        # the cell must hold one of the player's marbles or a red marble
+        cell = row * 7 + col
+        bit = 1 << cell
+        if not bit & (self._masks[player] | self._masks[2]):
+            if bit & self._masks[1 - player]:
+                self._rejection = MoveStatus.OPPONENT_MARBLE
+            else:
+                self._rejection = MoveStatus.EMPTY_CELL
+            return None
+
+        # direction must be L, R, F or B, and cannot undo the last push
+        code = DIRECTION_CODES.get(direction.lower())
+        if code is None:
+            self._rejection = MoveStatus.BAD_DIRECTION
+            return None
+        if self._reverse_move == (cell, code):
+            self._rejection = MoveStatus.REVERSE_MOVE
+            return None
+
+        # the cell behind the marble must be empty or off the board
+        if BEHIND[code][cell] & (self._masks[0] | self._masks[1] | self._masks[2]):
+            self._rejection = MoveStatus.BLOCKED_BEHIND
+            return None
+
+        return (player, cell, code)
+
+    def legal_moves(self, player_name: str) -> list:
+        """returns every move the player identified as player_name can make as a list of (coordinates,
+        direction) tuples. each move in the list is one that make_move() would accept"""
+        if self._status == "FINISHED":
+            return []
+        lowered = player_name.lower()
+        if lowered != self._names[0].lower() and lowered != self._names[1].lower():
+            return []
+        player = 1 if player_name == self._names[1] else 0
+        if self._current_turn == 1 - player:
+            return []
+        return [((cell // 7, cell % 7), DIRECTION_NAMES[direction])
+                for player, cell, direction in self.legal_pushes(player)]
+
+    def legal_pushes(self, player: int) -> list:
+        """returns every push the player index passed can make as (player, cell, direction code) tuples that
+        can be passed straight to push(). whose turn it is is not checked"""
+        return list(self.generate_pushes(player))
+
+    def has_legal_push(self, player: int) -> bool:
+        """returns True if the player index passed has a push legal_pushes() would return. the pushes are checked
+        a direction at a time with the same masks as generate_pushes(), stopping at the first legal one"""
+        masks = self._masks
+        empty = ~(masks[0] | masks[1] | masks[2]) & BOARD_MASK
+        own = masks[player]
+        movable = own | masks[2]
+        for direction in (LEFT, RIGHT, FORWARD, BACKWARD):
+            shift = SHIFTS[direction]
+            open_behind = empty << shift if shift > 0 else empty >> -shift
+            candidates = movable & (open_behind | EDGES[direction ^ 1])
+            if self._reverse_move != None and self._reverse_move[1] == direction:
+                candidates &= ~(1 << self._reverse_move[0])
+            own_edge = EDGES[direction] & own
+            rays = RAYS[direction]
+            while candidates:
+                low_bit = candidates & -candidates
+                ray = rays[low_bit.bit_length() - 1]
+                if ray & empty or not ray & own_edge:
+                    return True         # the push does not push off the player's own marble
+                candidates ^= low_bit
+        return False
+
+    def generate_pushes(self, player: int):
+        """yields the pushes legal_pushes() returns one at a time, in direction order and then cell order"""
+        masks = self._masks
+        occupied = masks[0] | masks[1] | masks[2]
+        empty = ~occupied & BOARD_MASK
+        movable = masks[player] | masks[2]
+        own = masks[player]
+        for direction in (LEFT, RIGHT, FORWARD, BACKWARD):
+
+            # a marble can be pushed if the cell behind it is empty or off the board
+            shift = SHIFTS[direction]
+            if shift > 0:
+                open_behind = empty << shift
+            else:
+                open_behind = empty >> -shift
+            candidates = movable & (open_behind | EDGES[direction ^ 1])
+            while candidates:
+                low_bit = candidates & -candidates
+                candidates ^= low_bit
+                cell = low_bit.bit_length() - 1
+                if self._reverse_move == (cell, direction):
+                    continue
+                ray = RAYS[direction][cell]
+                if not ray & empty and ray & EDGES[direction] & own:
+                    continue            # cannot push off your own marble
+                yield (player, cell, direction)
+        return
+
+    def validate_move(self, player_name: str, coordinates: tuple, direction: str) -> bool:
+        """takes the same parameters as make_move() and returns True if the move is legal. a push that would
+        push off one of the player's own marbles is only detected by make_move()"""
+        return self.resolve_move(player_name, coordinates, direction) is not None
+
+    def get_rejection(self) -> MoveStatus:
+        """returns the reason the last move rejected by resolve_move() was rejected"""
+        return self._rejection
+
+    def check_move(self, player_name: str, coordinates: tuple, direction: str) -> MoveStatus:
+        """same as KubaGame.check_move(): returns MoveStatus.LEGAL or the reason the move is illegal"""
+        if self.resolve_move(player_name, coordinates, direction) is None:
+            return self._rejection
+        return MoveStatus.LEGAL
+
+    def try_move(self, player_name: str, coordinates: tuple, direction: str) -> MoveStatus:
+        """same as KubaGame.try_move(): makes the move and returns MoveStatus.LEGAL, or returns the reason the
+        move is illegal"""
+        move = self.resolve_move(player_name, coordinates, direction)
+        if move is None:
+            return self._rejection
+        if not self.push(move[0], move[1], move[2]):
+            return MoveStatus.SELF_CAPTURE
+        return MoveStatus.LEGAL
+
+    def make_move(self, player_name: str, coordinates: tuple, direction: str) -> bool:
+        """makes a move requested by the player identified as playername. the only possible legal directions
+        are: L, R, F, or B. Returns True if the move has been executed; otherwise it returns False to indicate
+        an illegal move."""
+        move = self.resolve_move(player_name, coordinates, direction)
+        if move is None:
+            return False
+        return self.push(move[0], move[1], move[2])
+
+    def push_move(self, player_name: str, coordinates: tuple, direction: str) -> bool:
+        """makes a move the same way as make_move(), and if the move is executed saves the previous state so
+        the move can be taken back with pop_move(). returns True if the move has been executed"""
+        move = self.resolve_move(player_name, coordinates, direction)
+        if move is None:
+            return False
+        return self.push_resolved(move[0], move[1], move[2])
+
+    def push_resolved(self, player: int, cell: int, direction: int) -> bool:
+        """same as push_move() for a move already resolved by resolve_move() or legal_pushes()"""
+        record = self.get_state()
+        if not self.push(player, cell, direction):
+            return False
+        self._undo_stack.append(record)
+        return True
+
+    def pop_move(self) -> bool:
+        """takes back the last move made with push_move() or push_resolved(). returns False if there is no
+        move to take back"""
+        if not self._undo_stack:
+            return False
+        self.set_state(self._undo_stack.pop())
+        return True
+
+    def to_bytes(self) -> bytes:
+        """packs the current position into KubaCodec.POSITION_SIZE bytes, in the same format as
+        KubaGame.to_bytes()"""
+        cells = [KubaCodec.EMPTY] * 49
+        for value, mask in ((KubaCodec.PLAYER_1, self._masks[0]), (KubaCodec.PLAYER_2, self._masks[1]),
+                            (KubaCodec.RED, self._masks[2])):
+            while mask:
+                low_bit = mask & -mask
+                cells[low_bit.bit_length() - 1] = value
+                mask ^= low_bit
+        reverse_move = None
+        if self._reverse_move is not None:
+            reverse_move = self._reverse_move[0] * 4 + self._reverse_move[1]
+        return KubaCodec.pack_position(cells, self._current_turn, self._winner, self._captured_neutral[0],
+                                       reverse_move)
+
+    def from_bytes(self, data: bytes):
+        """sets up the position packed by to_bytes() on this game and clears the undo stack. raises ValueError
+        if the data is not a packed position"""
+        cells, turn, winner, captured_neutral, captured_opponent, reverse_move = KubaCodec.unpack_position(data)
+        masks = [0, 0, 0]
+        for cell, value in enumerate(cells):
+            if value != KubaCodec.EMPTY:
+                masks[value - 1] |= 1 << cell
+        self._masks = masks
+        self._captured_neutral = list(captured_neutral)
+        self._captured_opponent = list(captured_opponent)
+        self._status = "UNFINISHED" if winner is None else "FINISHED"
+        self._current_turn = turn
+        self._winner = winner
+        self._reverse_move = None if reverse_move is None else (reverse_move >> 2, reverse_move & 3)
+        self._hash = self.compute_hash()
+        self._undo_stack = []
+        return
+
+    def get_state(self) -> tuple:
+        """returns every changing data member of the game as a tuple of immutable values"""
+        return (self._masks[0], self._masks[1], self._masks[2],
+                self._captured_neutral[0], self._captured_neutral[1],
+                self._captured_opponent[0], self._captured_opponent[1],
+                self._status, self._current_turn, self._winner, self._reverse_move, self._hash)
+
+    def set_state(self, state: tuple):
+        """restores the data members of the game from a tuple returned by get_state()"""
+        self._masks = [state[0], state[1], state[2]]
+        self._captured_neutral = [state[3], state[4]]
+        self._captured_opponent = [state[5], state[6]]
+        self._status, self._current_turn, self._winner, self._reverse_move, self._hash = state[7:]
+        return
+
+    def push(self, player: int, cell: int, direction: int) -> bool:
+        """pushes the line of marbles starting at cell in the direction given for the player index passed. the
+        move must already be validated. returns False without changing the board if the push would push off
+        one of the player's own marbles"""
+        masks = self._masks
+        ray = RAYS[direction][cell]
+        empties = ray & ~(masks[0] | masks[1] | masks[2])
+
+        # the marbles being pushed are every cell on the ray up to the first empty cell
+        fallen = 0
+        end = 0
+        if empties:
+            if direction & 1:
+                end = empties & -empties
+                line = ray & (end - 1)
+            else:
+                end = 1 << (empties.bit_length() - 1)
+                line = ray & ~((end << 1) - 1)
+        else:
+            line = ray
+            fallen = ray & EDGES[direction]
+
+        # the last marble in the line is pushed off the board
+        if fallen:
+            if fallen & masks[player]:
+                return False            # cannot push off your own marble
+            if fallen & masks[2]:
+                count = self._captured_neutral[player]
+                self._hash ^= ZOBRIST_CAPTURED_NEUTRAL[player][count] ^ ZOBRIST_CAPTURED_NEUTRAL[player][count + 1]
+                self._captured_neutral[player] = count + 1
+            else:
+                count = self._captured_opponent[player]
+                self._hash ^= ZOBRIST_CAPTURED_OPPONENT[player][count] ^ ZOBRIST_CAPTURED_OPPONENT[player][count + 1]
+                self._captured_opponent[player] = count + 1
+
+        # shift every marble in the line one cell over
+        shift = SHIFTS[direction]
+        for index in (0, 1, 2):
+            moved = masks[index] & line
+            if moved:
+                kept = moved & ~fallen
+                if shift > 0:
+                    kept = kept << shift
+                else:
+                    kept = kept >> -shift
+                masks[index] = (masks[index] ^ moved) | kept
+                keys = ZOBRIST_MARBLES[index]
+                self._hash ^= mask_hash(keys, moved) ^ mask_hash(keys, kept)
+
+        # set reverse move, which is left unchanged after a capture
+        if not fallen:
+            self._reverse_move = (end.bit_length() - 1, direction ^ 1)
+
+        # determine if the game is over
+        if not self.game_over_check():
+            self._set_current_turn(1 - player)
+        return True
+
+    def _set_current_turn(self, player):
+        """updates the current turn to the player index passed, or None, and keeps the hash up to date"""
+        if self._current_turn is not None:
+            self._hash ^= ZOBRIST_TURN[self._current_turn]
+        if player is not None:
+            self._hash ^= ZOBRIST_TURN[player]
+        self._current_turn = player
+        return
+
+    def game_over_check(self) -> bool:
+        """checks the status of the board and updates the winner and status of the game. returns True if the
+        game is over"""
+        if self._captured_opponent[0] == 8 or self._captured_neutral[0] == 7:
+            self._player_wins(0)
+            return True
+        if self._captured_opponent[1] == 8 or self._captured_neutral[1] == 7:
+            self._player_wins(1)
+            return True
+        if not self.has_legal_push(0):
+            self._player_wins(1)
+            return True
+        if not self.has_legal_push(1):
+            self._player_wins(0)
+            return True
+        return False
+
+    def _player_wins(self, winner: int):
+        """updates the game data to reflect a win for the player index passed"""
+        self._status = "FINISHED"
+        self._winner = winner
+        self._set_current_turn(None)
+        return
@@ -0,0 +1,541 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the source code for the OpeningBook and EndgameTables classes, which let a
+#               Kuba engine skip searching at the start and the end of a game. The opening book holds the
+#               moves played from each early position of a set of games, keyed by position hash, with how often
+#               each move was played and how well it scored. The endgame tables hold the exact result of every
+#               position with a few marbles left, solved backwards from the won and lost positions. Both are
+#               saved in compact binary files and have a best_move() method that KubaSearch consults before it
+#               searches. Run this file directly to build a book from self-play or game records, or to solve
+#               the endgame tables.
+
+# %%
+import argparse
+import itertools
+import math
+import random
+import struct
+import sys
+from array import array
+
+import KubaCodec
+from KubaBitboard import KubaBitboard, count_bits, mask_to_cells
+from KubaNotation import UNFINISHED, read_games
+from KubaSearch import KubaSearch
+
+# a book file is BOOK_MAGIC, the number of records, and one record per (position, player to move, move)
+BOOK_MAGIC = b"KUBABOOK"
+BOOK_RECORD = struct.Struct("<QBBII")       # position hash, player index, move byte, games, points
+
+# an endgame file is TABLE_MAGIC, the number of tables, and per table its material, size, and values
+TABLE_MAGIC = b"KUBAEGTB"
+TABLE_HEADER = struct.Struct("<BBBBI")      # player 1 marbles, player 2 marbles, red marbles, red captured by
+                                            # player 1, number of states
+
+# results of a position for the player to move
+WIN = 1
+LOSS = -1
+DRAW = 0
+
+
+class OpeningBook:
+    """represents an opening book. every game added contributes its first max_plies moves, and a move is only
+    played from the book once it has been seen in min_games games. points are counted in half points: 2 for
+    a win of the player who made the move, 1 for an unfinished game, and 0 for a loss"""
+
+    def __init__(self, max_plies: int = 16, min_games: int = 4) -> None:
+        """initializes an empty book"""
+        self._max_plies = max_plies
+        self._min_games = min_games
+        self._entries = {}      # (position hash, player index) -> {move byte: [games, points]}
+
+    def get_size(self) -> int:
+        """returns the number of (position, move) records in the book"""
+        return sum(len(moves) for moves in self._entries.values())
+
+    def get_moves(self, position_hash: int, player: int) -> dict:
+        """returns the statistics of the moves played by the player index passed from the position with the hash
+        passed, as a dictionary of move byte to [games, points]"""
+        return self._entries.get((position_hash, player), {})
+
+    def add_game(self, tuple_1: tuple, tuple_2: tuple, first_player: int, moves, winner) -> int:
+        """adds the moves of a game between the two (player name, player color) tuples passed, starting with the
+        player index first_player. winner is the index of the player who won, or None for an unfinished game.
+        returns the number of moves added, which stops at the first illegal move"""
+        game = KubaBitboard(tuple_1, tuple_2)
+        names = game.get_player_names()
+        player = first_player
+        added = 0
+        for coordinates, direction in moves:
+            if added >= self._max_plies:
+                break
+            key = (game.position_hash(), player)
+            if game.make_move(names[player], coordinates, direction) == False:
+                break
+            statistics = self._entries.setdefault(key, {}).setdefault(KubaCodec.encode_move(coordinates, direction),
+                                                                      [0, 0])
+            statistics[0] += 1
+            statistics[1] += 1 if winner == None else 2 * (winner == player)
+            added += 1
+            player = 1 - player
+        return added
+
+    def add_records(self, lines) -> int:
+        """adds every game of a file of game records in the notation of KubaNotation. returns the number of games
+        added"""
+        games = 0
+        for record in read_games(lines):
+            tags = record["tags"]
+            if record["error"] != None or any(tag not in tags for tag in ("Player1", "Color1", "Player2", "Color2")):
+                continue
+            names = (tags["Player1"], tags["Player2"])
+            result = tags.get("Result", UNFINISHED)
+            winner = names.index(result) if result in names else None
+            first = names.index(tags["First"]) if tags.get("First") in names else 0
+            self.add_game((names[0], tags["Color1"]), (names[1], tags["Color2"]), first, record["moves"], winner)
+            games += 1
+        return games
+
+    def best_move(self, game, player_name: str):
+        """returns the book move with the best score for the player identified as player_name in the current
+        position of the game, a KubaGame or KubaBitboard, as a (coordinates, direction) tuple. returns None if
+        the position is not in the book or none of its moves has been played often enough"""
+        names = game.get_player_names()
+        player = 1 if player_name == names[1] else 0
+        entry = self._entries.get((game.position_hash(), player))
+        if entry == None:
+            return None
+        legal = game.legal_moves(player_name)
+        best = None
+        best_key = None
+        for move, (games, points) in entry.items():
+            if games < self._min_games:
+                continue
+            decoded = KubaCodec.decode_move(move)
+            if decoded not in legal:
+                continue                # the position hash does not cover the reverse move ban
+            key = (points / games, games)
+            if best_key == None or key > best_key:
+                best = decoded
+                best_key = key
+        return best
+
+    def save(self, path: str):
+        """writes the book to a file, with its records sorted by position"""
+        records = []
+        for (position_hash, player), moves in self._entries.items():
+            for move, (games, points) in moves.items():
+                records.append((position_hash, player, move, games, points))
+        records.sort()
+        with open(path, "wb") as book_file:
+            book_file.write(BOOK_MAGIC + len(records).to_bytes(4, "little"))
+            for record in records:
+                book_file.write(BOOK_RECORD.pack(*record))
+        return
+
+    def load(self, path: str):
+        """adds the records of a book file to this book"""
+        with open(path, "rb") as book_file:
+            data = book_file.read()
+        if data[:len(BOOK_MAGIC)] != BOOK_MAGIC:
+            raise ValueError(f"{path} is not an opening book file")
+        count = int.from_bytes(data[len(BOOK_MAGIC):len(BOOK_MAGIC) + 4], "little")
+        for position_hash, player, move, games, points in BOOK_RECORD.iter_unpack(
+                data[len(BOOK_MAGIC) + 4:len(BOOK_MAGIC) + 4 + count * BOOK_RECORD.size]):
+            statistics = self._entries.setdefault((position_hash, player), {}).setdefault(move, [0, 0])
+            statistics[0] += games
+            statistics[1] += points
+        return
+
+
+def rank_cells(cells: list, taken: list) -> int:
+    """returns the rank of a sorted list of cells among all sets of the same size, counting only the cells not
+    in taken. ranks run from 0 to comb(49 - len(taken), len(cells)) - 1"""
+    rank = 0
+    for number, cell in enumerate(cells):
+        below = 0
+        for other in taken:
+            if other < cell:
+                below += 1
+        rank += math.comb(cell - below, number + 1)
+    return rank
+
+
+def count_boards(material: tuple) -> int:
+    """returns the number of boards with the material passed"""
+    player_1, player_2, red = material[0], material[1], material[2]
+    return math.comb(49, player_1) * math.comb(49 - player_1, player_2) * math.comb(49 - player_1 - player_2, red)
+
+
+def rank_board(groups: tuple) -> int:
+    """returns the index of a board given as the sorted cells of player 1's, player 2's, and the red marbles"""
+    index = 0
+    taken = []
+    for cells in groups:
+        index = index * math.comb(49 - len(taken), len(cells)) + rank_cells(cells, taken)
+        taken = sorted(taken + cells)
+    return index
+
+
+def reverse_slot(occupied: list, reverse_move) -> int:
+    """returns the slot of a reverse move ban among the bans possible on a board with the occupied cells
+    passed: 0 for no ban, otherwise 1 + 4 * the position of the cell in occupied + the direction code. a ban
+    on an empty cell bans nothing and is slot 0"""
+    if reverse_move == None:
+        return 0
+    cell = reverse_move >> 2
+    if cell not in occupied:
+        return 0
+    return 1 + occupied.index(cell) * 4 + (reverse_move & 3)
+
+
+def encode_value(result: int, distance: int) -> int:
+    """returns the table value of a result in the distance passed, in plies. draws are 0, wins odd, losses
+    even"""
+    if result == WIN:
+        return 2 * distance - 1
+    if result == LOSS:
+        return 2 * distance + 2
+    return 0
+
+
+def decode_value(value: int) -> tuple:
+    """returns the (result, distance) of a table value"""
+    if value == 0:
+        return (DRAW, 0)
+    if value & 1:
+        return (WIN, (value + 1) // 2)
+    return (LOSS, (value - 2) // 2)
+
+
+class EndgameTables:
+    """represents a set of endgame tables. each table covers one material: the number of marbles of player 1,
+    player 2, and red marbles on the board, and the red marbles captured by player 1. it holds the result for
+    the player to move of every position with that material, every player to move, and every reverse move
+    ban, with the number of plies to the end of the game when played perfectly. positions that neither player
+    can force a win from are draws"""
+
+    def __init__(self) -> None:
+        """initializes an empty set of tables"""
+        self._tables = {}       # material -> array of table values indexed by state
+
+    def get_materials(self) -> list:
+        """returns the materials that have a table"""
+        return sorted(self._tables)
+
+    def state_index(self, cells: list, turn: int, reverse_move) -> int:
+        """returns the index in its table of the position with the cell values (in the format of KubaCodec),
+        player index to move, and reverse move byte passed"""
+        groups = ([], [], [])
+        for cell, value in enumerate(cells):
+            if value != KubaCodec.EMPTY:
+                groups[value - 1].append(cell)
+        occupied = sorted(groups[0] + groups[1] + groups[2])
+        slots = 1 + 4 * len(occupied)
+        return (rank_board(groups) * 2 + turn) * slots + reverse_slot(occupied, reverse_move)
+
+    def probe(self, game):
+        """returns the (result, distance) of the current position of the game, a KubaGame or KubaBitboard, for
+        the player to move, or None if there is no table for its material or the game is over or not started"""
+        cells, turn, winner, captured_neutral, captured_opponent, reverse_move = KubaCodec.unpack_position(
+            game.to_bytes())
+        if turn == None or winner != None:
+            return None
+        material = (cells.count(KubaCodec.PLAYER_1), cells.count(KubaCodec.PLAYER_2), cells.count(KubaCodec.RED),
+                    captured_neutral[0])
+        table = self._tables.get(material)
+        if table == None:
+            return None
+        return decode_value(table[self.state_index(cells, turn, reverse_move)])
+
+    def best_move(self, game, player_name: str):
+        """returns the move that keeps the best result for the player identified as player_name in the current
+        position of the game: the fastest win, the slowest loss, or a move that keeps a draw. returns None if
+        the position is not in the tables or it is not the player's turn. the game is returned to the position
+        it started in"""
+        if game.get_current_turn() != player_name:
+            return None
+        result = self.probe(game)
+        if result == None:
+            return None
+        best = None
+        best_key = None
+        for coordinates, direction in game.legal_moves(player_name):
+            game.push_move(player_name, coordinates, direction)
+            winner = game.get_winner()
+            if winner != None:
+                child = (LOSS, 0) if str(winner) == player_name else (WIN, 0)
+            else:
+                child = self.probe(game)
+            game.pop_move()
+            if child == None:
+                continue
+
+            # the child's result is for the opponent. prefer wins, then draws, then losses, and among wins the
+            # shortest and among losses the longest
+            if child[0] == LOSS:
+                key = (2, -child[1])
+            elif child[0] == DRAW:
+                key = (1, 0)
+            else:
+                key = (0, child[1])
+            if best_key == None or key > best_key:
+                best = (coordinates, direction)
+                best_key = key
+        return best
+
+    def solve(self, material: tuple):
+        """solves the table of the material passed, a tuple (player 1 marbles, player 2 marbles, red marbles, red
+        marbles captured by player 1), and the tables of smaller materials it captures into. every position is
+        set up on a KubaBitboard so the tables follow its rules exactly"""
+        if material in self._tables:
+            return
+        player_1, player_2, red, captured_1 = material
+        captured_2 = 13 - red - captured_1
+        if player_1 < 1 or player_2 < 1 or red < 1 or not 0 <= captured_1 <= 6 or not 0 <= captured_2 <= 6:
+            raise ValueError(f"{material} is not the material of an unfinished game")
+        slots = 1 + 4 * (player_1 + player_2 + red)
+        state_count = count_boards(material) * 2 * slots
+
+        # play every move of every board and player to move once, with no reverse move ban. moves that stay in
+        # this material become links from the child state back to its parent, and moves that capture or end
+        # the game are scored directly. a parent is board * 2 + turn, and ban is the slot that bans the move
+        game = KubaBitboard(("1", "W"), ("2", "B"))
+        link_children = array("I")
+        link_parents = array("I")               # parent * 64 + ban
+        exits = {}                              # parent -> list of (ban, exit)
+        legal_bans = array("Q", bytes(8 * (state_count // slots)))     # parent -> bit set of its legal moves' bans
+        for groups in self._boards(material):
+            occupied = sorted(groups[0] + groups[1] + groups[2])
+            masks = tuple(sum(1 << cell for cell in cells) for cells in groups)
+            board = rank_board(groups)
+            for turn in (0, 1):
+                base = (masks[0], masks[1], masks[2], captured_1, captured_2, 8 - player_2, 8 - player_1,
+                        "UNFINISHED", turn, None, None, 0)
+                game.set_state(base)
+                parent = board * 2 + turn
+                bans = 0
+                for push in game.legal_pushes(turn):
+                    ban = 1 + occupied.index(push[1]) * 4 + push[2]
+                    bans |= 1 << ban
+                    game.set_state(base)
+                    game.push(push[0], push[1], push[2])
+                    state = game.get_state()
+                    if state[9] != None:
+                        exits.setdefault(parent, []).append((ban, (WIN if state[9] == turn else LOSS, 0)))
+                    elif state[3:7] == base[3:7]:
+                        child_groups = tuple(mask_to_cells(mask) for mask in state[:3])
+                        child_occupied = sorted(child_groups[0] + child_groups[1] + child_groups[2])
+                        reverse = state[10]
+                        link_children.append((rank_board(child_groups) * 2 + 1 - turn) * slots +
+                                             reverse_slot(child_occupied, reverse[0] * 4 + reverse[1]))
+                        link_parents.append(parent * 64 + ban)
+                    else:
+                        # a capture keeps the parent's ban, so the exit is scored per ban slot later
+                        exits.setdefault(parent, []).append((ban, (None, state, occupied)))
+                legal_bans[parent] = bans
+
+        # group the links by child state so the parents of a state are parents[first[state]:first[state + 1]]
+        first = array("I", bytes(4 * (state_count + 1)))
+        for child in link_children:
+            first[child + 1] += 1
+        for state in range(state_count):
+            first[state + 1] += first[state]
+        parents = array("I", bytes(4 * len(link_children)))
+        filled = array("I", first[:state_count])
+        for child, parent in zip(link_children, link_parents):
+            parents[filled[child]] = parent
+            filled[child] += 1
+        del link_children, link_parents, filled
+
+        # resolve positions in order of distance: buckets[d] holds the states whose result is d plies away, as
+        # state * 2 + 1 for a win and state * 2 for a loss. values are only final once taken out of a bucket
+        values = array("H", bytes(2 * state_count))
+        remaining = array("B", bytes(state_count))
+        longest = array("H", bytes(2 * state_count))
+        shortest_win = array("H", bytes(2 * state_count))
+        buckets = [[]]
+
+        def schedule(state: int, result: int, distance: int):
+            """adds a candidate result for a state to the bucket of its distance, unless the state already has a
+            win at that distance or sooner"""
+            if result == WIN:
+                if shortest_win[state] != 0 and shortest_win[state] <= distance:
+                    return
+                shortest_win[state] = distance
+            while len(buckets) <= distance:
+                buckets.append([])
+            buckets[distance].append(state * 2 + (result == WIN))
+            return
+
+        for parent in range(len(legal_bans)):
+            bans = legal_bans[parent]
+            moves = bin(bans).count("1")
+            for slot in range(slots):
+                state = parent * slots + slot
+                remaining[state] = moves - (bans >> slot & 1)
+                for ban, exit_result in exits.get(parent, ()):
+                    if ban == slot:
+                        continue
+
+                    # exits are scored for the player making the move
+                    result, distance = self._exit_result(exit_result, slot)
+                    if result == WIN:
+                        schedule(state, WIN, distance + 1)
+                    elif result == LOSS:
+                        remaining[state] -= 1
+                        longest[state] = max(longest[state], distance + 1)
+                if remaining[state] == 0:
+                    schedule(state, LOSS, longest[state])
+
+        distance = 0
+        while distance < len(buckets):
+            for entry in buckets[distance]:
+                state = entry >> 1
+                result = WIN if entry & 1 else LOSS
+                if values[state] != 0:
+                    continue
+                values[state] = encode_value(result, distance)
+                for link in parents[first[state]:first[state + 1]]:
+                    parent = link >> 6
+                    ban = link & 63
+                    for slot in range(slots):
+                        if slot == ban:
+                            continue
+                        parent_state = parent * slots + slot
+                        if values[parent_state] != 0:
+                            continue
+                        if result == LOSS:
+                            schedule(parent_state, WIN, distance + 1)
+                        else:
+                            remaining[parent_state] -= 1
+                            longest[parent_state] = max(longest[parent_state], distance + 1)
+                            if remaining[parent_state] == 0:
+                                schedule(parent_state, LOSS, longest[parent_state])
+            buckets[distance] = None
+            distance += 1
+        self._tables[material] = values
+        return
+
+    def _exit_result(self, exit_result: tuple, slot: int) -> tuple:
+        """returns the (result, distance) for the mover of a move that leaves the table's material, made from a
+        position with the ban slot passed"""
+        if exit_result[0] != None:
+            return exit_result
+        state, occupied = exit_result[1], exit_result[2]
+
+        # the reverse move ban is not changed by a capture, so the child keeps the ban of the parent's slot
+        reverse_move = None
+        if slot != 0:
+            reverse_move = (occupied[(slot - 1) // 4], (slot - 1) % 4)
+        game = KubaBitboard(("1", "W"), ("2", "B"))
+        game.set_state(state[:10] + (reverse_move, 0))
+        self.solve((count_bits(state[0]), count_bits(state[1]), count_bits(state[2]), state[3]))
+        child = self.probe(game)
+        return (-child[0], child[1])
+
+    def _boards(self, material: tuple):
+        """yields every board with the material passed as the sorted cells of player 1's, player 2's, and the red
+        marbles"""
+        cells = range(49)
+        for group_1 in itertools.combinations(cells, material[0]):
+            rest_1 = [cell for cell in cells if cell not in group_1]
+            for group_2 in itertools.combinations(rest_1, material[1]):
+                rest_2 = [cell for cell in rest_1 if cell not in group_2]
+                for group_3 in itertools.combinations(rest_2, material[2]):
+                    yield (list(group_1), list(group_2), list(group_3))
+
+    def save(self, path: str):
+        """writes every table to a file"""
+        with open(path, "wb") as table_file:
+            table_file.write(TABLE_MAGIC + len(self._tables).to_bytes(4, "little"))
+            for material in sorted(self._tables):
+                values = self._tables[material]
+                if sys.byteorder == "big":
+                    values = array("H", values)
+                    values.byteswap()
+                table_file.write(TABLE_HEADER.pack(*material, len(values)))
+                table_file.write(values.tobytes())
+        return
+
+    def load(self, path: str):
+        """adds the tables of a file written by save() to this set of tables"""
+        with open(path, "rb") as table_file:
+            if table_file.read(len(TABLE_MAGIC)) != TABLE_MAGIC:
+                raise ValueError(f"{path} is not an endgame table file")
+            count = int.from_bytes(table_file.read(4), "little")
+            for number in range(count):
+                header = TABLE_HEADER.unpack(table_file.read(TABLE_HEADER.size))
+                values = array("H")
+                values.frombytes(table_file.read(2 * header[4]))
+                if sys.byteorder == "big":
+                    values.byteswap()
+                self._tables[header[:4]] = values
+        return
+
+
+def self_play(games: int, seed: int = 0, nodes: int = 500, max_moves: int = 300, randomness: float = 0.2):
+    """plays games of the search engine against itself and yields each one as (first player index, moves,
+    winner index or None). a random legal move is played instead of the engine's move with the probability
+    randomness, so the games branch out from the start position"""
+    for number in range(games):
+        generator = random.Random(f"{seed}:{number}")
+        engine = KubaSearch(node_limit=nodes, table_bits=16)
+        game = KubaBitboard(("A", "W"), ("B", "B"))
+        names = game.get_player_names()
+        first = number % 2
+        player = first
+        moves = []
+        while game.get_winner() == None and len(moves) < max_moves:
+            if generator.random() < randomness:
+                legal = game.legal_moves(names[player])
+                move = generator.choice(legal) if len(legal) > 0 else None
+            else:
+                move = engine.search(game, names[player])
+            if move == None:
+                break
+            game.make_move(names[player], move[0], move[1])
+            moves.append(move)
+            player = 1 - player
+        winner = game.get_winner_index()
+        yield first, moves, winner
+
+
+def main():
+    """parses the command line and builds an opening book or solves endgame tables"""
+    parser = argparse.ArgumentParser(description="build Kuba opening books and endgame tables")
+    commands = parser.add_subparsers(dest="command", required=True)
+    book_parser = commands.add_parser("book", help="build an opening book")
+    book_parser.add_argument("output", help="book file to write")
+    book_parser.add_argument("--records", nargs="*", default=[], help="game record files to add")
+    book_parser.add_argument("--games", type=int, default=0, help="self-play games to add")
+    book_parser.add_argument("--nodes", type=int, default=500, help="node budget per self-play move")
+    book_parser.add_argument("--seed", type=int, default=0, help="self-play seed")
+    book_parser.add_argument("--plies", type=int, default=16, help="moves of each game added to the book")
+    table_parser = commands.add_parser("endgame", help="solve endgame tables")
+    table_parser.add_argument("output", help="table file to write")
+    table_parser.add_argument("--material", nargs=4, type=int, action="append",
+                              metavar=("PLAYER_1", "PLAYER_2", "RED", "CAPTURED_1"),
+                              help="material to solve (default: one marble each and the last red marble)")
+    args = parser.parse_args()
+
+    if args.command == "book":
+        book = OpeningBook(max_plies=args.plies)
+        for path in args.records:
+            with open(path) as record_file:
+                book.add_records(record_file)
+        for first, moves, winner in self_play(args.games, args.seed, args.nodes):
+            book.add_game(("A", "W"), ("B", "B"), first, moves, winner)
+        book.save(args.output)
+        print(f"{book.get_size()} book moves written to {args.output}")
+    else:
+        tables = EndgameTables()
+        for material in args.material or [(1, 1, 1, 6)]:
+            tables.solve(tuple(material))
+        tables.save(args.output)
+        print(f"tables for {tables.get_materials()} written to {args.output}")
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the compact binary encodings of Kuba positions and moves used by
+#               KubaGame.to_bytes() and KubaBitboard.to_bytes(). A position is packed into 15 bytes and a
+#               move into a single byte, so move logs can be written one byte per move.
+#
+#               Position layout (POSITION_SIZE bytes):
+#                   bytes 0-12  the 49 cells, two bits each, cell row * 7 + col at bit 2 * cell of a
+#                               little-endian integer: 0 empty, 1 player 1, 2 player 2, 3 red
+#                   byte 13     bits 0-1 player to move, bits 2-3 winner (0 for none, 1 or 2 for a player),
+#                               bits 4-6 red marbles captured by player 1
+#                   byte 14     the banned reverse move as a move byte plus one, or 0 for none
+#
+#               Red marbles captured by player 2 and opponent marbles captured by either player are not
+#               stored, since they follow from the marbles left on the board. The game is finished exactly
+#               when there is a winner.
+
+# %%
+POSITION_SIZE = 15
+EMPTY = 0
+PLAYER_1 = 1
+PLAYER_2 = 2
+RED = 3
+DIRECTIONS = ("L", "R", "F", "B")
+
+
+def pack_position(cells: list, turn, winner, captured_red: int, reverse_move) -> bytes:
+    """packs a position into POSITION_SIZE bytes. cells holds the 49 cell values in cell order, turn and winner
+    are player indexes (0 or 1) or None, captured_red is the number of red marbles captured by player 1, and
+    reverse_move is a move byte or None"""
+    board = 0
+    for cell in range(48, -1, -1):
+        board = (board << 2) | cells[cell]
+    flags = (0 if turn == None else turn + 1) | (0 if winner == None else winner + 1) << 2 | captured_red << 4
+    reverse = 0 if reverse_move == None else reverse_move + 1
+    return board.to_bytes(13, "little") + bytes((flags, reverse))
+
+
+def unpack_position(data: bytes) -> tuple:
+    """unpacks a position packed by pack_position() and returns (cells, turn, winner, captured red marbles of
+    each player as a tuple, captured opponent marbles of each player as a tuple, reverse move byte)"""
+    if len(data) != POSITION_SIZE:
+        raise ValueError(f"a packed position is {POSITION_SIZE} bytes, not {len(data)}")
+    board = int.from_bytes(data[:13], "little")
+    cells = [(board >> (2 * cell)) & 3 for cell in range(49)]
+    flags = data[13]
+    turn = (flags & 3) - 1 if flags & 3 else None
+    winner = ((flags >> 2) & 3) - 1 if (flags >> 2) & 3 else None
+    captured_red_1 = (flags >> 4) & 7
+    captured_red_2 = 13 - cells.count(RED) - captured_red_1
+    captured_opponent = (8 - cells.count(PLAYER_2), 8 - cells.count(PLAYER_1))
+    reverse_move = data[14] - 1 if data[14] else None
+    if flags & 3 == 3 or (flags >> 2) & 3 == 3 or data[14] > 196:
+        raise ValueError("packed position does not describe a Kuba position")
+    if cells.count(PLAYER_1) > 8 or cells.count(PLAYER_2) > 8 or captured_red_2 < 0:
+        raise ValueError("packed position does not describe a Kuba position")
+    return cells, turn, winner, (captured_red_1, captured_red_2), captured_opponent, reverse_move
+
+
+def encode_move(coordinates: tuple, direction: str) -> int:
+    """returns the move byte of a (coordinates, direction) move: (row * 7 + col) * 4 + direction index"""
+    return (coordinates[0] * 7 + coordinates[1]) * 4 + DIRECTIONS.index(direction.upper())
+
+
+def decode_move(move: int) -> tuple:
+    """returns the (coordinates, direction) move of a move byte"""
+    cell = move >> 2
+    return ((cell // 7, cell % 7), DIRECTIONS[move & 3])
+
+
+def encode_move_log(moves) -> bytes:
+    """returns the move log of a sequence of (coordinates, direction) moves, one byte per move. players
+    alternate after the first move, so the log does not store who made each move"""
+    return bytes(encode_move(coordinates, direction) for coordinates, direction in moves)
+
+
+def decode_move_log(data: bytes) -> list:
+    """returns the list of (coordinates, direction) moves in a move log"""
+    return [decode_move(move) for move in data]
+
+
+def replay_move_log(game, first_player: str, data: bytes) -> int:
+    """makes every move of a move log in the game passed, starting with the player named first_player and
+    alternating after that. returns the number of moves made, which is short of the log length if a move was
+    rejected"""
+    names = game.get_player_names()
+    player = names.index(first_player)
+    made = 0
+    for move in data:
+        coordinates, direction = decode_move(move)
+        if game.make_move(names[player], coordinates, direction) == False:
+            break
+        made += 1
+        player = 1 - player
+    return made
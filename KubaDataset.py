@@ -0,0 +1,161 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the source code for a training-data store of Kuba positions. The
+#               KubaDatasetWriter class appends fixed-width records to a flat file, one per position, with
+#               the move played from the position, the eventual winner and the final captured counts of the
+#               game as labels. The KubaDataset class maps the file with a NumPy memmap, so its board, move
+#               and label arrays are views of the file and reading them never copies or replays a game.
+#               Cell values are the ones used by KubaCodec: 0 empty, 1 player 1, 2 player 2, 3 red.
+
+# %%
+import os
+
+import numpy as np
+
+import KubaCodec
+
+# a dataset file is a header followed by records. the header holds MAGIC and the record size, so a file
+# written with a different record layout is rejected instead of read as garbage
+MAGIC = b"KUBAPOS1"
+HEADER_SIZE = 16
+NO_MOVE = 255
+NO_PLAYER = -1
+
+RECORD_DTYPE = np.dtype([
+    ("cells", np.uint8, (7, 7)),            # the board before the move
+    ("turn", np.int8),                      # index of the player to move, or NO_PLAYER
+    ("reverse_move", np.uint8),             # the banned reverse move as a move byte, or NO_MOVE
+    ("captured", np.uint8, (2,)),           # red marbles captured by each player so far
+    ("move", np.uint8),                     # the move played from this position as a move byte, or NO_MOVE
+    ("winner", np.int8),                    # index of the player who won the game, or NO_PLAYER
+    ("final_captured", np.uint8, (2,)),     # red marbles captured by each player at the end of the game
+])
+
+
+def make_header() -> bytes:
+    """returns the header written at the start of every dataset file"""
+    return MAGIC + RECORD_DTYPE.itemsize.to_bytes(4, "little") + bytes(HEADER_SIZE - len(MAGIC) - 4)
+
+
+class KubaDatasetWriter:
+    """appends positions to a dataset file. positions are recorded with add_position() as a game is played and
+    held in memory until end_game() labels them with the result of the game and writes them out"""
+
+    def __init__(self, path: str) -> None:
+        """opens the dataset file at path for appending, writing the header if the file is new or empty. a record
+        left incomplete by an interrupted write is cut off so that new records stay aligned"""
+        self._path = path
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size > 0:
+            with open(path, "rb") as existing:
+                header = existing.read(HEADER_SIZE)
+            if header != make_header():
+                raise ValueError(f"{path} is not a dataset file with this record layout")
+            extra = (size - HEADER_SIZE) % RECORD_DTYPE.itemsize
+            if extra != 0:
+                os.truncate(path, size - extra)
+        self._file = open(path, "ab")
+        if size == 0:
+            self._file.write(make_header())
+        self._pending = []
+        self._written = 0
+
+    def get_written(self) -> int:
+        """returns the number of records written to the file by this writer"""
+        return self._written
+
+    def add_position(self, game, coordinates: tuple, direction: str):
+        """records the current position of the game, a KubaGame or KubaBitboard, with the move about to be
+        played from it. call this before making the move"""
+        cells, turn, winner, captured, captured_opponent, reverse_move = KubaCodec.unpack_position(game.to_bytes())
+        move = KubaCodec.encode_move(coordinates, direction)
+        self._pending.append((cells, NO_PLAYER if turn == None else turn,
+                              NO_MOVE if reverse_move == None else reverse_move, captured, move))
+        return
+
+    def end_game(self, game):
+        """labels the positions recorded since the last end_game() with the winner and captured counts of the
+        game passed, and appends them to the file. an unfinished game is labelled with no winner"""
+        if len(self._pending) == 0:
+            return
+        names = game.get_player_names()
+        winner = game.get_winner()
+        records = np.zeros(len(self._pending), dtype=RECORD_DTYPE)
+        records["cells"] = np.array([pending[0] for pending in self._pending], dtype=np.uint8).reshape(-1, 7, 7)
+        records["turn"] = [pending[1] for pending in self._pending]
+        records["reverse_move"] = [pending[2] for pending in self._pending]
+        records["captured"] = [pending[3] for pending in self._pending]
+        records["move"] = [pending[4] for pending in self._pending]
+        records["winner"] = NO_PLAYER if winner == None else names.index(str(winner))
+        records["final_captured"] = (game.get_captured(names[0]), game.get_captured(names[1]))
+        records.tofile(self._file)
+        self._written += len(records)
+        self._pending = []
+        return
+
+    def close(self):
+        """closes the file. positions recorded after the last end_game() are discarded, since their game has no
+        result to label them with"""
+        self._pending = []
+        self._file.close()
+        return
+
+
+class KubaDataset:
+    """reads a dataset file through a read-only NumPy memmap. the arrays returned are views of the mapped file,
+    so only the pages that are read are loaded from disk"""
+
+    def __init__(self, path: str) -> None:
+        """maps the dataset file at path. a record left incomplete at the end of the file by an interrupted
+        write is ignored"""
+        with open(path, "rb") as dataset_file:
+            header = dataset_file.read(HEADER_SIZE)
+        if header != make_header():
+            raise ValueError(f"{path} is not a dataset file with this record layout")
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if count == 0:
+            self._records = np.zeros(0, dtype=RECORD_DTYPE)     # a memmap cannot map zero bytes
+        else:
+            self._records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+    def __len__(self) -> int:
+        """returns the number of positions in the dataset"""
+        return len(self._records)
+
+    def get_records(self) -> np.ndarray:
+        """returns the structured array of every record"""
+        return self._records
+
+    def get_boards(self) -> np.ndarray:
+        """returns the (N, 7, 7) uint8 array of boards"""
+        return self._records["cells"]
+
+    def get_turns(self) -> np.ndarray:
+        """returns the index of the player to move in each position"""
+        return self._records["turn"]
+
+    def get_moves(self) -> np.ndarray:
+        """returns the move byte played from each position"""
+        return self._records["move"]
+
+    def get_winners(self) -> np.ndarray:
+        """returns the index of the player who won the game of each position, or NO_PLAYER"""
+        return self._records["winner"]
+
+    def get_captured(self) -> np.ndarray:
+        """returns the (N, 2) array of red marbles captured by each player in each position"""
+        return self._records["captured"]
+
+    def get_final_captured(self) -> np.ndarray:
+        """returns the (N, 2) array of red marbles captured by each player at the end of the game of each
+        position"""
+        return self._records["final_captured"]
+
+    def position_bytes(self, index: int) -> bytes:
+        """returns the position of the record at index in the format of KubaCodec, ready for the from_bytes()
+        method of a KubaGame or KubaBitboard"""
+        record = self._records[index]
+        turn = None if record["turn"] == NO_PLAYER else int(record["turn"])
+        reverse_move = None if record["reverse_move"] == NO_MOVE else int(record["reverse_move"])
+        cells = record["cells"].ravel().tolist()
+        return KubaCodec.pack_position(cells, turn, None, int(record["captured"][0]), reverse_move)
@@ -0,0 +1,122 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the event classes a KubaGame publishes to its subscribers after each move.
+#               A subscriber is any callable passed to KubaGame.subscribe(). After each move made with make_move()
+#               or try_move() it is called once with the list of events of that move, in this order: a
+#               MarbleCaptured if a marble was pushed off, one MarblesShifted, and then TurnChanged, or
+#               GameFinished if the move won the game, so a copy of the board stays correct when the events are
+#               applied to it in order. The moves a search makes with push_move() and takes back with pop_move()
+#               are not published. Events are only built when a game has subscribers.
+
+# %%
+
+
+class KubaEvent:
+    """represents something that happened in a game of Kuba. kind names the type of event"""
+    __slots__ = ()
+    kind = "event"
+
+    def to_dict(self) -> dict:
+        """returns the event as a dictionary with its kind and data, ready to be sent as JSON"""
+        return {"kind": self.kind}
+
+
+class MarblesShifted(KubaEvent):
+    """represents the marbles a push moved to another cell of the board"""
+    __slots__ = ("_shifts",)
+    kind = "shifted"
+
+    def __init__(self, shifts: list) -> None:
+        """takes a list of (old coordinates, new coordinates) tuples, one per marble left on the board"""
+        self._shifts = shifts
+
+    def __repr__(self) -> str:
+        """defines the representation of the event"""
+        return f"MarblesShifted({self._shifts!r})"
+
+    def get_shifts(self) -> list:
+        """returns the (old coordinates, new coordinates) of each marble moved, starting with the marble
+        farthest along the push, so the shifts can be applied to a board one at a time in order"""
+        return self._shifts
+
+    def to_dict(self) -> dict:
+        """returns the event as a dictionary with its kind and shifts"""
+        return {"kind": self.kind, "shifts": [[list(old), list(new)] for old, new in self._shifts]}
+
+
+class MarbleCaptured(KubaEvent):
+    """represents a marble pushed off the board"""
+    __slots__ = ("_color", "_player_name", "_coordinates")
+    kind = "captured"
+
+    def __init__(self, color: str, player_name: str, coordinates: tuple) -> None:
+        """takes the color of the marble, the name of the player who captured it, and the cell it was pushed
+        off from"""
+        self._color = color
+        self._player_name = player_name
+        self._coordinates = coordinates
+
+    def __repr__(self) -> str:
+        """defines the representation of the event"""
+        return f"MarbleCaptured({self._color!r}, {self._player_name!r}, {self._coordinates!r})"
+
+    def get_color(self) -> str:
+        """returns the color of the captured marble"""
+        return self._color
+
+    def get_player_name(self) -> str:
+        """returns the name of the player who captured the marble"""
+        return self._player_name
+
+    def get_coordinates(self) -> tuple:
+        """returns the cell the marble was pushed off from"""
+        return self._coordinates
+
+    def to_dict(self) -> dict:
+        """returns the event as a dictionary with its kind, color, player and coordinates"""
+        return {"kind": self.kind, "color": self._color, "player": self._player_name,
+                "coordinates": list(self._coordinates)}
+
+
+class TurnChanged(KubaEvent):
+    """represents the turn passing to a player"""
+    __slots__ = ("_player_name",)
+    kind = "turn"
+
+    def __init__(self, player_name: str) -> None:
+        """takes the name of the player whose turn it now is"""
+        self._player_name = player_name
+
+    def __repr__(self) -> str:
+        """defines the representation of the event"""
+        return f"TurnChanged({self._player_name!r})"
+
+    def get_player_name(self) -> str:
+        """returns the name of the player whose turn it now is"""
+        return self._player_name
+
+    def to_dict(self) -> dict:
+        """returns the event as a dictionary with its kind and player"""
+        return {"kind": self.kind, "player": self._player_name}
+
+
+class GameFinished(KubaEvent):
+    """represents the end of a game"""
+    __slots__ = ("_winner",)
+    kind = "finished"
+
+    def __init__(self, winner: str) -> None:
+        """takes the name of the winner"""
+        self._winner = winner
+
+    def __repr__(self) -> str:
+        """defines the representation of the event"""
+        return f"GameFinished({self._winner!r})"
+
+    def get_winner(self) -> str:
+        """returns the name of the winner"""
+        return self._winner
+
+    def to_dict(self) -> dict:
+        """returns the event as a dictionary with its kind and winner"""
+        return {"kind": self.kind, "winner": self._winner}
@@ -0,0 +1,208 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains a differential fuzzer for the Kuba engines. It plays seeded random games on
+#               several engines in lockstep, making every move on each of them and comparing what make_move()
+#               returns and what get_marble(), get_marble_count(), get_captured(), get_current_turn() and
+#               get_winner() report after every ply. Most moves are legal moves, the rest are random and mostly
+#               illegal, so the rejection checks are compared as well as the pushes. A game that ends in a
+#               mismatch is shrunk until no run of its moves can be removed without losing the mismatch. Games are split
+#               across worker processes by seed, and every failure can be replayed from its moves alone.
+
+# %%
+import argparse
+import contextlib
+import multiprocessing
+import os
+import random
+import time
+
+import KubaGameBeta
+from KubaBitboard import KubaBitboard
+from KubaGame import KubaGame
+
+ENGINES = {"object": KubaGame, "bitboard": KubaBitboard, "beta": KubaGameBeta.KubaGame}
+PLAYERS = (("A", "W"), ("B", "B"))
+
+# names and directions used for random moves, including a player who is not in the game, a name in the wrong
+# case, and directions that are not L, R, F or B
+RANDOM_NAMES = ("A", "B", "A", "B", "a", "Z")
+RANDOM_DIRECTIONS = ("L", "R", "F", "B", "l", "b", "X")
+
+# KubaGameBeta prints the board and messages from make_move(), which the fuzzer sends here instead
+SILENT = open(os.devnull, "w")
+
+
+def observe(game) -> tuple:
+    """returns everything the fuzzer compares about a game as a tuple: every cell, the marble count, the red
+    marbles captured by each player, the player to move, and the winner. an engine that raises is observed as
+    the exception it raised"""
+    try:
+        cells = "".join(str(game.get_marble((row, col))) for row in range(7) for col in range(7))
+        winner = game.get_winner()
+        return (cells, tuple(game.get_marble_count()), game.get_captured(PLAYERS[0][0]),
+                game.get_captured(PLAYERS[1][0]), game.get_current_turn(), None if winner == None else str(winner))
+    except Exception as error:
+        return (f"raised {error!r}",)
+
+
+def describe(observation: tuple) -> str:
+    """returns a readable description of an observation made by observe()"""
+    if len(observation) == 1:
+        return observation[0]
+    cells, count, captured_1, captured_2, turn, winner = observation
+    rows = " ".join(cells[row * 7:row * 7 + 7] for row in range(7))
+    return f"board {rows} count {count} captured {captured_1}/{captured_2} turn {turn} winner {winner}"
+
+
+def make_move(game, move: tuple):
+    """makes a move on a game and returns what make_move() returned, or the exception it raised. anything the
+    engine prints is discarded"""
+    try:
+        with contextlib.redirect_stdout(SILENT):
+            return game.make_move(move[0], move[1], move[2])
+    except Exception as error:
+        return f"raised {error!r}"
+
+
+def play_lockstep(engine_names, moves) -> dict:
+    """makes the moves passed on a new game of each engine named and returns the first mismatch as a dictionary
+    with the ply (counting from 1, or 0 for the start position), what differed, and the value on each engine.
+    returns None if the engines agree throughout"""
+    games = [ENGINES[name](*PLAYERS) for name in engine_names]
+    observations = [observe(game) for game in games]
+    if len(set(observations)) > 1:
+        return {"ply": 0, "field": "position", "values": dict(zip(engine_names, map(describe, observations)))}
+    for ply, move in enumerate(moves, 1):
+        results = [make_move(game, move) for game in games]
+        if len(set(results)) > 1:
+            return {"ply": ply, "field": "make_move", "values": dict(zip(engine_names, results))}
+        observations = [observe(game) for game in games]
+        if len(set(observations)) > 1:
+            return {"ply": ply, "field": "position", "values": dict(zip(engine_names, map(describe, observations)))}
+    return None
+
+
+def random_moves(seed, max_moves: int = 300, legal_bias: float = 0.8) -> list:
+    """returns the moves of a seeded random game as (player name, coordinates, direction) tuples. with the
+    probability legal_bias a move is a legal move of the player to move on a KubaBitboard, otherwise it is
+    random and usually illegal. the game ends after max_moves moves or when it has been won"""
+    generator = random.Random(seed)
+    game = KubaBitboard(*PLAYERS)
+    first = generator.choice(PLAYERS)[0]
+    moves = []
+    while game.get_winner() == None and len(moves) < max_moves:
+        player_name = game.get_current_turn() or first
+        legal = game.legal_moves(player_name)
+        if len(legal) > 0 and generator.random() < legal_bias:
+            coordinates, direction = generator.choice(legal)
+            move = (player_name, coordinates, direction)
+        else:
+            move = (generator.choice(RANDOM_NAMES), (generator.randint(-1, 7), generator.randint(-1, 7)),
+                    generator.choice(RANDOM_DIRECTIONS))
+        game.make_move(move[0], move[1], move[2])
+        moves.append(move)
+    return moves
+
+
+def shrink(engine_names, moves, mismatch: dict) -> tuple:
+    """returns a shorter list of moves that still ends in a mismatch, with its mismatch, found by cutting the
+    game off at the failing ply and then removing ever smaller runs of moves while the engines still disagree"""
+    moves = list(moves[:mismatch["ply"]])
+    chunk = len(moves) // 2
+    while chunk >= 1:
+        start = 0
+        while start < len(moves):
+            candidate = moves[:start] + moves[start + chunk:]
+            found = play_lockstep(engine_names, candidate)
+            if found != None:
+                moves = candidate[:found["ply"]]
+                mismatch = found
+            else:
+                start += chunk
+        chunk //= 2
+    return moves, mismatch
+
+
+def fuzz_game(engine_names, seed, max_moves: int = 300, legal_bias: float = 0.8) -> tuple:
+    """plays the random game of the seed passed on the engines named and returns the number of moves played
+    with the failure found, a dictionary with the seed, the shrunk moves, and the mismatch they end in, or
+    None"""
+    moves = random_moves(seed, max_moves, legal_bias)
+    mismatch = play_lockstep(engine_names, moves)
+    if mismatch == None:
+        return len(moves), None
+    shrunk, mismatch = shrink(engine_names, moves, mismatch)
+    return len(moves), {"seed": seed, "moves": shrunk, "mismatch": mismatch}
+
+
+def run_fuzz_games(arguments: tuple) -> tuple:
+    """plays the games of a tuple (engine names, seeds, max_moves, legal_bias) in a worker process and returns
+    the number of games and moves played with the list of failures"""
+    engine_names, seeds, max_moves, legal_bias = arguments
+    moves = 0
+    failures = []
+    for seed in seeds:
+        played, failure = fuzz_game(engine_names, seed, max_moves, legal_bias)
+        moves += played
+        if failure != None:
+            failures.append(failure)
+    return len(seeds), moves, failures
+
+
+def fuzz(engine_names, games: int, seed: int = 0, workers: int = None, max_moves: int = 300,
+         legal_bias: float = 0.8, chunk: int = 20):
+    """plays games random games across worker processes, chunk games per task, and yields the result of each
+    task as run_fuzz_games() returns it, in the order the tasks finish. game number n uses the seed
+    "seed:n", so a failure can be reproduced with random_moves() or from its moves"""
+    tasks = []
+    for start in range(0, games, chunk):
+        seeds = [f"{seed}:{number}" for number in range(start, min(games, start + chunk))]
+        tasks.append((tuple(engine_names), seeds, max_moves, legal_bias))
+    with multiprocessing.Pool(workers or os.cpu_count() or 1) as pool:
+        for result in pool.imap_unordered(run_fuzz_games, tasks):
+            yield result
+
+
+def format_failure(failure: dict) -> str:
+    """returns a failure as text: its seed, the mismatch, and the moves that reproduce it"""
+    mismatch = failure["mismatch"]
+    lines = [f"seed {failure['seed']}: {mismatch['field']} differs at ply {mismatch['ply']} "
+             f"after {len(failure['moves'])} moves"]
+    for name, value in mismatch["values"].items():
+        lines.append(f"    {name}: {value}")
+    lines.append("    moves: " + repr(failure["moves"]))
+    return "\n".join(lines)
+
+
+def main():
+    """parses the command line and fuzzes the engines named, printing each failure. exits with status 1 if
+    any failure was found"""
+    parser = argparse.ArgumentParser(description="differential fuzzer for the Kuba engines")
+    parser.add_argument("--engines", nargs="+", choices=tuple(ENGINES), default=list(ENGINES))
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, one per CPU by default")
+    parser.add_argument("--max-moves", type=int, default=300)
+    parser.add_argument("--legal-bias", type=float, default=0.8, help="share of moves chosen from the legal moves")
+    args = parser.parse_args()
+    if len(args.engines) < 2:
+        parser.error("at least two engines are needed")
+
+    start = time.perf_counter()
+    games = 0
+    moves = 0
+    failures = 0
+    for task_games, task_moves, task_failures in fuzz(args.engines, args.games, args.seed, args.workers,
+                                                      args.max_moves, args.legal_bias):
+        games += task_games
+        moves += task_moves
+        for failure in task_failures:
+            failures += 1
+            print(format_failure(failure))
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {moves} moves in {elapsed:.1f} s ({moves / elapsed:.0f} moves/s), {failures} failures")
+    raise SystemExit(1 if failures > 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,90 @@
 #               objects.
 
 # %%
+import enum
+import random
+
+import KubaCodec
+from KubaEvents import GameFinished, MarbleCaptured, MarblesShifted, TurnChanged
+
+# directions in the order used for direction indexes, and the (row, col) step of a marble pushed that way
+DIRECTIONS = ("L", "R", "F", "B")
+DIRECTION_STEPS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+DIRECTION_INDEXES = {"l": 0, "r": 1, "f": 2, "b": 3}
+
+
+class MoveStatus(enum.IntEnum):
+    """the result of checking a move. LEGAL for a move that can be made, otherwise the first check the move failed, in the order make_move() checks them. the members are shared constants, so returning one allocates nothing"""
+    LEGAL = 0
+    FINISHED = 1            # the game is over
+    UNKNOWN_PLAYER = 2      # the player name is not one of the players
+    WRONG_TURN = 3          # it is the other player's turn
+    NO_LEGAL_MOVES = 4      # the player has no legal moves
+    OUT_OF_RANGE = 5        # the coordinates are off the board
+    EMPTY_CELL = 6          # there is no marble in the cell
+    OPPONENT_MARBLE = 7     # the marble belongs to the opponent
+    BAD_DIRECTION = 8       # the direction is not L, R, F, or B
+    REVERSE_MOVE = 9        # the move would undo the opponent's last move
+    BLOCKED_BEHIND = 10     # the cell behind the marble holds a marble
+    SELF_CAPTURE = 11       # the move would push off one of the player's own marbles
+
+
+# one shared (row, col) tuple per cell, so moving a Marble does not allocate a new position tuple
+COORDINATES = tuple(tuple((row, col) for col in range(7)) for row in range(7))
+
+# a cell (row, col) is bit row * 7 + col of an occupancy mask. the column masks stop shifted rows from wrapping
+BOARD_MASK = (1 << 49) - 1
+FIRST_COLUMN = sum(1 << (row * 7) for row in range(7))
+LAST_COLUMN = FIRST_COLUMN << 6
+
+# for each direction in DIRECTIONS, the cells a marble is pushed off the board from
+PUSH_OFF_EDGES = (FIRST_COLUMN, LAST_COLUMN, 0b1111111, 0b1111111 << 42)
+
+
+def make_rays() -> tuple:
+    """builds, for each direction index and cell, the mask of every cell from the cell to the edge of the board in that direction"""
+    rays = [[] for index in range(4)]
+    for row in range(7):
+        for col in range(7):
+            for index, (row_step, col_step) in enumerate(DIRECTION_STEPS):
+                ray = 0
+                ray_row = row
+                ray_col = col
+                while 0 <= ray_row <= 6 and 0 <= ray_col <= 6:
+                    ray |= 1 << (ray_row * 7 + ray_col)
+                    ray_row += row_step
+                    ray_col += col_step
+                rays[index].append(ray)
+    return tuple(tuple(ray) for ray in rays)
+
+
+RAYS = make_rays()
+
+
+def make_zobrist_keys(seed: int) -> tuple:
+    """creates the random 64-bit keys used to hash a position. returns a tuple of tuples indexed by player (0 for player 1, 1 for player 2): the key of a marble on each of the 49 cells (row * 7 + col), with the red marbles' keys at index 2, the key of the player to move, and the keys of each possible count of captured red and opponent marbles. keys belong to players rather than colors, so a game hashes the same way whatever colors its players chose"""
+    generator = random.Random(seed)
+    marbles = tuple(tuple(generator.getrandbits(64) for cell in range(49)) for owner in range(3))
+    turn = []
+    captured_neutral = []
+    captured_opponent = []
+    for player in range(2):
+        turn.append(generator.getrandbits(64))
+        captured_neutral.append(tuple(generator.getrandbits(64) for count in range(8)))
+        captured_opponent.append(tuple(generator.getrandbits(64) for count in range(9)))
+    return marbles, tuple(turn), tuple(captured_neutral), tuple(captured_opponent)
+
+
+# the keys come from a fixed seed so a position hashes to the same value in every process
+ZOBRIST_MARBLES, ZOBRIST_TURN, ZOBRIST_CAPTURED_NEUTRAL, ZOBRIST_CAPTURED_OPPONENT = make_zobrist_keys(20210531)
+
+
 class Player:
     """represents a player in a game of Kuba. will communicate with the KubaGame class in order to initialize a Player object and update its private data members (owned_marbles, captured_neutral, captured_opponent, legal_moves)."""
 
+    __slots__ = ("_name", "_color", "_owned_marbles", "_captured_neutral", "_captured_opponent",
+                 "_num_captured_neutral", "_num_captured_opponent", "_legal_moves")
+
     def __init__(self, name: str, color: str) -> None:
         """takes two parameters, name:string and color:string, in order to create private data members for a new player"""
         self._name = name
@@ -15,6 +96,8 @@ class Player:
         self._owned_marbles = []
         self._captured_neutral = []
         self._captured_opponent = []
+        self._num_captured_neutral = 0
+        self._num_captured_opponent = 0
         self._legal_moves = True
         return
 
@@ -38,6 +121,14 @@ class Player:
         """returns a list of captured opponent Marbles by the Player"""
         return self._captured_opponent
 
+    def get_num_captured_neutral(self) -> int:
+        """returns the number of Red Marbles captured by the Player"""
+        return self._num_captured_neutral
+
+    def get_num_captured_opponent(self) -> int:
+        """returns the number of opponent Marbles captured by the Player"""
+        return self._num_captured_opponent
+
     def get_owned_marbles(self) -> list:
         """returns the marbles that are owned by the Player"""
         return self._owned_marbles
@@ -54,13 +145,25 @@ class Player:
     def add_captured_neutral(self, captured_marble):
         """adds a neutral Marble to the list of captured neutral Marbles"""
         self._captured_neutral.append(captured_marble)
+        self._num_captured_neutral += 1
         return
 
     def add_captured_opponent(self, captured_marble):
         """adds an opponent Marble to the list of captured opponent Marbles"""
         self._captured_opponent.append(captured_marble)
+        self._num_captured_opponent += 1
         return
 
+    def remove_captured_neutral(self):
+        """removes and returns the last Marble added to the list of captured neutral Marbles"""
+        self._num_captured_neutral -= 1
+        return self._captured_neutral.pop()
+
+    def remove_captured_opponent(self):
+        """removes and returns the last Marble added to the list of captured opponent Marbles"""
+        self._num_captured_opponent -= 1
+        return self._captured_opponent.pop()
+
     def add_owned_marble(self, marble):
         """adds a marble to the ownership of the Player"""
         self._owned_marbles.append(marble)
@@ -70,6 +173,8 @@ class Player:
 class Marble:
     """represents a marble in a game of Kuba. will commuincate with the KubaGame class to initialize each Marble object for a new game of Kuba. all private data members of the Marble class will be set and updated by the KubaGame class. KubaGame class will update it's private data members as the game progresses"""
 
+    __slots__ = ("_color", "_owner", "_captured", "_position")
+
     def __init__(self, color: str, owner, position: tuple) -> None:
         """assigns a color, owner, and position to initialize a marble. colors can only be R, B, or W (corresponding to red, black, or white)"""
         self._color = color
@@ -112,17 +217,31 @@ class Marble:
 class KubaGame:
     """represents a game of Kuba, the board game. must commuincate with the Marble and Player classes to get data about each object in the game using its built-in methods. KubaGame class will update all external object data using defined methods."""
 
+    __slots__ = ("_player_1", "_player_2", "_players", "_marbles", "_marble_counts", "_status", "_current_turn",
+                 "_winner", "_reverse_move", "_last_move", "_undo_stack", "_board", "_occupied", "_owner_masks", "_hash", "_marble_keys", "_instruments", "_rejection",
+                 "_subscribers")
+
     def __init__(self, tuple_1: tuple, tuple_2: tuple) -> None:
         """initializes a new game of Kuba. takes two tuples with parameters: (player name, player color) in order to create new Players and assign colors to them. this method will use these new Player objects to update the list of players and create a new board for the Players."""
         self._player_1 = Player(tuple_1[0], tuple_1[1])
         self._player_2 = Player(tuple_2[0], tuple_2[1])
         self._players = (self._player_1, self._player_2)
+        self._marble_keys = {self._player_1: ZOBRIST_MARBLES[0], self._player_2: ZOBRIST_MARBLES[1], None: ZOBRIST_MARBLES[2]}
         self._marbles = []
+        self._marble_counts = {"W": 0, "B": 0, "R": 0}
         self._status = "UNFINISHED"
         self._current_turn = None
         self._winner = None
         self._reverse_move = None
+        self._last_move = None
+        self._undo_stack = []
+        self._instruments = None
+        self._rejection = MoveStatus.LEGAL
+        self._subscribers = []
+        self._occupied = 0
+        self._owner_masks = {self._player_1: 0, self._player_2: 0, None: 0}
         self._board = self.make_board()
+        self._hash = self.compute_hash()
 
     def get_player_1(self) -> Player:
         """returns the player_1 object"""
@@ -136,6 +255,56 @@ class KubaGame:
         """returns the current players of the game in a tuple"""
         return self._players
 
+    def get_player_names(self) -> tuple:
+        """returns the names of player 1 and player 2 as a tuple"""
+        return (self._player_1.get_name(), self._player_2.get_name())
+
+    def get_player_colors(self) -> tuple:
+        """returns the colors of player 1 and player 2 as a tuple"""
+        return (self._player_1.get_color(), self._player_2.get_color())
+
+    def get_instruments(self):
+        """returns the KubaInstruments recording this game's calls, or None"""
+        return self._instruments
+
+    def set_instruments(self, instruments):
+        """attaches a KubaInstruments object to record the time taken by make_move(), validate_move() and game_over_check(), the reasons moves are rejected, and the marbles moved by each push. pass None to stop recording"""
+        self._instruments = instruments
+        return
+
+    def subscribe(self, subscriber):
+        """adds a subscriber, a callable that is passed the list of KubaEvents of each move made with make_move() or try_move() from now on. moves made with push_move(), push_resolved() or push(), which searches make and take back, are not published, and neither are positions set with from_bytes(), so a subscriber following a game set up that way should read the board again. returns the subscriber"""
+        self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """removes a subscriber added with subscribe()"""
+        self._subscribers.remove(subscriber)
+        return
+
+    def publish_push(self):
+        """builds the events of the push that has just been made and passes them to every subscriber"""
+        coordinates, index, block, player, captured = self._last_move
+        row_step, col_step = DIRECTION_STEPS[index]
+        shifts = []
+        events = []
+        for marble in reversed(block):
+            if marble.is_captured() == True:
+                last = len(block) - 1
+                origin = COORDINATES[coordinates[0] + row_step * last][coordinates[1] + col_step * last]
+                events.append(MarbleCaptured(marble.get_color(), player.get_name(), origin))
+                continue
+            row, col = marble.get_position()
+            shifts.append((COORDINATES[row - row_step][col - col_step], COORDINATES[row][col]))
+        events.append(MarblesShifted(shifts))
+        if self._winner == None:
+            events.append(TurnChanged(self._current_turn.get_name()))
+        else:
+            events.append(GameFinished(self._winner.get_name()))
+        for subscriber in list(self._subscribers):
+            subscriber(events)
+        return
+
     def get_status(self) -> str:
         """returns the status of the game"""
         return self._status
@@ -157,6 +326,12 @@ class KubaGame:
         """returns the winner of the game"""
         return self._winner
 
+    def get_winner_index(self):
+        """returns the index of the winner of the game, 0 for player 1 and 1 for player 2, or None if the game is not over"""
+        if self._winner == None:
+            return None
+        return self._players.index(self._winner)
+
     def get_marbles(self) -> list:
         """returns the list of all marbles in the game"""
         return self._marbles
@@ -175,9 +350,114 @@ class KubaGame:
 
     def set_current_turn(self, player: Player):
         """updates the current turn of the game to the player passed as parameter"""
+        if self._current_turn != None:
+            self._hash ^= ZOBRIST_TURN[self._players.index(self._current_turn)]
+        if player != None:
+            self._hash ^= ZOBRIST_TURN[self._players.index(player)]
         self._current_turn = player
         return
 
+    def position_hash(self) -> int:
+        """returns the 64-bit Zobrist hash of the current position, which covers the marbles on the board, the player to move, and the number of marbles captured by each player"""
+        return self._hash
+
+    def compute_hash(self) -> int:
+        """computes the Zobrist hash of the current position from scratch. make_move() keeps the hash up to date, so this is only needed for a new board"""
+        position_hash = 0
+        for marble in self.get_marbles():
+            if marble.is_captured() == False:
+                row, col = marble.get_position()
+                position_hash ^= self._marble_keys[marble.get_owner()][row * 7 + col]
+        players = self.get_players()
+        if self._current_turn != None:
+            position_hash ^= ZOBRIST_TURN[players.index(self._current_turn)]
+        for index, player in enumerate(players):
+            position_hash ^= ZOBRIST_CAPTURED_NEUTRAL[index][player.get_num_captured_neutral()]
+            position_hash ^= ZOBRIST_CAPTURED_OPPONENT[index][player.get_num_captured_opponent()]
+        return position_hash
+
+    def to_bytes(self) -> bytes:
+        """packs the current position into KubaCodec.POSITION_SIZE bytes: every cell of the board, the player to move, the winner, the red marbles captured, and the reverse move. the player names, colors, and undo stack are not stored"""
+        players = self.get_players()
+        cells = []
+        for row in self.get_board():
+            for marble in row:
+                if marble == "X":
+                    cells.append(KubaCodec.EMPTY)
+                elif marble.get_owner() == None:
+                    cells.append(KubaCodec.RED)
+                else:
+                    cells.append(players.index(marble.get_owner()) + 1)
+        turn = None if self._current_turn == None else players.index(self._current_turn)
+        winner = None if self._winner == None else players.index(self._winner)
+        reverse_move = None
+        if self._reverse_move != None:
+            reverse_move = KubaCodec.encode_move(self._reverse_move[0], self._reverse_move[1])
+        return KubaCodec.pack_position(cells, turn, winner, self._player_1.get_num_captured_neutral(), reverse_move)
+
+    def from_bytes(self, data: bytes):
+        """sets up the position packed by to_bytes() on this game, reusing its Marble objects. the marbles left off the board are put in the captured lists of the player who captured them, and the undo stack is cleared. raises ValueError if the data is not a packed position"""
+        cells, turn, winner, captured_neutral, captured_opponent, reverse_move = KubaCodec.unpack_position(data)
+        players = self.get_players()
+        board = self.get_board()
+        occupied = 0
+        owner_masks = {self._player_1: 0, self._player_2: 0, None: 0}
+
+        # hand out each group of marbles to the cells holding that group's value, in cell order
+        groups = {KubaCodec.PLAYER_1: list(self._player_1.get_owned_marbles()),
+                  KubaCodec.PLAYER_2: list(self._player_2.get_owned_marbles()),
+                  KubaCodec.RED: [marble for marble in self.get_marbles() if marble.get_owner() == None]}
+        for cell, value in enumerate(cells):
+            row, col = COORDINATES[cell // 7][cell % 7]
+            if value == KubaCodec.EMPTY:
+                board[row][col] = "X"
+                continue
+            marble = groups[value].pop()
+            marble.set_captured(False)
+            marble.set_position(COORDINATES[row][col])
+            board[row][col] = marble
+            occupied |= 1 << cell
+            owner_masks[marble.get_owner()] |= 1 << cell
+
+        # the marbles left over have been captured
+        for player in players:
+            while player.get_num_captured_neutral() > 0:
+                player.remove_captured_neutral()
+            while player.get_num_captured_opponent() > 0:
+                player.remove_captured_opponent()
+        for marble in groups[KubaCodec.PLAYER_1] + groups[KubaCodec.PLAYER_2] + groups[KubaCodec.RED]:
+            marble.set_captured(True)
+            marble.set_position((-1, -1))
+            if marble.get_owner() == self._player_1:
+                self._player_2.add_captured_opponent(marble)
+            elif marble.get_owner() == self._player_2:
+                self._player_1.add_captured_opponent(marble)
+            elif self._player_1.get_num_captured_neutral() < captured_neutral[0]:
+                self._player_1.add_captured_neutral(marble)
+            else:
+                self._player_2.add_captured_neutral(marble)
+
+        # rebuild the data kept up to date by make_move()
+        self._marble_counts = {"W": 0, "B": 0, "R": 0}
+        for marble in self.get_marbles():
+            if marble.is_captured() == False:
+                color = marble.get_color()
+                self._marble_counts[color] = self._marble_counts.get(color, 0) + 1
+        self._occupied = occupied
+        self._owner_masks = owner_masks
+        self._current_turn = None if turn == None else players[turn]
+        self._winner = None if winner == None else players[winner]
+        self._status = "UNFINISHED" if winner == None else "FINISHED"
+        self._player_1.set_legal_moves(winner == None)
+        self._player_2.set_legal_moves(winner == None)
+        self._reverse_move = None
+        if reverse_move != None:
+            self._reverse_move = KubaCodec.decode_move(reverse_move)
+        self._last_move = None
+        self._undo_stack = []
+        self._hash = self.compute_hash()
+        return
+
     def get_board(self) -> list:
         """returns the current state of the board as a two-dimensional list"""
         return self._board
@@ -203,9 +483,14 @@ class KubaGame:
                 new_marble = Marble(player.get_color(), player, position)
                 player.add_owned_marble(new_marble)
                 self._marbles.append(new_marble)
+                color = new_marble.get_color()
+                self._marble_counts[color] = self._marble_counts.get(color, 0) + 1
                 row = position[0]
                 column = position[1]
                 board[row][column] = new_marble
+                bit = 1 << (row * 7 + column)
+                self._occupied |= bit
+                self._owner_masks[player] |= bit
 
         # function to create and place neutral marbles to reduce clutter
         def create_neutral_marbles():
@@ -215,9 +500,13 @@ class KubaGame:
             for position in neutral_positions:
                 new_marble = Marble("R", None, position)
                 self._marbles.append(new_marble)
+                self._marble_counts["R"] += 1
                 row = position[0]
                 column = position[1]
                 board[row][column] = new_marble
+                bit = 1 << (row * 7 + column)
+                self._occupied |= bit
+                self._owner_masks[None] |= bit
 
         # call functions to solidify changes in data
         create_player_marbles(player_1, player_1_positions)
@@ -236,233 +525,332 @@ class KubaGame:
             print()
         return
 
+    def pushable_masks(self) -> tuple:
+        """returns, for each direction in DIRECTIONS, the cells holding a marble with an empty cell (or the edge of the board) behind it as a bitmask. they are worked out from the occupancy mask when needed, so make_move() only has to update two bits of it"""
+        occupied = self._occupied
+        return (occupied & ~((occupied >> 1) & ~LAST_COLUMN),      # pushed left, the cell behind is to the right
+                occupied & ~((occupied << 1) & ~FIRST_COLUMN),     # pushed right, the cell behind is to the left
+                occupied & ~(occupied >> 7),                       # pushed forward, the cell behind is below
+                occupied & ~(occupied << 7))                       # pushed backward, the cell behind is above
+
+    def legal_moves(self, player_name: str) -> list:
+        """returns every move the player identified as player_name can make as a list of (coordinates, direction) tuples. each move in the list is one that make_move() would accept, including the reverse move and self-capture checks"""
+
+        # check if the game is over, the Player name is valid, and it is the Player's turn
+        if self.get_status() == "FINISHED":
+            return []
+        lowered = player_name.lower()
+        if lowered != self._player_1.get_name().lower() and lowered != self._player_2.get_name().lower():
+            return []
+        player = 0
+        if self._player_2.get_name() == player_name:
+            player = 1
+        if self._current_turn == self._players[1 - player]:
+            return []
+        return [(COORDINATES[cell // 7][cell % 7], DIRECTIONS[index]) for player, cell, index in self.legal_pushes(player)]
+
+    def legal_pushes(self, player: int) -> list:
+        """returns every push the player index passed (0 for player 1, 1 for player 2) can make as (player, cell, direction index) tuples that can be passed straight to push(). cells are numbered row * 7 + col and direction indexes follow DIRECTIONS. whose turn it is is not checked"""
+        return list(self.generate_pushes(player))
+
+    def has_legal_push(self, player: int) -> bool:
+        """returns True if the player index passed has a push legal_pushes() would return. the pushes are checked a direction at a time with the same masks as generate_pushes(), stopping at the first legal one"""
+        empty = ~self._occupied & BOARD_MASK
+        own = self._owner_masks[self._players[player]]
+        movable = own | self._owner_masks[None]
+        reverse_move = self._reverse_move
+        for index, pushable in enumerate(self.pushable_masks()):
+            candidates = pushable & movable
+            if reverse_move != None and DIRECTION_INDEXES[reverse_move[1].lower()] == index:
+                candidates &= ~(1 << (reverse_move[0][0] * 7 + reverse_move[0][1]))
+            own_edge = PUSH_OFF_EDGES[index] & own
+            rays = RAYS[index]
+            while candidates:
+                low_bit = candidates & -candidates
+                ray = rays[low_bit.bit_length() - 1]
+                if ray & empty or not ray & own_edge:
+                    return True         # the push does not push off the player's own Marble
+                candidates ^= low_bit
+        return False
+
+    def generate_pushes(self, player: int):
+        """yields the pushes legal_pushes() returns one at a time, in cell order and then direction order. each push is found with the masks alone: the cell holds one of the player's Marbles or a red Marble, the cell behind it is empty or off the board, the push is not the reverse move, and the line from the cell to the edge is not a full line that would push off one of the player's own Marbles"""
+        empty = ~self._occupied & BOARD_MASK
+        own = self._owner_masks[self._players[player]]
+        masks = self.pushable_masks()
+        reverse_cell = -1
+        reverse_index = -1
+        if self._reverse_move != None:
+            (row, col), direction = self._reverse_move
+            reverse_cell = row * 7 + col
+            reverse_index = DIRECTION_INDEXES[direction.lower()]
+        cells = (masks[0] | masks[1] | masks[2] | masks[3]) & (own | self._owner_masks[None])
+        while cells:
+            low_bit = cells & -cells
+            cells ^= low_bit
+            cell = low_bit.bit_length() - 1
+            for index in range(4):
+                if masks[index] & low_bit == 0:
+                    continue            # the cell behind holds a marble
+                if cell == reverse_cell and index == reverse_index:
+                    continue            # move is a reverse move
+                ray = RAYS[index][cell]
+                if ray & empty == 0 and ray & PUSH_OFF_EDGES[index] & own:
+                    continue            # move would push off the player's own Marble
+                yield (player, cell, index)
+        return
+
     def validate_move(self, player_name: str, coordinates: tuple, direction: str) -> bool:
-        """helper function to validate a move before making a move. takes the same parameters as KubaGame.make_move() and parses through the passed parameters to make sure the move is legal. returns true if move is legal."""
+        """helper function to validate a move before making a move. takes the same parameters as KubaGame.make_move() and parses through the passed parameters to make sure the move is legal. returns true if move is legal. a push that would push off one of the player's own marbles is only detected by make_move()"""
+        if self._instruments != None:
+            return self._instruments.validate_move(self, player_name, coordinates, direction)
+        return self.resolve_move(player_name, coordinates, direction) != None
+
+    def resolve_move(self, player_name: str, coordinates: tuple, direction: str):
+        """parses and validates a move passed the same way as to make_move(). returns the move as a tuple (player index, cell, direction index) that can be passed to push() if it is legal, otherwise returns None and get_rejection() returns the reason"""
 
         # check if the game is over
-        if self.get_status() == "FINISHED":
-            return False                # game is over
+        if self._status == "FINISHED":
+            self._rejection = MoveStatus.FINISHED
+            return None                 # game is over
 
         # check if Player name is valid
-        players = self.get_players()
-        player_names = []
-        for each_player in players:
-            player_names.append(each_player.get_name().lower())
-        if player_name.lower() not in player_names:
-            return False                # player name is invalid
+        lowered = player_name.lower()
+        if lowered != self._player_1.get_name().lower() and lowered != self._player_2.get_name().lower():
+            self._rejection = MoveStatus.UNKNOWN_PLAYER
+            return None                 # player name is invalid
 
         # identify Players
-        player = self.get_player_1()
-        opponent = self.get_player_2()
-        if self.get_player_2().get_name() == player_name:
-            opponent = self.get_player_1()
-            player = self.get_player_2()
+        player = 0
+        if self._player_2.get_name() == player_name:
+            player = 1
+        opponent = self._players[1 - player]
 
         # check if it is the Player's turn
-        if self.get_current_turn() == opponent.get_name():
-            return False                # it is the other player's turn
+        if self._current_turn == opponent:
+            self._rejection = MoveStatus.WRONG_TURN
+            return None                 # it is the other player's turn
 
         # check if player has legal moves
-        if player.has_legal_moves() == False:
-            return False
-
-        # identify cell to move
-        row_cood = coordinates[0]
-        col_cood = coordinates[1]
+        if self._players[player].has_legal_moves() == False:
+            self._rejection = MoveStatus.NO_LEGAL_MOVES
+            return None
 
         # cell requested is out of range
-        if row_cood < 0:
-            return False
-        if row_cood > 6:
-            return False
-        if col_cood < 0:
-            return False
-        if col_cood > 6:
-            return False
+        row = coordinates[0]
+        col = coordinates[1]
+        if row < 0 or row > 6 or col < 0 or col > 6:
+            self._rejection = MoveStatus.OUT_OF_RANGE
+            return None
 
         # identify Marble
-        marble_to_move = self.get_board()[row_cood][col_cood]
+        marble_to_move = self._board[row][col]
         if marble_to_move == "X":
-            return False                # the cell is empty
-
-        # Check if Player owns Marble
+            self._rejection = MoveStatus.EMPTY_CELL
+            return None                 # the cell is empty
         if marble_to_move.get_owner() == opponent:
-            return False                # Marble belongs to the opponent
-
-        # identify coordinate behind Marble
-        row_cood_behind = row_cood
-        col_cood_behind = col_cood
-        if direction.lower() == "r":
-            col_cood_behind -= 1
-        elif direction.lower() == "l":
-            col_cood_behind += 1
-        elif direction.lower() == "f":
-            row_cood_behind += 1
-        elif direction.lower() == "b":
-            row_cood_behind -= 1
-        else:
-            return False                # direction is invalid
+            self._rejection = MoveStatus.OPPONENT_MARBLE
+            return None                 # Marble belongs to the opponent
+
+        # identify direction
+        index = DIRECTION_INDEXES.get(direction.lower())
+        if index == None:
+            self._rejection = MoveStatus.BAD_DIRECTION
+            return None                 # direction is invalid
 
         # check if move requested is a reverse move
-        if self.get_reverse_move() == (coordinates, direction.upper()):
-            return False
+        if self._reverse_move == ((row, col), DIRECTIONS[index]):
+            self._rejection = MoveStatus.REVERSE_MOVE
+            return None
 
         # check if the coordinate behind is empty
-        while True:
-            if row_cood_behind < 0:
-                break
-            if row_cood_behind > 6:
-                break
-            if col_cood_behind < 0:
-                break
-            if col_cood_behind > 6:
-                break
-            if self.get_board()[row_cood_behind][col_cood_behind] == "X":
-                break
-            return False
+        row_behind = row - DIRECTION_STEPS[index][0]
+        col_behind = col - DIRECTION_STEPS[index][1]
+        if 0 <= row_behind <= 6 and 0 <= col_behind <= 6 and self._board[row_behind][col_behind] != "X":
+            self._rejection = MoveStatus.BLOCKED_BEHIND
+            return None
 
         # all checks have passed
-        return True
+        return (player, row * 7 + col, index)
+
+    def get_rejection(self) -> MoveStatus:
+        """returns the reason the last move rejected by resolve_move() was rejected"""
+        return self._rejection
+
+    def check_move(self, player_name: str, coordinates: tuple, direction: str) -> MoveStatus:
+        """same as validate_move(), but returns MoveStatus.LEGAL for a legal move and the reason the move is illegal otherwise. like validate_move(), a push that would push off one of the player's own marbles is only detected by making the move"""
+        if self.resolve_move(player_name, coordinates, direction) == None:
+            return self._rejection
+        return MoveStatus.LEGAL
+
+    def try_move(self, player_name: str, coordinates: tuple, direction: str) -> MoveStatus:
+        """same as make_move(), but returns MoveStatus.LEGAL if the move has been executed and the reason the move is illegal otherwise"""
+        move = self.resolve_move(player_name, coordinates, direction)
+        if move == None:
+            return self._rejection
+        if self.push(move[0], move[1], move[2]) == False:
+            return MoveStatus.SELF_CAPTURE
+        if self._subscribers:
+            self.publish_push()
+        return MoveStatus.LEGAL
 
     def make_move(self, player_name: str, coordinates: tuple, direction: str) -> bool:
         """makes a move requested by the player identified as playername. the coordinates of the marble correspond with the marble requested to move. the only possible legal directions are: L, R, F, or B (corresponding with left, right, forward, or backward respectively). will  update Marble positions as needed by updating both the private Marble data member and the board two-dimensional array. Returns True if the move has been executed; otherwise it returns False to indicate an illegal move."""
-
-        # validate move
-        valid_move = self.validate_move(player_name, coordinates, direction)
-        if valid_move == False:
+        if self._instruments != None:
+            return self._instruments.make_move(self, player_name, coordinates, direction)
+        move = self.resolve_move(player_name, coordinates, direction)
+        if move == None:
             # print("Sorry this is an invalid move. Try again.")
             return False
+        if self.push(move[0], move[1], move[2]) == False:
+            return False
+        if self._subscribers:
+            self.publish_push()
+        return True
 
-        def next_coordinate(orignal_coordinate: tuple, direction_req: str) -> tuple:
-            """given a starting coordinate and direction, will return the next coordinate requested"""
-
-            original_row = orignal_coordinate[0]
-            original_col = orignal_coordinate[1]
-            new_row = original_row
-            new_col = original_col
-
-            # determine new coordinates for Marble
-            if direction_req.lower() == "l":
-                new_col -= 1
-            if direction_req.lower() == "r":
-                new_col += 1
-            if direction_req.lower() == "f":
-                new_row -= 1
-            if direction_req.lower() == "b":
-                new_row += 1
-
-            return (new_row, new_col)
-
-        # moves a singular Marble on the board
-        def move_marble(marble: Marble, dir: str) -> Marble:
-            """this function will move one Marble in a particular direction on the board. If the move requested moves the Marble off of the board, then that Marble will be returned"""
-
-            # initialize ID variables
-            board = self.get_board()
-            cell = marble.get_position()
-            original_row = cell[0]
-            original_col = cell[1]
-            new_row = next_coordinate(cell, dir)[0]
-            new_col = next_coordinate(cell, dir)[1]
-
-            # replace current cell with "X"
-            board[original_row][original_col] = "X"
-
-            # determine if Marble is captured
-            if new_col < 0:
-                return marble
-            if new_col > 6:
-                return marble
-            if new_row < 0:
-                return marble
-            if new_row > 6:
-                return marble
-
-            # otherwise, place marble in new location
-            board[new_row][new_col] = marble
-            marble.set_position((new_row, new_col))
-            return None
-
-        # identify player object
-        current_player = self.get_player_1()
-        opponent_player = self.get_player_2()
-        if player_name == self.get_player_2().get_name():
-            current_player = self.get_player_2()
-            opponent_player = self.get_player_1()
+    def push(self, player: int, cell: int, index: int) -> bool:
+        """pushes the line of Marbles starting at cell (row * 7 + col) in the direction with index in DIRECTIONS for the player index passed. the move must already be validated by resolve_move() or come from legal_pushes(), so no names or direction strings are parsed. returns False without changing the game if the push would push off one of the player's own Marbles"""
+        current_player = self._players[player]
+        opponent_player = self._players[1 - player]
+        board = self.get_board()
+        coordinates = COORDINATES[cell // 7][cell % 7]
+        row_step, col_step = DIRECTION_STEPS[index]
 
         # identify block of Marbles to move, and store in an array
-        board = self.get_board()
-        marble_present = True
-        current_coordinate = coordinates
+        row = coordinates[0] + row_step
+        col = coordinates[1] + col_step
         block_of_marbles = [board[coordinates[0]][coordinates[1]]]
-        while marble_present == True:
-            current_coordinate = next_coordinate(current_coordinate, direction)
-            if current_coordinate[0] not in (0, 1, 2, 3, 4, 5, 6):
-                break
-            if current_coordinate[1] not in (0, 1, 2, 3, 4, 5, 6):
-                break
-            next_marble = board[current_coordinate[0]][current_coordinate[1]]
+        while 0 <= row <= 6 and 0 <= col <= 6:
+            next_marble = board[row][col]
             if next_marble == "X":
-                marble_present = False
-            else:
-                block_of_marbles.append(next_marble)
+                break
+            block_of_marbles.append(next_marble)
+            row += row_step
+            col += col_step
+        else:
+            # the last Marble of the block is pushed off the board, which cannot be the player's own
+            if block_of_marbles[-1].get_owner() == current_player:
+                return False
 
         # move marbles, starting from the last marble
-        rev_block_marbles = block_of_marbles[::-1]
         captured = False    # will be updated to True if a Marble is captured
-        for each_marble in rev_block_marbles:
-            captured_marble = move_marble(each_marble, direction)
-            if captured_marble != None:
-
-                # check if captured marble is owned by current player
-                if captured_marble.get_owner() == current_player:
-                    false_marble_coods = captured_marble.get_position()
-                    board[false_marble_coods[0]
-                          ][false_marble_coods[1]] = captured_marble
-                    # print("Sorry this is an invalid move. Try again.")
-                    return False
-
-                captured_marble.set_captured(True)
-                captured_marble.set_position((-1, -1))
-                if captured_marble.get_color().lower() == "r":
-                    current_player.add_captured_neutral(captured_marble)
-                    captured = True
-                else:
-                    current_player.add_captured_opponent(captured_marble)
-                    captured = True
+        owner_masks = self._owner_masks
+        for marble in reversed(block_of_marbles):
+            original_row, original_col = marble.get_position()
+            new_row = original_row + row_step
+            new_col = original_col + col_step
+            board[original_row][original_col] = "X"
+            owner = marble.get_owner()
+            keys = self._marble_keys[owner]
+            if 0 <= new_row <= 6 and 0 <= new_col <= 6:
+                board[new_row][new_col] = marble
+                marble.set_position(COORDINATES[new_row][new_col])
+                self._hash ^= keys[original_row * 7 + original_col] ^ keys[new_row * 7 + new_col]
+                owner_masks[owner] ^= 1 << (original_row * 7 + original_col) | 1 << (new_row * 7 + new_col)
+                continue
+
+            # the Marble has been pushed off the board and is captured by the current player
+            color = marble.get_color()
+            marble.set_captured(True)
+            self._hash ^= keys[original_row * 7 + original_col]
+            owner_masks[owner] ^= 1 << (original_row * 7 + original_col)
+            marble.set_position((-1, -1))
+            self._marble_counts[color] -= 1
+            if color.lower() == "r":
+                count = current_player.get_num_captured_neutral()
+                self._hash ^= ZOBRIST_CAPTURED_NEUTRAL[player][count] ^ ZOBRIST_CAPTURED_NEUTRAL[player][count + 1]
+                current_player.add_captured_neutral(marble)
+            else:
+                count = current_player.get_num_captured_opponent()
+                self._hash ^= ZOBRIST_CAPTURED_OPPONENT[player][count] ^ ZOBRIST_CAPTURED_OPPONENT[player][count + 1]
+                current_player.add_captured_opponent(marble)
+            captured = True
 
-        # set reverse move
+        # set reverse move, and update the occupancy of the starting cell and the cell the line was pushed into, the only cells that changed
+        self._occupied ^= 1 << cell
         if captured == False:
-            rev_coordinates = rev_block_marbles[0].get_position()
-            rev_direction = direction
-            if rev_direction.lower() == "l":
-                rev_direction = "R"
-            elif rev_direction.lower() == "r":
-                rev_direction = "L"
-            elif rev_direction.lower() == "f":
-                rev_direction = "B"
-            else:
-                rev_direction = "F"
-            self.set_reverse_move(rev_coordinates, rev_direction)
+            end = block_of_marbles[-1].get_position()
+            self.set_reverse_move(end, DIRECTIONS[index ^ 1])
+            self._occupied |= 1 << (end[0] * 7 + end[1])
+
+        # remember what was pushed so push_move() can undo it
+        self._last_move = (coordinates, index, block_of_marbles, current_player, captured)
 
         # determine if the game is over
-        game_over = self.game_over_check()
-        if game_over == True:
-            winner = self.get_winner()
-            loser = self.get_player_1()
-            if winner == self.get_player_1():
-                loser = self.get_player_2()
-            # print()
-            # self.print_board()
-            # print()
-            # print(
-                # f"Game Over! {winner} has won! Sorry, {loser}, better luck next time.")
-            return True
+        instruments = self._instruments
+        if instruments != None:
+            instruments.record_push(len(block_of_marbles), captured)
+            game_over = instruments.game_over_check(self)
         else:
+            game_over = self.game_over_check()
+        if game_over == False:
             self.set_current_turn(opponent_player)
-            # print()
-            # self.print_board()
-            return True
+        return True
+
+    def push_move(self, player_name: str, coordinates: tuple, direction: str) -> bool:
+        """makes a move the same way as make_move(), and if the move is executed saves an undo record so the move can be taken back with pop_move(). returns True if the move has been executed"""
+        move = self.resolve_move(player_name, coordinates, direction)
+        if move == None:
+            return False
+        return self.push_resolved(move[0], move[1], move[2])
+
+    def push_resolved(self, player: int, cell: int, index: int) -> bool:
+        """same as push_move() for a move already resolved by resolve_move() or legal_pushes()"""
+        record = (self._current_turn, self._reverse_move, self._status, self._winner, self._hash)
+        if self.push(player, cell, index) == False:
+            return False
+        self._undo_stack.append(record + self._last_move)
+        return True
+
+    def pop_move(self) -> bool:
+        """takes back the last move made with push_move(), restoring the board, the Marble positions, the captured lists, the current turn, the reverse move, the status, and the winner. returns False if there is no move to take back"""
+        if len(self._undo_stack) == 0:
+            return False
+        turn, reverse_move, status, winner, position_hash, coordinates, index, block, player, captured = self._undo_stack.pop()
+
+        # clear the cells the block was pushed into
+        cell = coordinates[0] * 7 + coordinates[1]
+        board = self.get_board()
+        owner_masks = self._owner_masks
+        for marble in block:
+            if marble.is_captured() == False:
+                position = marble.get_position()
+                board[position[0]][position[1]] = "X"
+                owner_masks[marble.get_owner()] ^= 1 << (position[0] * 7 + position[1])
+
+        # return the captured Marble, which is always the last Marble of the block
+        if captured == True:
+            captured_marble = block[-1]
+            captured_marble.set_captured(False)
+            self._marble_counts[captured_marble.get_color()] += 1
+            if captured_marble.get_color().lower() == "r":
+                player.remove_captured_neutral()
+            else:
+                player.remove_captured_opponent()
+
+        # put each Marble back one cell behind where it was pushed to
+        row_step, col_step = DIRECTION_STEPS[index]
+        row, col = coordinates
+        for marble in block:
+            board[row][col] = marble
+            marble.set_position(COORDINATES[row][col])
+            owner_masks[marble.get_owner()] ^= 1 << (row * 7 + col)
+            row += row_step
+            col += col_step
+        self._occupied |= 1 << cell
+        if captured == False:
+            self._occupied ^= 1 << (row * 7 + col)
+
+        # restore the game data saved before the move
+        self._current_turn = turn
+        self._reverse_move = reverse_move
+        self._status = status
+        self._winner = winner
+        self._hash = position_hash
+        if status == "UNFINISHED":
+            self._player_1.set_legal_moves(True)
+            self._player_2.set_legal_moves(True)
+        return True
 
     def game_over_check(self):
         """checks the status of the board and updates all data objects of the current state of the game. returns True if the game is over"""
@@ -478,55 +866,13 @@ class KubaGame:
 
             return
 
-        def marble_check(marble: Marble) -> bool:
-            """checks a marble to see if there are any available legal moves. returns True if a marble has legal moves available"""
-
-            # get data on the Marble
-            board = self.get_board()
-            marble_cood = marble.get_position()
-
-            # check L move
-            if marble_cood[1] == 6:
-                return True
-            if board[marble_cood[0]][marble_cood[1] + 1] == "X":
-                return True
-
-            # check R move
-            if marble_cood[1] == 0:
-                return True
-            if board[marble_cood[0]][marble_cood[1] - 1] == "X":
-                return True
-
-            # check F move
-            if marble_cood[0] == 6:
-                return True
-            if board[marble_cood[0] + 1][marble_cood[1]] == "X":
-                return True
-
-            # check B move
-            if marble_cood[0] == 0:
-                return True
-            if board[marble_cood[0] - 1][marble_cood[1 - 1]] == "X":
-                return True
-
-            # no legal moves found
-            return False
-
         # check if a player has captured 7 neutral stones or all opponent stones
         player_1 = self.get_player_1()
         player_2 = self.get_player_2()
-        num_player_1_neutrals = 0
-        num_player_1_opponents = 0
-        num_player_2_neutrals = 0
-        num_player_2_opponents = 0
-        for neutral in player_1.get_captured_neutral():
-            num_player_1_neutrals += 1
-        for opponent in player_1.get_captured_opponent():
-            num_player_1_opponents += 1
-        for neutral in player_2.get_captured_neutral():
-            num_player_2_neutrals += 1
-        for opponent in player_2.get_captured_opponent():
-            num_player_2_opponents += 1
+        num_player_1_neutrals = player_1.get_num_captured_neutral()
+        num_player_1_opponents = player_1.get_num_captured_opponent()
+        num_player_2_neutrals = player_2.get_num_captured_neutral()
+        num_player_2_opponents = player_2.get_num_captured_opponent()
 
         if num_player_1_opponents == 8:
             player_wins(player_1, player_2)
@@ -541,25 +887,11 @@ class KubaGame:
             player_wins(player_2, player_1)
             return True
 
-        # check if a player has no legal moves left
-        player_1_legal = 0
-        player_2_legal = 0
-        for marble in player_1.get_owned_marbles():
-            if marble.is_captured():
-                pass
-            else:
-                if marble_check(marble) == True:
-                    player_1_legal += 1
-        for marble in player_2.get_owned_marbles():
-            if marble.is_captured():
-                pass
-            else:
-                if marble_check(marble) == True:
-                    player_2_legal += 1
-        if player_1_legal == 0:
+        # check if a player has no legal moves left, with the same rules make_move() applies
+        if self.has_legal_push(0) == False:
             player_wins(player_2, player_1)
             return True
-        if player_2_legal == 0:
+        if self.has_legal_push(1) == False:
             player_wins(player_1, player_2)
             return True
 
@@ -572,11 +904,7 @@ class KubaGame:
         player = self.get_player_1()
         if playername == self.get_player_2().get_name():
             player = self.get_player_2()
-        captured_neutrals = player.get_captured_neutral()
-        qty_neutral_marbles = 0
-        for marble in captured_neutrals:
-            qty_neutral_marbles += 1
-        return qty_neutral_marbles
+        return player.get_num_captured_neutral()
 
     def get_marble(self, coordinates: tuple) -> str:
         """returns the marble currently present in the coordinate passed. returns "X" if no marble is present in the requested cell"""
@@ -595,14 +923,9 @@ class KubaGame:
 
     def get_marble_count(self) -> tuple:
         """returns the number of white marbles, black marbles, and red marbles remaining on the board as a tuple in order (W, B, R)"""
-        white = 0
-        black = 0
-        red = 0
-        for marble in self.get_marbles():
-            if marble.get_color() == "W" and marble.is_captured() == False:
-                white += 1
-            if marble.get_color() == "B" and marble.is_captured() == False:
-                black += 1
-            if marble.get_color() == "R" and marble.is_captured() == False:
-                red += 1
-        return (white, black, red)
+        counts = self._marble_counts
+        return (counts["W"], counts["B"], counts["R"])
+
+    def get_player_marble_count(self, player: int) -> int:
+        """returns the number of marbles player 1 (0) or player 2 (1) has left on the board, whatever the player's color"""
+        return bin(self._owner_masks[self._players[player]]).count("1")
@@ -0,0 +1,163 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the source code for the KubaInstruments class, which records how long the
+#               make_move(), validate_move() and game_over_check() calls of KubaGame take, why rejected moves
+#               were rejected, and how many marbles each push moved. Instruments are attached to a game with
+#               KubaGame.set_instruments() and can be shared by any number of games. A game without instruments
+#               only pays for one attribute check per call. The figures can be read as a dictionary or as the
+#               Prometheus text exposition format.
+
+# %%
+import bisect
+import time
+
+from KubaGame import MoveStatus
+
+# upper bounds in seconds of the timing histogram buckets. a call slower than the last bound is only counted
+# in the +Inf bucket
+TIME_BUCKETS = (1e-06, 2.5e-06, 5e-06, 1e-05, 2.5e-05, 5e-05, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+
+# upper bounds of the marbles moved histogram buckets. a push moves at most seven marbles
+MARBLE_BUCKETS = (1, 2, 3, 4, 5, 6, 7)
+
+# the reasons a move can be rejected, in the order make_move() checks them, as used in metric labels
+REJECTION_REASONS = tuple(status.name.lower() for status in MoveStatus if status != MoveStatus.LEGAL)
+
+TIMED_CALLS = ("make_move", "validate_move", "game_over_check")
+
+
+class Histogram:
+    """represents a histogram with fixed bucket bounds, counting each observation in the first bucket whose
+    bound is not less than it, along with the number and sum of the observations"""
+    __slots__ = ("_bounds", "_counts", "_sum", "_count")
+
+    def __init__(self, bounds: tuple) -> None:
+        """initializes an empty histogram with the ascending bucket bounds passed"""
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0
+        self._count = 0
+
+    def observe(self, value):
+        """adds an observation"""
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self._sum += value
+        self._count += 1
+        return
+
+    def get_count(self) -> int:
+        """returns the number of observations"""
+        return self._count
+
+    def get_sum(self):
+        """returns the sum of the observations"""
+        return self._sum
+
+    def get_buckets(self) -> list:
+        """returns the cumulative count of each bucket as a list of (bound, count) tuples, ending with the
+        bound float("inf") holding every observation"""
+        buckets = []
+        total = 0
+        for bound, count in zip(self._bounds + (float("inf"),), self._counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def to_dict(self) -> dict:
+        """returns the histogram as a dictionary with its cumulative buckets, count and sum"""
+        return {"buckets": self.get_buckets(), "count": self._count, "sum": self._sum}
+
+
+class KubaInstruments:
+    """records timings, rejection reasons and push sizes for the games it is attached to"""
+
+    def __init__(self, clock=time.perf_counter) -> None:
+        """initializes empty figures. clock is the function used to time calls"""
+        self._clock = clock
+        self._timings = {call: Histogram(TIME_BUCKETS) for call in TIMED_CALLS}
+        self._rejections = [0] * len(MoveStatus)       # indexed by MoveStatus
+        self._marbles_moved = Histogram(MARBLE_BUCKETS)
+        self._captures = 0
+
+    def get_timing(self, call: str) -> Histogram:
+        """returns the timing histogram of one of TIMED_CALLS"""
+        return self._timings[call]
+
+    def get_rejections(self) -> dict:
+        """returns the number of rejected moves for each of REJECTION_REASONS"""
+        return dict(zip(REJECTION_REASONS, self._rejections[1:]))
+
+    def get_marbles_moved(self) -> Histogram:
+        """returns the histogram of the number of marbles moved by each push"""
+        return self._marbles_moved
+
+    def make_move(self, game, player_name: str, coordinates: tuple, direction: str) -> bool:
+        """makes a move on the game the same way as KubaGame.make_move(), recording its time and the reason it was
+        rejected, if it was"""
+        start = self._clock()
+        status = game.try_move(player_name, coordinates, direction)
+        self._timings["make_move"].observe(self._clock() - start)
+        self._rejections[status] += 1
+        return status == MoveStatus.LEGAL
+
+    def validate_move(self, game, player_name: str, coordinates: tuple, direction: str) -> bool:
+        """validates a move on the game the same way as KubaGame.validate_move(), recording its time"""
+        start = self._clock()
+        result = game.resolve_move(player_name, coordinates, direction) != None
+        self._timings["validate_move"].observe(self._clock() - start)
+        return result
+
+    def game_over_check(self, game) -> bool:
+        """calls game_over_check() on the game, recording its time"""
+        start = self._clock()
+        result = game.game_over_check()
+        self._timings["game_over_check"].observe(self._clock() - start)
+        return result
+
+    def record_push(self, marbles: int, captured: bool):
+        """records a push of the number of marbles passed"""
+        self._marbles_moved.observe(marbles)
+        if captured == True:
+            self._captures += 1
+        return
+
+    def reset(self):
+        """clears every figure"""
+        self.__init__(self._clock)
+        return
+
+    def to_dict(self) -> dict:
+        """returns every figure as a dictionary: the timing histograms in seconds keyed by call, the rejection
+        counts keyed by reason, the marbles moved histogram, and the number of pushes that captured a marble"""
+        return {"timings": {call: histogram.to_dict() for call, histogram in self._timings.items()},
+                "rejections": self.get_rejections(),
+                "marbles_moved": self._marbles_moved.to_dict(),
+                "captures": self._captures}
+
+    def to_prometheus(self, prefix: str = "kuba") -> str:
+        """returns every figure in the Prometheus text exposition format, with metric names starting with
+        prefix"""
+        lines = []
+
+        def add_histogram(name: str, help_text: str, histogram: Histogram):
+            """adds the lines of one histogram"""
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for bound, count in histogram.get_buckets():
+                bound_text = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{le="{bound_text}"}} {count}')
+            lines.append(f"{name}_sum {histogram.get_sum()}")
+            lines.append(f"{name}_count {histogram.get_count()}")
+            return
+
+        for call, histogram in self._timings.items():
+            add_histogram(f"{prefix}_{call}_seconds", f"Time spent in {call}.", histogram)
+        lines.append(f"# HELP {prefix}_rejected_moves_total Moves rejected by make_move, by reason.")
+        lines.append(f"# TYPE {prefix}_rejected_moves_total counter")
+        for reason, count in self.get_rejections().items():
+            lines.append(f'{prefix}_rejected_moves_total{{reason="{reason}"}} {count}')
+        add_histogram(f"{prefix}_marbles_moved", "Marbles moved by each push.", self._marbles_moved)
+        lines.append(f"# HELP {prefix}_captures_total Pushes that captured a marble.")
+        lines.append(f"# TYPE {prefix}_captures_total counter")
+        lines.append(f"{prefix}_captures_total {self._captures}")
+        return "\n".join(lines) + "\n"
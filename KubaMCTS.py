@@ -0,0 +1,236 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the source code for the KubaMCTS class, a Monte-Carlo tree search player
+#               for Kuba. The tree is searched with UCT and random rollouts on a KubaBitboard, so expanding
+#               nodes and playing out games never touches the Marble objects of KubaGame. The search can run
+#               root-parallel across worker processes, each growing its own tree from the same position, with
+#               the visit counts of the root moves merged at the end. The tree of the main process is kept
+#               between calls and its subtree is reused once the game has moved on.
+
+# %%
+import math
+import random
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+from KubaBitboard import DIRECTION_NAMES, KubaBitboard
+
+
+class MCTSNode:
+    """represents a position in the search tree. the position is reached by move, a (player, cell, direction)
+    push, and wins counts the rollout results from the point of view of the player who made that move"""
+
+    def __init__(self, parent, move: tuple, state: tuple, player, moves: list) -> None:
+        """creates a node for the position with the state passed. player is the index of the player to move,
+        or None if the game is over, and moves the list of pushes not yet expanded"""
+        self.parent = parent
+        self.move = move
+        self.state = state
+        self.player = player
+        self.untried = moves
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+
+
+class KubaMCTS:
+    """represents a Monte-Carlo tree search player for Kuba. each search is limited by a number of iterations, a
+    time limit in seconds, or both. a player searching with worker processes should be closed when it is done
+    with, by calling close() or by using it in a with statement"""
+
+    def __init__(self, iterations: int = None, time_limit: float = 0.2, workers: int = 1,
+                 exploration: float = 1.4, rollout_limit: int = 200, seed: int = 0) -> None:
+        """initializes a new player. workers is the number of processes searching the root, including this one,
+        and rollout_limit the number of random moves played out before a rollout is scored by material"""
+        self._iterations = iterations
+        self._time_limit = time_limit
+        self._workers = workers
+        self._exploration = exploration
+        self._rollout_limit = rollout_limit
+        self._seed = seed
+        self._generator = random.Random(seed)
+        self._searches = 0
+        self._root = None
+        self._root_counts = {}
+        self._pool = None
+        self._pool_finalizer = None
+
+    def __enter__(self):
+        """returns the player, to be closed at the end of the with statement"""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """shuts down the worker processes at the end of the with statement"""
+        self.close()
+        return False
+
+    def get_root_counts(self) -> dict:
+        """returns the merged visit counts of the root moves of the last search, keyed by (coordinates,
+        direction)"""
+        return self._root_counts
+
+    def close(self):
+        """shuts down the worker processes"""
+        if self._pool != None:
+            self._pool_finalizer()
+            self._pool = None
+            self._pool_finalizer = None
+        return
+
+    def search(self, game, player_name: str):
+        """searches the game, a KubaBitboard or any engine with to_bytes(), for the best move for the player
+        identified as player_name and returns it as a (coordinates, direction) tuple, or None if the player has
+        no legal moves. the game is returned to the position it started in. a search that runs out of time
+        before its first iteration returns the first legal move"""
+        if not isinstance(game, KubaBitboard):
+            names = game.get_player_names()
+            colors = game.get_player_colors()
+            position = game.to_bytes()
+            game = KubaBitboard((names[0], colors[0]), (names[1], colors[1]))
+            game.from_bytes(position)
+        player = game.get_player_names().index(player_name)
+        pushes = game.legal_pushes(player)
+        if len(pushes) == 0:
+            return None
+        self._searches += 1
+
+        # start the other roots, then search this process's own tree while they run
+        futures = []
+        if self._workers > 1:
+            if self._pool == None:
+                self._pool = ProcessPoolExecutor(max_workers=self._workers - 1)
+                self._pool_finalizer = weakref.finalize(self, self._pool.shutdown)
+            for worker in range(1, self._workers):
+                seed = f"{self._seed}:{self._searches}:{worker}"
+                task = (game.get_player_names(), game.get_player_colors(), game.get_state(), player,
+                        self._iterations, self._time_limit, self._exploration, self._rollout_limit, seed)
+                futures.append(self._pool.submit(search_root_counts, task))
+        counts = self.search_tree(game, player)
+        for future in futures:
+            for move, visits in future.result().items():
+                counts[move] = counts.get(move, 0) + visits
+
+        # play the most visited move
+        self._root_counts = {}
+        for (cell, direction), visits in counts.items():
+            self._root_counts[((cell // 7, cell % 7), DIRECTION_NAMES[direction])] = visits
+        if len(self._root_counts) == 0:
+            cell = pushes[0][1]
+            return ((cell // 7, cell % 7), DIRECTION_NAMES[pushes[0][2]])
+        return max(self._root_counts, key=self._root_counts.get)
+
+    def search_tree(self, game: KubaBitboard, player: int) -> dict:
+        """grows this process's tree from the position of the game for the player index passed and returns the
+        visit counts of the root moves keyed by (cell, direction)"""
+        root_state = game.get_state()
+        root = self.find_subtree(root_state, player)
+        if root == None:
+            root = MCTSNode(None, None, root_state, player, game.legal_pushes(player))
+        root.parent = None
+        self._root = root
+
+        generator = self._generator
+        deadline = None
+        if self._time_limit != None:
+            deadline = time.perf_counter() + self._time_limit
+        iterations = 0
+        while True:
+            if self._iterations != None and iterations >= self._iterations:
+                break
+            if deadline != None and time.perf_counter() > deadline:
+                break
+            iterations += 1
+
+            # selection: follow the best UCT child down to a node with unexpanded moves
+            node = root
+            while len(node.untried) == 0 and len(node.children) > 0:
+                node = self.select_child(node)
+            if node is not root:
+                game.set_state(node.state)
+
+            # expansion: add one child for a random unexpanded move
+            if len(node.untried) > 0:
+                move = node.untried.pop(generator.randrange(len(node.untried)))
+                game.push(move[0], move[1], move[2])
+                next_player = game.get_turn_index()
+                moves = [] if next_player == None else game.legal_pushes(next_player)
+                child = MCTSNode(node, move, game.get_state(), next_player, moves)
+                node.children.append(child)
+                node = child
+
+            # rollout, then back up the result for player 1 through the tree
+            result = self.rollout(game, node.player, generator)
+            while node != None:
+                node.visits += 1
+                if node.move != None:
+                    node.wins += result if node.move[0] == 0 else 1.0 - result
+                node = node.parent
+            game.set_state(root_state)
+
+        counts = {}
+        for child in root.children:
+            counts[(child.move[1], child.move[2])] = child.visits
+        return counts
+
+    def find_subtree(self, state: tuple, player: int):
+        """returns the node of the kept tree for the exact state passed, looking up to two moves past the old
+        root, or None if the game has left the tree"""
+        if self._root == None:
+            return None
+        level = [self._root]
+        for depth in range(3):
+            for node in level:
+                if node.state == state and node.player == player:
+                    return node
+            level = [child for node in level for child in node.children]
+        return None
+
+    def select_child(self, node: MCTSNode) -> MCTSNode:
+        """returns the child of the node with the highest UCT score"""
+        scale = self._exploration * math.sqrt(math.log(node.visits))
+        best = None
+        best_score = -1.0
+        for child in node.children:
+            score = child.wins / child.visits + scale / math.sqrt(child.visits)
+            if score > best_score:
+                best = child
+                best_score = score
+        return best
+
+    def rollout(self, game: KubaBitboard, player, generator: random.Random) -> float:
+        """plays random moves from the current position of the game and returns the result for player 1: 1.0 for
+        a win, 0.0 for a loss, and 0.5 for a rollout that ends even on material after rollout_limit moves"""
+        for move in range(self._rollout_limit):
+            winner = game.get_winner_index()
+            if winner != None:
+                return 1.0 if winner == 0 else 0.0
+            pushes = game.legal_pushes(player)
+            if len(pushes) == 0:
+                return 0.0 if player == 0 else 1.0      # a player with no legal moves has lost
+            push = pushes[generator.randrange(len(pushes))]
+            game.push(push[0], push[1], push[2])
+            player = game.get_turn_index()
+        winner = game.get_winner_index()
+        if winner != None:
+            return 1.0 if winner == 0 else 0.0
+
+        # score an unfinished rollout by marbles on the board and red marbles captured
+        masks = game.get_masks()
+        names = game.get_player_names()
+        material = bin(masks[0]).count("1") - bin(masks[1]).count("1")
+        material += game.get_captured(names[0]) - game.get_captured(names[1])
+        if material > 0:
+            return 1.0
+        if material < 0:
+            return 0.0
+        return 0.5
+
+
+def search_root_counts(task: tuple) -> dict:
+    """runs one root of a root-parallel search in a worker process and returns its root visit counts"""
+    names, colors, state, player, iterations, time_limit, exploration, rollout_limit, seed = task
+    game = KubaBitboard((names[0], colors[0]), (names[1], colors[1]))
+    game.set_state(state)
+    searcher = KubaMCTS(iterations, time_limit, 1, exploration, rollout_limit, seed)
+    return searcher.search_tree(game, player)
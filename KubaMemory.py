@@ -0,0 +1,59 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains a memory benchmark for Kuba games. It creates many live games, plays a few
+#               random moves in each so that their state is not the starting position, and reports the bytes
+#               allocated per game as measured by tracemalloc. Run this file directly to print the result for
+#               KubaGame and KubaBitboard.
+
+# %%
+import argparse
+import gc
+import random
+import tracemalloc
+
+from KubaBitboard import KubaBitboard
+from KubaGame import KubaGame
+
+
+def bytes_per_game(game_class, count: int = 1000, moves: int = 20, seed: int = 0) -> float:
+    """returns the average number of bytes held by one live game of the class passed. count games are created
+    and kept alive at once, and up to moves random legal moves are played in each of them"""
+    generator = random.Random(seed)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        games = []
+        for number in range(count):
+            game = game_class(("A", "W"), ("B", "B"))
+            turn = "A"
+            for move in range(moves):
+                legal = game.legal_moves(turn)
+                if len(legal) == 0:
+                    break
+                coordinates, direction = generator.choice(legal)
+                game.make_move(turn, coordinates, direction)
+                turn = "B" if turn == "A" else "A"
+            games.append(game)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    # the list holding the games is not part of a game
+    return (after - before - 8 * len(games)) / count
+
+
+def main():
+    """parses the command line and prints the bytes per live game of each engine"""
+    parser = argparse.ArgumentParser(description="measure the memory used by live Kuba games")
+    parser.add_argument("--count", type=int, default=1000, help="number of live games")
+    parser.add_argument("--moves", type=int, default=20, help="random moves played in each game")
+    args = parser.parse_args()
+    for game_class in (KubaGame, KubaBitboard):
+        size = bytes_per_game(game_class, args.count, args.moves)
+        print(f"{game_class.__name__}: {size:.0f} bytes per game")
+    return
+
+
+if __name__ == "__main__":
+    main()
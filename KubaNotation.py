@@ -0,0 +1,210 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains a text notation for recording games of Kuba and a streaming parser and
+#               replayer for files of recorded games. A game is a block of tag lines followed by its moves:
+#
+#                   [Player1 "PlayerA"]
+#                   [Color1 "W"]
+#                   [Player2 "PlayerB"]
+#                   [Color2 "B"]
+#                   [First "PlayerA"]
+#                   [Result "PlayerA"]
+#                   1. (6,5)F (0,6)B 2. (5,5)F (1,6)B
+#
+#               Moves are written (row,col)DIR as passed to make_move(), alternating between the players from
+#               the player named by the First tag. Move numbers are optional and ignored, and text after a ";"
+#               is a comment. The Result tag holds the name of the winner, or "*" for an unfinished game. A
+#               game ends at a blank line, so a game without moves is kept apart from the next one, and a tag
+#               line after the moves or a tag the game already has starts a new game as well. Files are read
+#               one line at a time and games are replayed one at a time, so memory use is bounded by the
+#               longest game rather than the size of the file. random_game() makes the moves of a game of
+#               random legal moves, for tests and benchmarks that need games to record or replay.
+
+# %%
+import argparse
+import random
+import re
+
+from KubaBitboard import KubaBitboard
+from KubaGame import KubaGame
+
+ENGINES = {"bitboard": KubaBitboard, "object": KubaGame}
+TAG_PATTERN = re.compile(r'^\[(\w+)\s+"([^"]*)"\]$')
+MOVE_PATTERN = re.compile(r"^\((\d),(\d)\)([LRFBlrfb])$")
+MOVE_NUMBER_PATTERN = re.compile(r"^\d+\.$")
+UNFINISHED = "*"
+
+
+def format_move(coordinates: tuple, direction: str) -> str:
+    """returns the notation of a move, such as (6,5)F"""
+    return f"({coordinates[0]},{coordinates[1]}){direction.upper()}"
+
+
+def parse_move(token: str) -> tuple:
+    """returns the (coordinates, direction) move written in the token passed. raises ValueError if the token is
+    not a move"""
+    match = MOVE_PATTERN.match(token)
+    if match == None:
+        raise ValueError(f"{token!r} is not a move")
+    return ((int(match.group(1)), int(match.group(2))), match.group(3).upper())
+
+
+def format_game(tuple_1: tuple, tuple_2: tuple, first_player: str, moves, winner: str = None) -> str:
+    """returns the notation of a game between the two (player name, player color) tuples passed, with the
+    moves played in order from first_player, ending in a blank line. moves are written ten to a line"""
+    lines = [f'[Player1 "{tuple_1[0]}"]', f'[Color1 "{tuple_1[1]}"]',
+             f'[Player2 "{tuple_2[0]}"]', f'[Color2 "{tuple_2[1]}"]',
+             f'[First "{first_player}"]', f'[Result "{UNFINISHED if winner == None else winner}"]']
+    line = []
+    for number, (coordinates, direction) in enumerate(moves):
+        if number % 2 == 0:
+            line.append(f"{number // 2 + 1}.")
+        line.append(format_move(coordinates, direction))
+        if number % 10 == 9:
+            lines.append(" ".join(line))
+            line = []
+    if len(line) > 0:
+        lines.append(" ".join(line))
+    return "\n".join(lines) + "\n\n"
+
+
+def random_game(seed: str, max_moves: int = 200) -> list:
+    """returns the moves of a game of random legal moves between players A and B, at most max_moves of them, as
+    (player name, coordinates, direction) tuples. seed is any seed random.Random takes, such as a string, and
+    the same seed always gives the same game"""
+    generator = random.Random(seed)
+    game = KubaBitboard(("A", "W"), ("B", "B"))
+    player = "A"
+    moves = []
+    while game.get_winner() == None and len(moves) < max_moves:
+        legal = game.legal_moves(player)
+        if len(legal) == 0:
+            break
+        coordinates, direction = generator.choice(legal)
+        game.make_move(player, coordinates, direction)
+        moves.append((player, coordinates, direction))
+        player = "B" if player == "A" else "A"
+    return moves
+
+
+def read_games(lines):
+    """reads games from an iterable of lines, such as an open file, and yields one dictionary per game with
+    its number (counting from 1), the line it starts on, its tags, its list of moves, and a syntax error
+    message or None. a game with a syntax error keeps the moves read before the error"""
+    game = None
+    number = 0
+    in_moves = False
+    for line_number, line in enumerate(lines, 1):
+
+        # a blank line ends the game, even one without moves
+        if len(line.strip()) == 0:
+            if game != None:
+                yield game
+                game = None
+                in_moves = False
+            continue
+        line = line.split(";", 1)[0].strip()
+        if len(line) == 0:
+            continue                    # the line only holds a comment
+
+        # a tag line after a game's moves, or a tag the game already has, starts the next game
+        if line.startswith("["):
+            match = TAG_PATTERN.match(line)
+            if game != None and (in_moves or (match != None and match.group(1) in game["tags"])):
+                yield game
+                game = None
+                in_moves = False
+            if game == None:
+                number += 1
+                game = {"game": number, "line": line_number, "tags": {}, "moves": [], "error": None}
+            if match == None:
+                game["error"] = f"line {line_number}: malformed tag {line!r}"
+            else:
+                game["tags"][match.group(1)] = match.group(2)
+            continue
+
+        if game == None:
+            number += 1
+            game = {"game": number, "line": line_number, "tags": {}, "moves": [], "error": None}
+        in_moves = True
+        if game["error"] != None:
+            continue
+        for token in line.split():
+            if MOVE_NUMBER_PATTERN.match(token):
+                continue
+            try:
+                game["moves"].append(parse_move(token))
+            except ValueError as error:
+                game["error"] = f"line {line_number}: {error}"
+                break
+    if game != None:
+        yield game
+
+
+def replay_game(record: dict, engine=KubaGame) -> dict:
+    """replays a game read by read_games() on a new game of the engine class passed and returns the result as
+    a dictionary with the game number, the number of moves made, the winner's name or None, and an error
+    message or None. the ply of the first illegal move is reported in the error and as "ply", counting from 1"""
+    tags = record["tags"]
+    result = {"game": record["game"], "line": record["line"], "moves": 0, "winner": None, "ply": None,
+              "error": record["error"]}
+    if result["error"] != None:
+        return result
+    for tag in ("Player1", "Color1", "Player2", "Color2"):
+        if tag not in tags:
+            result["error"] = f"missing tag {tag}"
+            return result
+
+    game = engine((tags["Player1"], tags["Color1"]), (tags["Player2"], tags["Color2"]))
+    names = (tags["Player1"], tags["Player2"])
+    first = tags.get("First", names[0])
+    if first not in names:
+        result["error"] = f"First tag names {first!r}, who is not a player"
+        return result
+    turn = names.index(first)
+    for ply, (coordinates, direction) in enumerate(record["moves"], 1):
+        if game.make_move(names[turn], coordinates, direction) == False:
+            result["ply"] = ply
+            result["error"] = f"ply {ply}: illegal move {format_move(coordinates, direction)} by {names[turn]}"
+            break
+        result["moves"] = ply
+        turn = 1 - turn
+
+    # a game that replays cleanly must end the way its Result tag says
+    winner = game.get_winner()
+    result["winner"] = None if winner == None else str(winner)
+    recorded = tags.get("Result", UNFINISHED)
+    if result["error"] == None and recorded != (UNFINISHED if winner == None else str(winner)):
+        result["error"] = f"Result tag is {recorded!r} but the moves end with winner {result['winner']!r}"
+    return result
+
+
+def replay_games(lines, engine=KubaGame):
+    """reads and replays every game in an iterable of lines, yielding the result of each game in order as
+    replay_game() returns it. only one game is held in memory at a time"""
+    for record in read_games(lines):
+        yield replay_game(record, engine)
+
+
+def main():
+    """parses the command line and validates every game in the files passed, printing each error. exits with
+    status 1 if any game has an error"""
+    parser = argparse.ArgumentParser(description="validate files of recorded Kuba games")
+    parser.add_argument("files", nargs="+", help="game record files")
+    parser.add_argument("--engine", choices=tuple(ENGINES), default="bitboard")
+    args = parser.parse_args()
+    games = 0
+    errors = 0
+    for path in args.files:
+        with open(path) as record_file:
+            for result in replay_games(record_file, ENGINES[args.engine]):
+                games += 1
+                if result["error"] != None:
+                    errors += 1
+                    print(f"{path}: game {result['game']} (line {result['line']}): {result['error']}")
+    print(f"{games} games, {errors} with errors")
+    raise SystemExit(1 if errors > 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
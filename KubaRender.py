@@ -0,0 +1,175 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the rendering of Kuba boards as plain text, ANSI colored text, and HTML,
+#               the KubaRenderer class that caches rendered boards by position, and the BoardFeed class that
+#               turns consecutive positions of a game into lists of changed cells. A board is handled as a
+#               string of 49 marble letters ("W", "B", "R" or "X"), row by row, so positions are cheap to keep
+#               and compare. A spectator service renders the full board for a watcher once and then streams
+#               only the cells each move changed, which every watcher of the game shares.
+
+# %%
+import html
+from collections import OrderedDict, deque
+from itertools import chain
+
+STYLES = ("text", "ansi", "html")
+
+# ANSI escape sequences for the letter of each marble, and the sequence that ends them
+ANSI_COLORS = {"W": "\x1b[1;97m", "B": "\x1b[1;94m", "R": "\x1b[1;91m", "X": "\x1b[2;37m"}
+ANSI_RESET = "\x1b[0m"
+
+
+def get_cells(game) -> str:
+    """returns the board of a KubaGame or KubaBitboard as a string of 49 marble letters, row by row"""
+    return "".join(map(str, chain.from_iterable(game.get_board())))
+
+
+def render_text(cells: str) -> str:
+    """returns the board as the lines print_board() prints"""
+    return "".join(" | " + " | ".join(cells[row * 7:row * 7 + 7]) + " | \n" for row in range(7))
+
+
+def render_ansi(cells: str) -> str:
+    """returns the board in the layout of render_text() with each marble letter colored for a terminal"""
+    lines = []
+    for row in range(7):
+        marbles = [ANSI_COLORS[cell] + cell + ANSI_RESET for cell in cells[row * 7:row * 7 + 7]]
+        lines.append(" | " + " | ".join(marbles) + " | \n")
+    return "".join(lines)
+
+
+def render_html(cells: str) -> str:
+    """returns the board as an HTML table. each cell has the id kuba-row-col and the class kuba-marble, such as
+    kuba-3-4 and kuba-R, so a page can apply cell changes by id"""
+    rows = []
+    for row in range(7):
+        cells_html = "".join(f'<td id="kuba-{row}-{col}" class="kuba-{html.escape(cell)}">{html.escape(cell)}</td>'
+                             for col, cell in enumerate(cells[row * 7:row * 7 + 7]))
+        rows.append(f"<tr>{cells_html}</tr>")
+    return '<table class="kuba-board">' + "".join(rows) + "</table>"
+
+
+RENDERERS = {"text": render_text, "ansi": render_ansi, "html": render_html}
+
+
+def diff_cells(old: str, new: str) -> list:
+    """returns the cells that differ between two boards as a list of (row, col, marble in the new board)
+    tuples, in cell order"""
+    return [(cell // 7, cell % 7, new[cell]) for cell in range(49) if old[cell] != new[cell]]
+
+
+def format_ansi_diff(changes, top: int = 1, left: int = 1) -> str:
+    """returns the escape sequences that redraw the changed cells of a board drawn by render_ansi() with its
+    first line at terminal row top and its first character at terminal column left, leaving every other
+    character on the terminal as it is"""
+    updates = []
+    for row, col, marble in changes:
+        updates.append(f"\x1b[{top + row};{left + 3 + col * 4}H{ANSI_COLORS[marble]}{marble}{ANSI_RESET}")
+    return "".join(updates)
+
+
+class KubaRenderer:
+    """renders boards and keeps the results by position hash and player colors, so a position that is rendered
+    again, for another watcher or after a move is taken back, is only looked up. the hash belongs to the players
+    rather than their colors, so games whose players chose other colors are kept apart by the colors. the least
+    recently used entries are dropped once there are more than max_entries"""
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        """initializes an empty cache holding at most max_entries rendered boards"""
+        self._max_entries = max_entries
+        self._cache = OrderedDict()     # (position hash, colors, style) -> rendered board, and style None -> cells
+        self._hits = 0
+        self._misses = 0
+
+    def get_hits(self) -> int:
+        """returns the number of lookups answered from the cache"""
+        return self._hits
+
+    def get_misses(self) -> int:
+        """returns the number of lookups that had to read or render the board"""
+        return self._misses
+
+    def lookup(self, key: tuple, make):
+        """returns the cached value of the key, or stores and returns make() if it is not cached"""
+        cache = self._cache
+        value = cache.get(key)
+        if value != None:
+            cache.move_to_end(key)
+            self._hits += 1
+            return value
+        self._misses += 1
+        value = make()
+        cache[key] = value
+        if len(cache) > self._max_entries:
+            cache.popitem(last=False)
+        return value
+
+    def get_cells(self, game) -> str:
+        """returns the board of the game as get_cells() does, from the cache if the position has been seen"""
+        return self.lookup((game.position_hash(), game.get_player_colors(), None), lambda: get_cells(game))
+
+    def render(self, game, style: str = "text") -> str:
+        """returns the board of the game rendered in one of STYLES. raises ValueError for an unknown style"""
+        renderer = RENDERERS.get(style)
+        if renderer == None:
+            raise ValueError(f"unknown style {style!r}")
+        return self.lookup((game.position_hash(), game.get_player_colors(), style),
+                           lambda: renderer(self.get_cells(game)))
+
+    def clear(self):
+        """drops every cached board"""
+        self._cache.clear()
+        return
+
+
+class BoardFeed:
+    """follows the positions of one game and numbers them with versions. update() is called once after each
+    move, and any number of watchers then ask for the changes since the version they last saw. the changes of
+    the last history versions are kept; a watcher further behind is told to fetch the whole board instead"""
+
+    def __init__(self, game, history: int = 64, renderer: KubaRenderer = None) -> None:
+        """starts following the game at version 0. boards are read through renderer if one is passed"""
+        self._game = game
+        self._renderer = renderer
+        self._cells = self.read_cells()
+        self._version = 0
+        self._history = deque(maxlen=history)     # (version, changes that led to it)
+
+    def read_cells(self) -> str:
+        """returns the board of the game, through the renderer if there is one"""
+        if self._renderer != None:
+            return self._renderer.get_cells(self._game)
+        return get_cells(self._game)
+
+    def get_version(self) -> int:
+        """returns the version of the latest position"""
+        return self._version
+
+    def get_cells(self) -> str:
+        """returns the board of the latest position"""
+        return self._cells
+
+    def update(self) -> list:
+        """reads the board of the game and returns the cells that changed since the last update as
+        diff_cells() does. a new version is only made when a cell changed"""
+        cells = self.read_cells()
+        changes = diff_cells(self._cells, cells)
+        if len(changes) > 0:
+            self._cells = cells
+            self._version += 1
+            self._history.append((self._version, changes))
+        return changes
+
+    def changes_since(self, version: int) -> list:
+        """returns the cells that changed after the version passed, with each cell listed once with its latest
+        marble, or None if the changes are no longer kept and the watcher needs the whole board"""
+        if version == self._version:
+            return []
+        if len(self._history) == 0 or version < self._history[0][0] - 1 or version > self._version:
+            return None
+        latest = {}
+        for change_version, changes in self._history:
+            if change_version > version:
+                for row, col, marble in changes:
+                    latest[(row, col)] = marble
+        return [(row, col, marble) for (row, col), marble in sorted(latest.items())]
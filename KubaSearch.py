@@ -0,0 +1,227 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the source code for the KubaSearch class, a game tree search engine that
+#               finds the best move for the player to move in a game of Kuba. The search is a negamax
+#               alpha-beta search with iterative deepening, move ordering, and a bounded transposition
+#               table. It works with KubaGame or KubaBitboard objects, and takes moves back with
+#               push_move() and pop_move() instead of copying the game.
+
+# %%
+import time
+
+# scores of a won game. wins found sooner score higher so the search plays the fastest win it can see
+WIN_SCORE = 100000
+MARBLE_VALUE = 100
+RED_VALUE = 120
+
+# transposition table bound flags
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+def to_table_score(score: int, ply: int) -> int:
+    """converts a score found ply moves from the root into one relative to the stored position, so a win is
+    stored as the distance from that position instead of from the root"""
+    if score > WIN_SCORE - 1000:
+        return score + ply
+    if score < -WIN_SCORE + 1000:
+        return score - ply
+    return score
+
+
+def from_table_score(score: int, ply: int) -> int:
+    """converts a score read from the transposition table back into one relative to the root"""
+    if score > WIN_SCORE - 1000:
+        return score - ply
+    if score < -WIN_SCORE + 1000:
+        return score + ply
+    return score
+
+
+class SearchBudgetExceeded(Exception):
+    """raised inside the search when the time or node budget runs out"""
+    pass
+
+
+class KubaSearch:
+    """represents a search engine for Kuba. the budget of each search can be limited by depth, time in seconds,
+    and number of nodes. the transposition table and move ordering statistics are kept between searches so
+    consecutive searches in the same game reuse earlier work"""
+
+    def __init__(self, max_depth: int = 64, time_limit: float = None, node_limit: int = None,
+                 table_bits: int = 18, book=None, endgame=None) -> None:
+        """initializes a new search engine. max_depth limits how deep iterative deepening goes, time_limit is
+        the number of seconds a search may take, and node_limit the number of positions it may visit. the
+        transposition table holds 2 ** table_bits entries. book and endgame are an OpeningBook and
+        EndgameTables from KubaBook, consulted before each search"""
+        self._max_depth = max_depth
+        self._time_limit = time_limit
+        self._node_limit = node_limit
+        self._table_mask = (1 << table_bits) - 1
+        self._table = [None] * (1 << table_bits)
+        self._history = {}
+        self._nodes = 0
+        self._depth = 0
+        self._score = 0
+        self._deadline = None
+        self._book = book
+        self._endgame = endgame
+
+    def get_nodes(self) -> int:
+        """returns the number of positions visited by the last search"""
+        return self._nodes
+
+    def get_depth(self) -> int:
+        """returns the deepest iteration completed by the last search"""
+        return self._depth
+
+    def get_score(self) -> int:
+        """returns the score of the best move found by the last search, from the point of view of the player
+        who searched"""
+        return self._score
+
+    def clear(self):
+        """empties the transposition table and move ordering statistics"""
+        self._table = [None] * len(self._table)
+        self._history = {}
+        return
+
+    def evaluate(self, game, player_name: str, opponent_name: str) -> int:
+        """returns the material score of the position from the point of view of player_name: the difference in
+        marbles left on the board plus the difference in red marbles captured"""
+        player = game.get_player_names().index(player_name)
+        material = game.get_player_marble_count(player) - game.get_player_marble_count(player ^ 1)
+        captured = game.get_captured(player_name) - game.get_captured(opponent_name)
+        return material * MARBLE_VALUE + captured * RED_VALUE
+
+    def search(self, game, player_name: str):
+        """searches the game for the best move for the player identified as player_name and returns it as a
+        (coordinates, direction) tuple, or None if the player has no legal moves. the game is returned to the
+        position it started in"""
+        moves = game.legal_moves(player_name)
+        if len(moves) == 0:
+            return None
+        names = game.get_player_names()
+        player = names.index(player_name)
+
+        self._nodes = 0
+        self._depth = 0
+        self._score = 0
+        self._deadline = None
+
+        # a move from the opening book or the endgame tables needs no search
+        for source in (self._book, self._endgame):
+            if source != None:
+                move = source.best_move(game, player_name)
+                if move != None:
+                    return move
+
+        if self._time_limit != None:
+            self._deadline = time.perf_counter() + self._time_limit
+
+        # iterative deepening. each finished iteration gives a best move and orders the moves of the next one
+        best_move = moves[0]
+        for depth in range(1, self._max_depth + 1):
+            try:
+                score, move = self.search_root(game, moves, depth, names, player)
+            except SearchBudgetExceeded:
+                break
+            best_move = move
+            self._depth = depth
+            self._score = score
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN_SCORE - self._max_depth:
+                break                   # a forced result has been found
+        return best_move
+
+    def search_root(self, game, moves: list, depth: int, names: tuple, player: int) -> tuple:
+        """searches every root move of player, the index of the player in names, to the depth passed and returns
+        the best (score, move)"""
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        best_move = moves[0]
+        for move in moves:
+            game.push_move(names[player], move[0], move[1])
+            try:
+                score = -self.negamax(game, depth - 1, -beta, -alpha, 1, names, player ^ 1)
+            finally:
+                game.pop_move()
+            if score > alpha:
+                alpha = score
+                best_move = move
+        return alpha, best_move
+
+    def negamax(self, game, depth: int, alpha: int, beta: int, ply: int, names: tuple, player: int) -> int:
+        """returns the score of the position for player, the index in names of the player to move, searched to
+        the depth passed with the alpha-beta window (alpha, beta)"""
+        self._nodes += 1
+        if self._node_limit != None and self._nodes > self._node_limit:
+            raise SearchBudgetExceeded()
+        if self._deadline != None and self._nodes & 1023 == 0 and time.perf_counter() > self._deadline:
+            raise SearchBudgetExceeded()
+
+        # the game is over
+        winner = game.get_winner_index()
+        if winner != None:
+            if winner == player:
+                return WIN_SCORE - ply
+            return -WIN_SCORE + ply
+        if depth <= 0:
+            return self.evaluate(game, names[player], names[player ^ 1])
+
+        # look up the position in the transposition table
+        position_hash = game.position_hash()
+        slot = position_hash & self._table_mask
+        entry = self._table[slot]
+        table_move = None
+        if entry != None and entry[0] == position_hash:
+            table_move = entry[4]
+            if entry[1] >= depth:
+                score = from_table_score(entry[2], ply)
+                if entry[3] == EXACT:
+                    return score
+                if entry[3] == LOWER_BOUND and score >= beta:
+                    return score
+                if entry[3] == UPPER_BOUND and score <= alpha:
+                    return score
+
+        moves = game.legal_moves(names[player])
+        if len(moves) == 0:
+            return -WIN_SCORE + ply     # a player with no legal moves has lost
+
+        # try the transposition table move first, then the moves that caused the most cutoffs
+        history = self._history
+        moves.sort(key=lambda move: history.get(move, 0), reverse=True)
+        if table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        best_move = moves[0]
+        for move in moves:
+            game.push_move(names[player], move[0], move[1])
+            try:
+                score = -self.negamax(game, depth - 1, -beta, -alpha, ply + 1, names, player ^ 1)
+            finally:
+                game.pop_move()
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                history[move] = history.get(move, 0) + depth * depth
+                break
+
+        # store the result, always replacing the entry in the slot
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self._table[slot] = (position_hash, depth, to_table_score(best_score, ply), flag, best_move)
+        return best_score
@@ -0,0 +1,420 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the source code for the KubaServer class, an asyncio server that hosts many
+#               games of Kuba in one event loop, and the KubaClient class that talks to it. Messages are JSON
+#               objects, one per line, in both directions. A request names an operation and the game it is for:
+#
+#                   {"id": 1, "op": "create", "players": [["PlayerA", "W"], ["PlayerB", "B"]]}
+#                   {"id": 2, "op": "make_move", "game": "1", "player": "PlayerA", "coordinates": [6, 5],
+#                    "direction": "F"}
+#
+#               and each response carries the same id with either "result" or "error". try_move and check_move
+#               answer with the name of a MoveStatus instead of true or false. Each connection is
+#               served one request at a time and every response is drained before the next request is read, so
+#               a client that sends faster than it reads is slowed down by TCP flow control. Games that see no
+#               requests for idle_timeout seconds are evicted, and the server keeps per-game move counts and
+#               move rates. Run this file directly to start a server.
+
+# %%
+import argparse
+import asyncio
+import json
+import time
+
+from KubaBitboard import KubaBitboard
+from KubaGame import KubaGame, MoveStatus
+
+ENGINES = {"bitboard": KubaBitboard, "object": KubaGame}
+COLORS = ("W", "B")
+UNAVAILABLE_ID = "game id {!r} is not available"     # the error of a create request for an id already taken
+
+# the game calls a request can make, and the request fields passed to each as arguments
+GAME_CALLS = {
+    "make_move": ("player", "coordinates", "direction"),
+    "try_move": ("player", "coordinates", "direction"),
+    "check_move": ("player", "coordinates", "direction"),
+    "get_marble": ("coordinates",),
+    "get_marble_count": (),
+    "get_current_turn": (),
+    "get_winner": (),
+    "get_captured": ("player",),
+}
+
+
+def get_field(request: dict, field: str):
+    """returns a field of a request. raises ValueError if the request does not have it"""
+    if field not in request:
+        raise ValueError(f"request is missing {field!r}")
+    return request[field]
+
+
+def get_string(request: dict, field: str) -> str:
+    """returns a field of a request that must be a string. raises ValueError if it is missing or not a string"""
+    value = get_field(request, field)
+    if not isinstance(value, str):
+        raise ValueError(f"{field!r} must be a string")
+    return value
+
+
+def get_coordinates(request: dict) -> tuple:
+    """returns the coordinates field of a request as a (row, col) tuple. raises ValueError unless it is a list
+    of two integers, or a tuple of them from a caller in Python"""
+    value = get_field(request, "coordinates")
+    if (not isinstance(value, (list, tuple)) or len(value) != 2
+            or not all(isinstance(number, int) and not isinstance(number, bool) for number in value)):
+        raise ValueError("'coordinates' must be a list of two integers")
+    return (value[0], value[1])
+
+
+def get_players(request: dict) -> tuple:
+    """returns the players field of a create request as two (player name, player color) tuples. raises
+    ValueError unless it is a list of two [name, color] lists with string names, one player W and one B"""
+    players = get_field(request, "players")
+    if (not isinstance(players, (list, tuple)) or len(players) != 2
+            or not all(isinstance(player, (list, tuple)) and len(player) == 2 for player in players)):
+        raise ValueError("'players' must be a list of two [name, color] lists")
+    for name, color in players:
+        if not isinstance(name, str):
+            raise ValueError("player names must be strings")
+        if not isinstance(color, str) or color not in COLORS:
+            raise ValueError(f"player color {color!r} is not one of {', '.join(COLORS)}")
+    if players[0][1] == players[1][1]:
+        raise ValueError("the players must have different colors")
+    return ((players[0][0], players[0][1]), (players[1][0], players[1][1]))
+
+
+class GameSession:
+    """represents one game hosted by the server, with the times it was created and last used and the number of
+    moves made and rejected"""
+
+    __slots__ = ("game", "created", "last_active", "moves", "rejected")
+
+    def __init__(self, game, now: float) -> None:
+        """creates a session for the game passed at the time now"""
+        self.game = game
+        self.created = now
+        self.last_active = now
+        self.moves = 0
+        self.rejected = 0
+
+
+class KubaServer:
+    """represents a server hosting games of Kuba. games are created by the create request and identified by the
+    id it returns. the server can be run on a TCP port with start(), or driven directly with handle_request()"""
+
+    def __init__(self, engine=KubaGame, max_games: int = 100000, idle_timeout: float = 600.0,
+                 max_line: int = 65536, clock=time.monotonic) -> None:
+        """initializes a new server for games of the engine class passed. at most max_games games are hosted at
+        once, games unused for idle_timeout seconds are evicted, and request lines longer than max_line bytes
+        close the connection"""
+        self._engine = engine
+        self._max_games = max_games
+        self._idle_timeout = idle_timeout
+        self._max_line = max_line
+        self._clock = clock
+        self._sessions = {}
+        self._next_id = 1
+        self._counters = {"requests": 0, "errors": 0, "moves": 0, "rejected": 0, "created": 0, "evicted": 0,
+                          "connections": 0}
+        self._server = None
+        self._eviction_task = None
+
+    def get_sessions(self) -> dict:
+        """returns the hosted games as a dictionary of game id to GameSession"""
+        return self._sessions
+
+    def get_metrics(self) -> dict:
+        """returns the server counters and the number of games hosted. connections counts the connections open
+        now, and the other counters count since the server was created"""
+        metrics = dict(self._counters)
+        metrics["games"] = len(self._sessions)
+        return metrics
+
+    def get_session_metrics(self, game_id: str) -> dict:
+        """returns the move count, rejected move count, age, idle time, and moves per second of a game"""
+        session = self.find_session(game_id)
+        now = self._clock()
+        age = now - session.created
+        return {"moves": session.moves,
+                "rejected": session.rejected,
+                "age": age,
+                "idle": now - session.last_active,
+                "move_rate": session.moves / age if age > 0 else 0.0}
+
+    def create_game(self, tuple_1: tuple, tuple_2: tuple, game_id: str = None) -> str:
+        """creates a game between the two (player name, player color) tuples passed and returns its id. the id is
+        chosen by the server unless one is passed. raises ValueError if the server is full or the id is taken"""
+        if len(self._sessions) >= self._max_games:
+            self.evict_idle()
+            if len(self._sessions) >= self._max_games:
+                raise ValueError("server is full")
+        if game_id == None:
+
+            # skip the ids clients have chosen for games of their own
+            while str(self._next_id) in self._sessions:
+                self._next_id += 1
+            game_id = str(self._next_id)
+            self._next_id += 1
+        elif not isinstance(game_id, str) or game_id in self._sessions:
+            raise ValueError(UNAVAILABLE_ID.format(game_id))
+        self._sessions[game_id] = GameSession(self._engine(tuple_1, tuple_2), self._clock())
+        self._counters["created"] += 1
+        return game_id
+
+    def export_game(self, game_id: str) -> tuple:
+        """removes a game from the server and returns it as a tuple (player 1 tuple, player 2 tuple, position
+        packed by to_bytes(), moves, rejected moves) that import_game() can host again"""
+        session = self.find_session(game_id)
+        del self._sessions[game_id]
+        game = session.game
+        names = game.get_player_names()
+        colors = game.get_player_colors()
+        return ((names[0], colors[0]), (names[1], colors[1]), game.to_bytes(), session.moves, session.rejected)
+
+    def import_game(self, game_id: str, record: tuple):
+        """hosts a game exported by export_game() under the id passed. raises ValueError if the id is taken"""
+        if game_id in self._sessions:
+            raise ValueError(UNAVAILABLE_ID.format(game_id))
+        game = self._engine(record[0], record[1])
+        game.from_bytes(record[2])
+        session = GameSession(game, self._clock())
+        session.moves = record[3]
+        session.rejected = record[4]
+        self._sessions[game_id] = session
+        return
+
+    def evict_idle(self) -> int:
+        """removes every game that has not been used for idle_timeout seconds and returns how many were removed"""
+        cutoff = self._clock() - self._idle_timeout
+        idle = [game_id for game_id, session in self._sessions.items() if session.last_active <= cutoff]
+        for game_id in idle:
+            del self._sessions[game_id]
+        self._counters["evicted"] += len(idle)
+        return len(idle)
+
+    def handle_request(self, request: dict) -> dict:
+        """carries out one request and returns its response. never raises for a bad request; the response holds
+        an error message instead"""
+        self._counters["requests"] += 1
+        response = {"id": request.get("id") if isinstance(request, dict) else None}
+        try:
+            response["result"] = self.dispatch(request)
+        except (TypeError, ValueError) as error:
+            self._counters["errors"] += 1
+            response["error"] = str(error)
+        except Exception as error:
+            # a request the checks let through still gets a response instead of closing the connection
+            self._counters["errors"] += 1
+            response["error"] = f"request failed: {error!r}"
+        return response
+
+    def dispatch(self, request: dict):
+        """carries out one request and returns its result. raises ValueError or TypeError for a bad request"""
+        if not isinstance(request, dict):
+            raise TypeError("request must be a JSON object")
+        operation = request.get("op")
+        if operation == "create":
+            tuple_1, tuple_2 = get_players(request)
+            return self.create_game(tuple_1, tuple_2, request.get("game"))
+        if operation == "metrics":
+            if "game" in request:
+                return self.get_session_metrics(request["game"])
+            return self.get_metrics()
+        if operation == "close":
+            self.find_session(get_field(request, "game"))
+            del self._sessions[request["game"]]
+            return True
+        if operation not in GAME_CALLS:
+            raise ValueError(f"unknown op {operation!r}")
+
+        session = self.find_session(get_field(request, "game"))
+        session.last_active = self._clock()
+        arguments = []
+        for field in GAME_CALLS[operation]:
+            if field == "coordinates":
+                arguments.append(get_coordinates(request))
+            else:
+                arguments.append(get_string(request, field))
+        result = getattr(session.game, operation)(*arguments)
+
+        if operation == "make_move" or operation == "try_move":
+            if result is True or result is MoveStatus.LEGAL:
+                session.moves += 1
+                self._counters["moves"] += 1
+            else:
+                session.rejected += 1
+                self._counters["rejected"] += 1
+        if operation == "get_winner" and result != None:
+            result = str(result)        # KubaGame returns the winning Player object
+        if isinstance(result, MoveStatus):
+            result = result.name        # such as "LEGAL" or "WRONG_TURN"
+        return result
+
+    def find_session(self, game_id) -> GameSession:
+        """returns the session of the game id passed. raises ValueError if there is no such game"""
+        session = self._sessions.get(game_id) if isinstance(game_id, str) else None
+        if session == None:
+            raise ValueError(f"no game {game_id!r}")
+        return session
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """serves the requests of one connection in order until the client disconnects"""
+        self._counters["connections"] += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    break               # the request line is longer than max_line
+                if len(line) == 0:
+                    break
+                if len(line.strip()) == 0:
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    self._counters["requests"] += 1
+                    self._counters["errors"] += 1
+                    response = {"id": None, "error": "request is not valid JSON"}
+                else:
+                    response = self.handle_request(request)
+                writer.write(json.dumps(response).encode() + b"\n")
+
+                # wait for the client to read its responses before reading more requests
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._counters["connections"] -= 1
+            writer.close()
+        return
+
+    async def evict_periodically(self, interval: float):
+        """evicts idle games every interval seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """starts serving on the host and port passed and returns the port, which is chosen by the system when
+        port is 0"""
+        self._server = await asyncio.start_server(self.handle_connection, host, port, limit=self._max_line)
+        self._eviction_task = asyncio.ensure_future(self.evict_periodically(max(self._idle_timeout / 4, 0.01)))
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """stops serving and waits for the listening socket to close"""
+        if self._eviction_task != None:
+            self._eviction_task.cancel()
+            self._eviction_task = None
+        if self._server != None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        return
+
+
+class KubaClient:
+    """represents a connection to a KubaServer. every call sends one request and waits for its response, and
+    raises RuntimeError with the server's message if the request failed, or ConnectionError if the server closed
+    the connection instead of answering"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """wraps the streams of an open connection"""
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 1
+
+    async def call(self, operation: str, **fields):
+        """sends a request for the operation with the fields passed and returns its result"""
+        request = {"id": self._next_id, "op": operation}
+        request.update(fields)
+        self._next_id += 1
+        self._writer.write(json.dumps(request).encode() + b"\n")
+        await self._writer.drain()
+        line = await self._reader.readline()
+        if len(line) == 0:
+            raise ConnectionError("the server closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    async def create(self, tuple_1: tuple, tuple_2: tuple) -> str:
+        """creates a game and returns its id"""
+        return await self.call("create", players=[list(tuple_1), list(tuple_2)])
+
+    async def make_move(self, game_id: str, player_name: str, coordinates: tuple, direction: str) -> bool:
+        """makes a move in the game and returns True if it was executed"""
+        return await self.call("make_move", game=game_id, player=player_name, coordinates=list(coordinates),
+                               direction=direction)
+
+    async def try_move(self, game_id: str, player_name: str, coordinates: tuple, direction: str) -> MoveStatus:
+        """makes a move in the game and returns the MoveStatus of the attempt, LEGAL if it was executed"""
+        return MoveStatus[await self.call("try_move", game=game_id, player=player_name,
+                                          coordinates=list(coordinates), direction=direction)]
+
+    async def check_move(self, game_id: str, player_name: str, coordinates: tuple, direction: str) -> MoveStatus:
+        """returns the MoveStatus make_move() would give the move in the game, without making it"""
+        return MoveStatus[await self.call("check_move", game=game_id, player=player_name,
+                                          coordinates=list(coordinates), direction=direction)]
+
+    async def get_marble(self, game_id: str, coordinates: tuple) -> str:
+        """returns the marble in the cell of the game"""
+        return await self.call("get_marble", game=game_id, coordinates=list(coordinates))
+
+    async def get_marble_count(self, game_id: str) -> tuple:
+        """returns the number of white, black, and red marbles on the board of the game"""
+        return tuple(await self.call("get_marble_count", game=game_id))
+
+    async def get_current_turn(self, game_id: str) -> str:
+        """returns the name of the player to move in the game"""
+        return await self.call("get_current_turn", game=game_id)
+
+    async def get_winner(self, game_id: str) -> str:
+        """returns the name of the winner of the game, or None"""
+        return await self.call("get_winner", game=game_id)
+
+    async def get_captured(self, game_id: str, player_name: str) -> int:
+        """returns the number of red marbles captured by the player in the game"""
+        return await self.call("get_captured", game=game_id, player=player_name)
+
+    async def close(self):
+        """closes the connection"""
+        self._writer.close()
+        await self._writer.wait_closed()
+        return
+
+
+async def connect(host: str, port: int) -> KubaClient:
+    """opens a connection to a server and returns a client for it"""
+    reader, writer = await asyncio.open_connection(host, port)
+    return KubaClient(reader, writer)
+
+
+async def serve(host: str, port: int, engine: str, idle_timeout: float):
+    """runs a server until the process is stopped"""
+    server = KubaServer(ENGINES[engine], idle_timeout=idle_timeout)
+    port = await server.start(host, port)
+    print(f"serving Kuba games on {host}:{port}")
+    while True:
+        await asyncio.sleep(3600)
+
+
+def main():
+    """parses the command line and runs a server"""
+    parser = argparse.ArgumentParser(description="host Kuba games over line-delimited JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--engine", choices=tuple(ENGINES), default="object")
+    parser.add_argument("--idle-timeout", type=float, default=600.0, help="seconds before an unused game is evicted")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.engine, args.idle_timeout))
+    except KeyboardInterrupt:
+        pass
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the source code for the KubaShardHost class, which hosts games of Kuba across
+#               several worker processes. Each worker runs a KubaServer and owns the games that a consistent
+#               hash ring assigns to it by game id. Requests use the same dictionaries as KubaServer and are
+#               forwarded to the workers over pipes in batches, one message per worker per batch, so the cost of
+#               a pipe round trip is shared by every request in the batch. When a worker is added or removed only
+#               the games whose owner changes are moved, as their packed positions from to_bytes(). The host
+#               keeps per-shard request counts, busy time and round-trip latency. A worker that stops is
+#               replaced by an empty worker under the same name, and the requests it was sent and the games it
+#               hosted are answered with errors. Run this file directly to benchmark a host on random games.
+
+# %%
+import argparse
+import bisect
+import hashlib
+import multiprocessing
+import os
+import time
+from collections import deque
+
+from KubaNotation import random_game
+from KubaServer import ENGINES, UNAVAILABLE_ID, KubaServer
+
+REPLICAS = 64               # points on the hash ring per worker
+LATENCY_WINDOW = 1024       # round trips kept per shard for the latency figures
+
+
+def stable_hash(key: str) -> int:
+    """returns a 64 bit hash of the key passed that is the same in every process, unlike hash()"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+class HashRing:
+    """represents a consistent hash ring. each node is placed at several points on the ring and a key belongs to
+    the node at the first point after the key's hash, so adding or removing a node only moves the keys next to
+    that node's points"""
+
+    def __init__(self, replicas: int = REPLICAS) -> None:
+        """initializes an empty ring placing each node at replicas points"""
+        self._replicas = replicas
+        self._points = []
+        self._nodes = []
+
+    def get_nodes(self) -> list:
+        """returns the nodes on the ring"""
+        return sorted(set(self._nodes))
+
+    def add_node(self, node: str):
+        """places a node on the ring"""
+        for replica in range(self._replicas):
+            point = stable_hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._nodes.insert(index, node)
+        return
+
+    def remove_node(self, node: str):
+        """removes a node from the ring"""
+        kept = [(point, owner) for point, owner in zip(self._points, self._nodes) if owner != node]
+        self._points = [point for point, owner in kept]
+        self._nodes = [owner for point, owner in kept]
+        return
+
+    def lookup(self, key: str) -> str:
+        """returns the node that owns the key passed. raises ValueError if the ring is empty"""
+        if len(self._points) == 0:
+            raise ValueError("the hash ring has no nodes")
+        index = bisect.bisect(self._points, stable_hash(key))
+        return self._nodes[index % len(self._nodes)]
+
+
+def error_response(request, message: str) -> dict:
+    """returns the response to a request that could not be carried out, as KubaServer would answer it"""
+    return {"id": request.get("id") if isinstance(request, dict) else None, "error": message}
+
+
+def run_shard(connection, engine_name: str, idle_timeout: float):
+    """runs a worker process, carrying out the messages sent over the connection until told to stop. a message
+    is a tuple of a command and its argument:
+
+        ("requests", list of requests)  replies with the list of responses
+        ("list", None)                  replies with the list of game ids hosted
+        ("export", list of game ids)    replies with a dictionary of game id to export_game() record
+        ("import", dictionary)          hosts the exported games and replies with the number hosted
+        ("metrics", None)               replies with the server metrics and the seconds spent on requests
+        ("stop", None)                  replies with True and returns
+    """
+    server = KubaServer(ENGINES[engine_name], idle_timeout=idle_timeout)
+    sessions = server.get_sessions()
+    busy = 0.0
+    while True:
+        command, argument = connection.recv()
+        if command == "requests":
+            start = time.perf_counter()
+            reply = []
+            for request in argument:
+
+                # one request that breaks the server must not stop the worker and every game on it
+                try:
+                    reply.append(server.handle_request(request))
+                except Exception as error:
+                    reply.append(error_response(request, f"request failed: {error!r}"))
+            busy += time.perf_counter() - start
+        elif command == "list":
+            reply = list(sessions)
+        elif command == "export":
+            reply = {game_id: server.export_game(game_id) for game_id in argument if game_id in sessions}
+        elif command == "import":
+            reply = 0
+            for game_id, record in argument.items():
+                try:
+                    server.import_game(game_id, record)
+                except ValueError:
+                    continue            # the worker already hosts a game with this id
+                reply += 1
+        elif command == "metrics":
+            reply = server.get_metrics()
+            reply["busy"] = busy
+        elif command == "stop":
+            connection.send(True)
+            break
+        else:
+            reply = None
+        connection.send(reply)
+    connection.close()
+    return
+
+
+class ShardStats:
+    """holds the host's view of one worker: requests sent, batches sent, recent round-trip times, and how many
+    times the worker has been restarted after stopping"""
+    __slots__ = ("requests", "batches", "latencies", "restarts")
+
+    def __init__(self) -> None:
+        """initializes empty counters"""
+        self.requests = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.restarts = 0
+
+
+class KubaShardHost:
+    """represents a host that spreads games across worker processes by game id. requests are passed to
+    submit() in batches and answered in the same order, exactly as KubaServer.handle_request() would answer
+    them; create requests without a game id are given one by the host"""
+
+    def __init__(self, workers: int = None, engine: str = "object", idle_timeout: float = 600.0,
+                 replicas: int = REPLICAS) -> None:
+        """starts the number of workers passed, one per CPU by default, each hosting games of the engine named"""
+        self._engine = engine
+        self._idle_timeout = idle_timeout
+        self._ring = HashRing(replicas)
+        self._shards = {}           # shard name -> (process, connection)
+        self._stats = {}            # shard name -> ShardStats
+        self._next_shard = 0
+        self._next_game = 1
+        for _ in range(workers or os.cpu_count() or 1):
+            self.add_worker()
+
+    def get_shards(self) -> list:
+        """returns the names of the workers"""
+        return list(self._shards)
+
+    def get_pids(self) -> dict:
+        """returns a dictionary of worker name to the process id of the worker"""
+        return {name: process.pid for name, (process, connection) in self._shards.items()}
+
+    def get_owner(self, game_id: str) -> str:
+        """returns the name of the worker that owns the game id passed"""
+        return self._ring.lookup(game_id)
+
+    def add_worker(self) -> str:
+        """starts a new worker, moves the games it now owns onto it, and returns its name"""
+        name = f"shard-{self._next_shard}"
+        self._next_shard += 1
+        self._shards[name] = self.start_worker(name)
+        self._stats[name] = ShardStats()
+        self._ring.add_node(name)
+        self.rebalance()
+        return name
+
+    def start_worker(self, name: str) -> tuple:
+        """starts a worker process with the name passed and returns it with the host's end of its pipe"""
+        connection, worker_connection = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=run_shard, name=name, daemon=True,
+                                          args=(worker_connection, self._engine, self._idle_timeout))
+        process.start()
+        worker_connection.close()
+        return process, connection
+
+    def restart_worker(self, name: str):
+        """replaces a worker that has stopped with an empty worker under the same name, so the ring does not
+        change. the games the stopped worker hosted are lost, and requests for them are answered as for an
+        unknown game"""
+        process, connection = self._shards[name]
+        connection.close()
+        if process.is_alive():
+            process.terminate()         # its pipe has failed, so it can no longer be told to stop
+        process.join()
+        self._shards[name] = self.start_worker(name)
+        self._stats[name].restarts += 1
+        return
+
+    def check_workers(self) -> list:
+        """restarts every worker whose process has stopped and returns their names"""
+        stopped = [name for name, (process, connection) in self._shards.items() if not process.is_alive()]
+        for name in stopped:
+            self.restart_worker(name)
+        return stopped
+
+    def remove_worker(self, name: str):
+        """moves the games of a worker to the workers that now own them and stops it. raises ValueError for an
+        unknown worker or the last worker"""
+        self.check_workers()
+        if name not in self._shards:
+            raise ValueError(f"no worker {name!r}")
+        if len(self._shards) == 1:
+            raise ValueError("cannot remove the last worker")
+        self._ring.remove_node(name)
+        self.rebalance()
+        process, connection = self._shards.pop(name)
+        del self._stats[name]
+        self.call(connection, "stop", None)
+        connection.close()
+        process.join()
+        return
+
+    def rebalance(self) -> int:
+        """moves every game whose worker is not its owner on the ring to its owner, and returns how many games
+        were moved. workers that are no longer on the ring give up all of their games"""
+        self.check_workers()
+        moved = 0
+        for name, (process, connection) in self._shards.items():
+            outgoing = {}
+            for game_id in self.call(connection, "list", None):
+                owner = self._ring.lookup(game_id)
+                if owner != name:
+                    outgoing.setdefault(owner, []).append(game_id)
+            for owner, game_ids in outgoing.items():
+                records = self.call(connection, "export", game_ids)
+                moved += self.call(self._shards[owner][1], "import", records)
+        return moved
+
+    def call(self, connection, command: str, argument):
+        """sends one message to a worker and returns its reply"""
+        connection.send((command, argument))
+        return connection.recv()
+
+    def submit(self, requests: list) -> list:
+        """forwards a batch of requests to the workers that own their games and returns the responses in the
+        order of the requests. the batch for every worker is sent before any reply is read, so the workers
+        carry out their parts of the batch at the same time. the requests sent to a worker that stops before
+        replying are answered with an error naming the worker, and the worker is restarted. a create request
+        given an id that a client has already chosen for a game of its own is sent again with the next id"""
+        self.check_workers()
+        batches = {}            # shard name -> (request positions, requests)
+        generated = {}          # request position -> game id given by the host
+        for position, request in enumerate(requests):
+            game_id = request.get("game") if isinstance(request, dict) else None
+            if not isinstance(game_id, str):
+                if isinstance(request, dict) and request.get("op") == "create" and game_id == None:
+                    game_id = str(self._next_game)
+                    self._next_game += 1
+                    generated[position] = game_id
+                    request = dict(request, game=game_id)
+                else:
+                    game_id = ""        # any worker can answer a request without a valid game id
+            batch = batches.setdefault(self._ring.lookup(game_id), ([], []))
+            batch[0].append(position)
+            batch[1].append(request)
+
+        started = {}
+        stopped = []
+        for name, batch in batches.items():
+            try:
+                self._shards[name][1].send(("requests", batch[1]))
+            except OSError:
+                stopped.append(name)
+                continue
+            started[name] = time.perf_counter()
+        responses = [None] * len(requests)
+        for name, batch in batches.items():
+            if name in started:
+                try:
+                    replies = self._shards[name][1].recv()
+                except (EOFError, OSError):
+                    stopped.append(name)
+            if name in stopped:
+                replies = [error_response(request, f"worker {name} stopped; its games were lost")
+                           for request in batch[1]]
+            else:
+                stats = self._stats[name]
+                stats.latencies.append(time.perf_counter() - started[name])
+                stats.requests += len(batch[1])
+                stats.batches += 1
+            for position, reply in zip(batch[0], replies):
+                responses[position] = reply
+        for name in stopped:
+            self.restart_worker(name)
+
+        taken = [position for position, game_id in generated.items()
+                 if responses[position].get("error") == UNAVAILABLE_ID.format(game_id)]
+        if len(taken) > 0:
+            for position, response in zip(taken, self.submit([requests[position] for position in taken])):
+                responses[position] = response
+        return responses
+
+    def handle_request(self, request: dict) -> dict:
+        """forwards one request and returns its response"""
+        return self.submit([request])[0]
+
+    def create_game(self, tuple_1: tuple, tuple_2: tuple) -> str:
+        """creates a game between the two (player name, player color) tuples passed and returns its id. raises
+        ValueError if the worker cannot host it"""
+        response = self.handle_request({"op": "create", "players": [list(tuple_1), list(tuple_2)]})
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    def get_metrics(self) -> dict:
+        """returns a dictionary of shard name to the worker's server metrics and the host's figures for it:
+        requests and batches sent, busy seconds in the worker, throughput in requests per busy second, the mean
+        and 99th percentile round-trip time in seconds over the last LATENCY_WINDOW batches, and the number of
+        restarts"""
+        self.check_workers()
+        metrics = {}
+        for name, (process, connection) in self._shards.items():
+            shard = self.call(connection, "metrics", None)
+            stats = self._stats[name]
+            latencies = sorted(stats.latencies)
+            shard["sent"] = stats.requests
+            shard["batches"] = stats.batches
+            shard["throughput"] = stats.requests / shard["busy"] if shard["busy"] > 0 else 0.0
+            shard["latency_mean"] = sum(latencies) / len(latencies) if len(latencies) > 0 else 0.0
+            shard["latency_p99"] = latencies[int(len(latencies) * 0.99)] if len(latencies) > 0 else 0.0
+            shard["restarts"] = stats.restarts
+            metrics[name] = shard
+        return metrics
+
+    def close(self):
+        """stops every worker"""
+        for name, (process, connection) in self._shards.items():
+            try:
+                self.call(connection, "stop", None)
+            except (EOFError, OSError):
+                pass                    # the worker has already stopped
+            connection.close()
+            process.join()
+        self._shards = {}
+        self._stats = {}
+        return
+
+
+def main():
+    """parses the command line and benchmarks a host, playing one move in every game per batch"""
+    parser = argparse.ArgumentParser(description="benchmark Kuba games sharded across worker processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", choices=tuple(ENGINES), default="object")
+    parser.add_argument("--games", type=int, default=1000, help="games played at once")
+    parser.add_argument("--moves", type=int, default=100, help="most moves played in each game")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    games = [random_game(f"{args.seed}:{number}", args.moves) for number in range(args.games)]
+    host = KubaShardHost(args.workers, args.engine)
+    try:
+        game_ids = [host.create_game(("A", "W"), ("B", "B")) for _ in games]
+        start = time.perf_counter()
+        accepted = 0
+        for ply in range(max(len(moves) for moves in games)):
+            requests = [{"op": "make_move", "game": game_id, "player": moves[ply][0],
+                         "coordinates": moves[ply][1], "direction": moves[ply][2]}
+                        for game_id, moves in zip(game_ids, games) if ply < len(moves)]
+            accepted += sum(1 for response in host.submit(requests) if response.get("result") == True)
+        elapsed = time.perf_counter() - start
+        print(f"{accepted} moves in {elapsed:.2f} s, {accepted / elapsed:.0f} moves/s on {args.workers} workers")
+        for name, shard in host.get_metrics().items():
+            print(f"{name}: {shard['games']} games, {shard['moves']} moves, {shard['throughput']:.0f} requests/busy s, "
+                  f"latency mean {shard['latency_mean'] * 1000:.2f} ms p99 {shard['latency_p99'] * 1000:.2f} ms")
+    finally:
+        host.close()
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the symmetry canonicalization of Kuba positions. The rules of Kuba do not
+#               change when the board is rotated or reflected, or when the two players trade places, so each
+#               position belongs to a class of up to 16 equivalent positions: the 8 rotations and reflections
+#               of the board, each with the players kept or swapped. The start position, for one, is unchanged
+#               by a quarter turn with the players swapped. canonicalize() picks one representative of the
+#               class, the variant that sorts first, and returns the transform that turns the position into it.
+#               A move found for the canonical position, such as from an opening book, is mapped back to the
+#               real position with the inverse transform.
+#
+#               Positions are handled as the bytes packed by KubaCodec, so the same routines serve KubaGame
+#               and KubaBitboard. A transform is an integer from 0 to 15: bits 0-2 select one of the board
+#               symmetries in SYMMETRIES and bit 3 swaps the players.
+
+# %%
+from operator import itemgetter
+
+import KubaCodec
+
+# each board symmetry as a function of (row, col) to the cell it moves to
+SYMMETRIES = (
+    lambda row, col: (row, col),            # identity
+    lambda row, col: (col, 6 - row),        # quarter turn clockwise
+    lambda row, col: (6 - row, 6 - col),    # half turn
+    lambda row, col: (6 - col, row),        # quarter turn counterclockwise
+    lambda row, col: (row, 6 - col),        # mirror left to right
+    lambda row, col: (6 - row, col),        # mirror top to bottom
+    lambda row, col: (col, row),            # mirror across the main diagonal
+    lambda row, col: (6 - col, 6 - row),    # mirror across the other diagonal
+)
+SWAP = 8
+TRANSFORMS = 16
+IDENTITY = 0
+
+# the (row, col) step of each direction in KubaCodec.DIRECTIONS
+STEPS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# the value of each KubaCodec cell value when the players are swapped
+SWAPPED_VALUES = (KubaCodec.EMPTY, KubaCodec.PLAYER_2, KubaCodec.PLAYER_1, KubaCodec.RED)
+
+
+def _build_tables() -> tuple:
+    """builds the cell and direction tables of every board symmetry: the cell each cell moves to, the cell
+    each cell comes from, and the direction each direction turns into"""
+    cell_maps = []
+    source_maps = []
+    direction_maps = []
+    for symmetry in SYMMETRIES:
+        cell_map = [0] * 49
+        for row in range(7):
+            for col in range(7):
+                new_row, new_col = symmetry(row, col)
+                cell_map[row * 7 + col] = new_row * 7 + new_col
+        source_map = [0] * 49
+        for cell, new_cell in enumerate(cell_map):
+            source_map[new_cell] = cell
+        directions = []
+        for row_step, col_step in STEPS:
+
+            # the direction a step from the center cell turns into is the step between their images
+            center = symmetry(3, 3)
+            target = symmetry(3 + row_step, 3 + col_step)
+            directions.append(STEPS.index((target[0] - center[0], target[1] - center[1])))
+        cell_maps.append(tuple(cell_map))
+        source_maps.append(tuple(source_map))
+        direction_maps.append(tuple(directions))
+    return tuple(cell_maps), tuple(source_maps), tuple(direction_maps)
+
+
+CELL_MAPS, SOURCE_MAPS, DIRECTION_MAPS = _build_tables()
+
+# functions that read the cells of a board in the order of each symmetry's image, and the byte table that
+# swaps the players' cell values
+SOURCE_GETTERS = tuple(itemgetter(*source_map) for source_map in SOURCE_MAPS)
+SWAP_TABLE = bytes(SWAPPED_VALUES) + bytes(range(4, 256))
+
+# the symmetry that undoes each symmetry. only the quarter turns are not their own inverse
+INVERSE_SYMMETRIES = (0, 3, 2, 1, 4, 5, 6, 7)
+
+
+def inverse(transform: int) -> int:
+    """returns the transform that undoes the transform passed"""
+    return INVERSE_SYMMETRIES[transform & 7] | (transform & SWAP)
+
+
+def transform_cell(cell: int, transform: int) -> int:
+    """returns the cell (row * 7 + col) that a cell moves to under the transform"""
+    return CELL_MAPS[transform & 7][cell]
+
+
+def transform_move(move: int, transform: int) -> int:
+    """returns the move byte that a move byte turns into under the transform. swapping the players does not
+    change a move, only who makes it"""
+    symmetry = transform & 7
+    return CELL_MAPS[symmetry][move >> 2] * 4 + DIRECTION_MAPS[symmetry][move & 3]
+
+
+def transform_player(player: int, transform: int) -> int:
+    """returns the player index that a player index (0 or 1) turns into under the transform"""
+    return 1 - player if transform & SWAP else player
+
+
+def transform_position(data: bytes, transform: int) -> bytes:
+    """returns a position packed by KubaCodec with the transform applied to it"""
+    cells, turn, winner, captured_red, captured_opponent, reverse_move = KubaCodec.unpack_position(data)
+    return _pack_transformed(cells, turn, winner, captured_red, reverse_move, transform)
+
+
+def _pack_transformed(cells: list, turn, winner, captured_red: tuple, reverse_move, transform: int) -> bytes:
+    """packs the unpacked position passed with the transform applied to it"""
+    source = SOURCE_MAPS[transform & 7]
+    if transform & SWAP:
+        new_cells = [SWAPPED_VALUES[cells[source[cell]]] for cell in range(49)]
+        turn = None if turn == None else 1 - turn
+        winner = None if winner == None else 1 - winner
+        red = captured_red[1]
+    else:
+        new_cells = [cells[source[cell]] for cell in range(49)]
+        red = captured_red[0]
+    if reverse_move != None:
+        reverse_move = transform_move(reverse_move, transform)
+    return KubaCodec.pack_position(new_cells, turn, winner, red, reverse_move)
+
+
+def canonicalize(data: bytes) -> tuple:
+    """returns the canonical form of a position packed by KubaCodec together with the transform that turns the
+    position into it. equivalent positions have the same canonical form. the canonical form is the variant
+    whose cells, read in cell order, and then player to move, winner, red marbles captured and reverse move
+    come first when compared as bytes; when several transforms give it, the smallest is returned"""
+    cells, turn, winner, captured_red, captured_opponent, reverse_move = KubaCodec.unpack_position(data)
+
+    # compare the variants by their cells as bytes, and only pack the one chosen
+    board = bytes(cells)
+    swapped = board.translate(SWAP_TABLE)
+    best = None
+    best_transform = IDENTITY
+    for transform in range(TRANSFORMS):
+        if transform & SWAP:
+            key = bytes(SOURCE_GETTERS[transform & 7](swapped))
+            flags = (2 - turn if turn != None else 0, 2 - winner if winner != None else 0, captured_red[1])
+        else:
+            key = bytes(SOURCE_GETTERS[transform](board))
+            flags = (turn + 1 if turn != None else 0, winner + 1 if winner != None else 0, captured_red[0])
+        if best != None and key > best[0]:
+            continue
+        reverse = transform_move(reverse_move, transform) + 1 if reverse_move != None else 0
+        key = (key, flags, reverse)
+        if best == None or key < best:
+            best = key
+            best_transform = transform
+    return _pack_transformed(cells, turn, winner, captured_red, reverse_move, best_transform), best_transform
+
+
+def canonical_game(game) -> tuple:
+    """returns the canonical form of the position of a KubaGame or KubaBitboard and the transform that turns the
+    game's position into it, as canonicalize() does"""
+    return canonicalize(game.to_bytes())
+
+
+def move_from_canonical(coordinates: tuple, direction: str, transform: int) -> tuple:
+    """returns the (coordinates, direction) move in the real position for a move in the canonical position,
+    where transform is the transform canonicalize() returned for the real position"""
+    move = transform_move(KubaCodec.encode_move(coordinates, direction), inverse(transform))
+    return KubaCodec.decode_move(move)
+
+
+def move_to_canonical(coordinates: tuple, direction: str, transform: int) -> tuple:
+    """returns the (coordinates, direction) move in the canonical position for a move in the real position"""
+    return KubaCodec.decode_move(transform_move(KubaCodec.encode_move(coordinates, direction), transform))
@@ -0,0 +1,154 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the source code for running tournaments between Kuba bots. Games are
+#               spread across a pool of worker processes, each of which plays its games on its own game
+#               objects and sends back only a small result record. Every game is seeded from the tournament
+#               seed and its game number, so a tournament gives the same results for any number of workers.
+#               Run this file directly for the command line interface, or call run_tournament().
+
+# %%
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from KubaBitboard import KubaBitboard
+from KubaGame import KubaGame
+from KubaSearch import KubaSearch
+
+ENGINES = {"bitboard": KubaBitboard, "object": KubaGame}
+BOT_NAMES = ("random", "greedy", "search")
+PLAYER_NAMES = ("A", "B")
+
+
+def make_bot(bot_name: str, nodes: int):
+    """returns a bot for the bot name passed. a bot is a function that takes a game, the name of the player to
+    move and a random number generator, and returns a legal (coordinates, direction) move or None"""
+    if bot_name == "random":
+        def random_bot(game, player_name: str, generator: random.Random):
+            """plays a random legal move"""
+            moves = game.legal_moves(player_name)
+            if len(moves) == 0:
+                return None
+            return generator.choice(moves)
+        return random_bot
+
+    # search bots are limited by nodes instead of time so that games can be replayed from their seed
+    if bot_name == "greedy":
+        engine = KubaSearch(max_depth=1)
+    elif bot_name == "search":
+        engine = KubaSearch(node_limit=nodes, table_bits=16)
+    else:
+        raise ValueError(f"unknown bot {bot_name!r}, expected one of {', '.join(BOT_NAMES)}")
+
+    def search_bot(game, player_name: str, generator: random.Random):
+        """plays the move found by the search engine"""
+        return engine.search(game, player_name)
+    return search_bot
+
+
+def game_seed(seed: int, game_number: int) -> str:
+    """returns the seed of one game of a tournament"""
+    return f"{seed}:{game_number}"
+
+
+def play_game(task: tuple) -> dict:
+    """plays one game of a tournament and returns its result. the task is a tuple (game number, bot names,
+    tournament seed, search nodes, maximum moves, engine name). the bots swap who moves first every game, and
+    the result names the bot that moved first as "first", 0 for bot 1 and 1 for bot 2"""
+    game_number, bot_names, seed, nodes, max_moves, engine_name = task
+    generator = random.Random(game_seed(seed, game_number))
+    game = ENGINES[engine_name]((PLAYER_NAMES[0], "W"), (PLAYER_NAMES[1], "B"))
+    bots = (make_bot(bot_names[0], nodes), make_bot(bot_names[1], nodes))
+
+    # player A moves first. bot 1 plays player A in even games and player B in odd games, so bot 1 moves first
+    # in even games and bot 2 in odd games
+    first = game_number % 2
+    turn = 0
+    moves = 0
+    while game.get_winner() == None and moves < max_moves:
+        bot = bots[turn ^ first]
+        move = bot(game, PLAYER_NAMES[turn], generator)
+        if move == None or game.make_move(PLAYER_NAMES[turn], move[0], move[1]) == False:
+            break
+        moves += 1
+        turn ^= 1
+
+    # report the winner as the index of the winning bot, or None for an unfinished game
+    winner = game.get_winner()
+    if winner != None:
+        winner = PLAYER_NAMES.index(str(winner)) ^ first
+    captured = [game.get_captured(PLAYER_NAMES[0]), game.get_captured(PLAYER_NAMES[1])]
+    if first == 1:
+        captured.reverse()
+    return {"game": game_number,
+            "first": first,
+            "winner": winner,
+            "moves": moves,
+            "marble_count": game.get_marble_count(),
+            "captured": tuple(captured)}
+
+
+def run_tournament(bot_1: str, bot_2: str, games: int, seed: int = 0, workers: int = None, nodes: int = 2000,
+                   max_moves: int = 500, engine: str = "bitboard") -> list:
+    """plays games between the two bots named and returns the list of game results in game order. the games are
+    spread across a pool of worker processes; workers=None uses one process per core and workers=1 plays every
+    game in this process"""
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+    tasks = [(number, (bot_1, bot_2), seed, nodes, max_moves, engine) for number in range(games)]
+    if workers == None:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        return [play_game(task) for task in tasks]
+
+    # hand out games in chunks so each worker gets several chunks and the pool stays balanced
+    chunk_size = max(1, games // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(play_game, tasks, chunksize=chunk_size))
+
+
+def summarize(results: list) -> dict:
+    """returns the number of wins of each bot, the number of unfinished games, and the average game length"""
+    wins = [0, 0]
+    unfinished = 0
+    moves = 0
+    for result in results:
+        if result["winner"] == None:
+            unfinished += 1
+        else:
+            wins[result["winner"]] += 1
+        moves += result["moves"]
+    average = moves / len(results) if len(results) > 0 else 0
+    return {"games": len(results), "wins": tuple(wins), "unfinished": unfinished, "average_moves": average}
+
+
+def main():
+    """parses the command line and runs a tournament"""
+    parser = argparse.ArgumentParser(description="play a tournament between two Kuba bots")
+    parser.add_argument("bot_1", choices=BOT_NAMES)
+    parser.add_argument("bot_2", choices=BOT_NAMES)
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="tournament seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--nodes", type=int, default=2000, help="node budget per move of the search bot")
+    parser.add_argument("--max-moves", type=int, default=500, help="moves before a game is left unfinished")
+    parser.add_argument("--engine", choices=tuple(ENGINES), default="bitboard")
+    parser.add_argument("--output", help="file to write one JSON result per line to")
+    args = parser.parse_args()
+
+    results = run_tournament(args.bot_1, args.bot_2, args.games, args.seed, args.workers, args.nodes,
+                             args.max_moves, args.engine)
+    if args.output != None:
+        with open(args.output, "w") as output:
+            for result in results:
+                output.write(json.dumps(result) + "\n")
+    summary = summarize(results)
+    print(f"{args.bot_1} {summary['wins'][0]} - {summary['wins'][1]} {args.bot_2}, "
+          f"{summary['unfinished']} unfinished, {summary['average_moves']:.1f} moves per game")
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the KubaBitboard engine against KubaGame: the same moves, legal
+#               and illegal, must be answered the same way and leave the same board.
+
+# %%
+import random
+import unittest
+
+from KubaBitboard import KubaBitboard
+from KubaGame import DIRECTIONS, KubaGame
+
+PLAYERS = (("A", "W"), ("B", "B"))
+
+# moves that are always rejected, mixed into the random moves to check both engines reject them
+BAD_MOVES = (("C", (6, 5), "F"), ("A", (7, 0), "L"), ("A", (0, -1), "R"), ("B", (3, 3), "X"), ("a", (6, 5), "f"))
+
+
+def observe(game) -> tuple:
+    """returns everything the public interface of an engine tells about its game"""
+    board = tuple(game.get_marble((row, col)) for row in range(7) for col in range(7))
+    winner = game.get_winner()
+    return (board, game.get_marble_count(), None if winner == None else str(winner), game.get_current_turn(),
+            game.get_captured("A"), game.get_captured("B"), game.get_status(), game.to_bytes())
+
+
+class TestKubaBitboard(unittest.TestCase):
+    """tests that KubaBitboard answers every call the same way as KubaGame"""
+
+    def test_matches_kuba_game(self):
+        """in random games of legal and illegal moves by either player, both engines accept the same moves and
+        report the same board, counts, captures, turn, and winner after every move"""
+        generator = random.Random(1)
+        finished = 0
+        for number in range(20):
+            game = KubaGame(*PLAYERS)
+            bitboard = KubaBitboard(*PLAYERS)
+            self.assertEqual(observe(bitboard), observe(game))
+            for attempt in range(400):
+                player_name = generator.choice("AB")
+                legal = game.legal_moves(player_name)
+                if generator.random() < 0.1:
+                    move = generator.choice(BAD_MOVES)
+                elif generator.random() < 0.3 or len(legal) == 0:
+                    move = (player_name, (generator.randrange(7), generator.randrange(7)),
+                            generator.choice(DIRECTIONS))
+                else:
+                    move = (player_name,) + generator.choice(legal)
+                self.assertEqual(bitboard.make_move(*move), game.make_move(*move), move)
+                self.assertEqual(observe(bitboard), observe(game))
+                self.assertEqual(sorted(bitboard.legal_moves(player_name)), sorted(game.legal_moves(player_name)))
+                if game.get_winner() != None:
+                    finished += 1
+                    break
+        self.assertGreater(finished, 0)
+
+    def test_same_position_from_bytes(self):
+        """a position packed by one engine is set up the same way by the other"""
+        game = KubaGame(*PLAYERS)
+        for player_name, coordinates, direction in (("A", (6, 6), "F"), ("B", (6, 0), "F"), ("A", (0, 0), "B")):
+            game.make_move(player_name, coordinates, direction)
+        bitboard = KubaBitboard(*PLAYERS)
+        bitboard.from_bytes(game.to_bytes())
+        self.assertEqual(observe(bitboard), observe(game))
+        self.assertEqual(bitboard.make_move("B", (0, 6), "B"), game.make_move("B", (0, 6), "B"))
+        self.assertEqual(observe(bitboard), observe(game))
+
+
+if __name__ == "__main__":
+    unittest.main()
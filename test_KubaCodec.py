@@ -0,0 +1,141 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the KubaCodec position and move encodings, on their own and as
+#               used by the to_bytes() and from_bytes() methods of both engines.
+
+# %%
+import random
+import unittest
+
+import KubaCodec
+from KubaBitboard import KubaBitboard
+from KubaGame import DIRECTIONS, KubaGame
+
+PLAYERS = (("A", "W"), ("B", "B"))
+
+
+def random_position(generator: random.Random) -> tuple:
+    """returns the arguments of pack_position() for a random position: up to 8 marbles of each player and up to
+    13 red marbles on random cells, a random turn, winner and reverse move, and a number of captured red marbles
+    that fits the red marbles off the board"""
+    cells = [KubaCodec.EMPTY] * 49
+    placed = generator.sample(range(49), 29)
+    counts = (generator.randint(0, 8), generator.randint(0, 8), generator.randint(0, 13))
+    values = [KubaCodec.PLAYER_1] * counts[0] + [KubaCodec.PLAYER_2] * counts[1] + [KubaCodec.RED] * counts[2]
+    for cell, value in zip(placed, values):
+        cells[cell] = value
+    turn = generator.choice((None, 0, 1))
+    winner = generator.choice((None, 0, 1))
+    captured_red = generator.randint(0, min(7, 13 - counts[2]))
+    reverse_move = generator.choice((None, generator.randrange(196)))
+    return cells, turn, winner, captured_red, reverse_move
+
+
+def play_random_game(engine, seed: int, max_moves: int = 200) -> tuple:
+    """plays a game of random legal moves from the start position, player A first, and returns the game and
+    its list of (coordinates, direction) moves"""
+    generator = random.Random(seed)
+    game = engine(*PLAYERS)
+    moves = []
+    player_name = "A"
+    while player_name != None and len(moves) < max_moves:
+        legal = game.legal_moves(player_name)
+        if len(legal) == 0:
+            break
+        move = generator.choice(legal)
+        game.make_move(player_name, *move)
+        moves.append(move)
+        player_name = game.get_current_turn()
+    return game, moves
+
+
+class TestMoves(unittest.TestCase):
+    """tests the one byte move encoding and move logs"""
+
+    def test_round_trip(self):
+        """every move on the board has its own byte below 196 and decodes to itself"""
+        encoded = set()
+        for row in range(7):
+            for col in range(7):
+                for direction in DIRECTIONS:
+                    move = KubaCodec.encode_move((row, col), direction)
+                    self.assertEqual(KubaCodec.decode_move(move), ((row, col), direction))
+                    self.assertEqual(KubaCodec.encode_move((row, col), direction.lower()), move)
+                    encoded.add(move)
+        self.assertEqual(encoded, set(range(196)))
+
+    def test_move_log(self):
+        """the move log of a game is one byte per move, decodes to the moves, and replays to the same position
+        on either engine"""
+        for engine in (KubaGame, KubaBitboard):
+            for seed in range(3):
+                game, moves = play_random_game(engine, seed)
+                log = KubaCodec.encode_move_log(moves)
+                self.assertEqual(len(log), len(moves))
+                self.assertEqual(KubaCodec.decode_move_log(log), moves)
+                for replay_engine in (KubaGame, KubaBitboard):
+                    replayed = replay_engine(*PLAYERS)
+                    self.assertEqual(KubaCodec.replay_move_log(replayed, "A", log), len(moves))
+                    self.assertEqual(replayed.to_bytes(), game.to_bytes())
+
+    def test_replay_stops_at_rejected_move(self):
+        """replaying a log stops at the first move the game rejects and returns the number of moves made"""
+        log = KubaCodec.encode_move_log((((6, 6), "F"), ((6, 0), "F"), ((6, 6), "F"), ((0, 0), "B")))
+        game = KubaGame(*PLAYERS)
+        self.assertEqual(KubaCodec.replay_move_log(game, "A", log), 2)
+        self.assertEqual(game.get_current_turn(), "A")
+
+
+class TestPositions(unittest.TestCase):
+    """tests the packed position format and the engines' to_bytes() and from_bytes()"""
+
+    def test_round_trip(self):
+        """a packed position is POSITION_SIZE bytes and unpacks to what was packed, with the captured marbles
+        that follow from the board"""
+        generator = random.Random(8)
+        for number in range(500):
+            cells, turn, winner, captured_red, reverse_move = random_position(generator)
+            data = KubaCodec.pack_position(cells, turn, winner, captured_red, reverse_move)
+            self.assertEqual(len(data), KubaCodec.POSITION_SIZE)
+            unpacked = KubaCodec.unpack_position(data)
+            red = cells.count(KubaCodec.RED)
+            captured_opponent = (8 - cells.count(KubaCodec.PLAYER_2), 8 - cells.count(KubaCodec.PLAYER_1))
+            self.assertEqual(unpacked, (cells, turn, winner, (captured_red, 13 - red - captured_red),
+                                        captured_opponent, reverse_move))
+
+    def test_rejects_malformed_data(self):
+        """data of the wrong length or holding impossible values is a ValueError"""
+        start = KubaGame(*PLAYERS).to_bytes()
+        nine_marbles = [KubaCodec.PLAYER_1] * 9 + [KubaCodec.EMPTY] * 40
+        for data in (start[:-1], start + b"\x00", start[:13] + bytes((3, 0)), start[:13] + bytes((12, 0)),
+                     start[:13] + bytes((0, 197)), KubaCodec.pack_position(nine_marbles, 0, None, 0, None),
+                     KubaCodec.pack_position([KubaCodec.RED] * 13 + [KubaCodec.EMPTY] * 36, 0, None, 1, None)):
+            with self.assertRaises(ValueError):
+                KubaCodec.unpack_position(data)
+
+    def test_engine_round_trip(self):
+        """a position packed by either engine sets up a game on either engine that packs to the same bytes and
+        plays on the same way, and setting up a position clears the moves that could be taken back"""
+        for engine in (KubaGame, KubaBitboard):
+            for seed in range(3):
+                game, moves = play_random_game(engine, seed, 30 + 20 * seed)
+                data = game.to_bytes()
+                for copy_engine in (KubaGame, KubaBitboard):
+                    copy = copy_engine(*PLAYERS)
+                    self.assertTrue(copy.push_move("A", (6, 6), "F"))
+                    copy.from_bytes(data)
+                    self.assertFalse(copy.pop_move())
+                    self.assertEqual(copy.to_bytes(), data)
+                    self.assertEqual(copy.position_hash(), game.position_hash())
+                    self.assertEqual(copy.get_marble_count(), game.get_marble_count())
+                    self.assertEqual((copy.get_captured("A"), copy.get_captured("B")),
+                                     (game.get_captured("A"), game.get_captured("B")))
+                    self.assertEqual(str(copy.get_winner()), str(game.get_winner()))
+                    player_name = game.get_current_turn()
+                    if player_name != None:
+                        self.assertEqual(sorted(copy.legal_moves(player_name)),
+                                         sorted(game.legal_moves(player_name)))
+
+
+if __name__ == "__main__":
+    unittest.main()
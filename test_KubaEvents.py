@@ -0,0 +1,96 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the events a KubaGame publishes to its subscribers.
+
+# %%
+import unittest
+
+import KubaCodec
+import KubaRender
+from KubaEvents import GameFinished, MarbleCaptured, MarblesShifted, TurnChanged
+from KubaGame import KubaGame, MoveStatus
+from KubaSearch import KubaSearch
+
+PLAYERS = (("A", "W"), ("B", "B"))
+
+
+def apply_events(cells: list, events: list):
+    """applies the events of one move to a list of 49 marble letters, the way a spectator's copy of the board
+    follows a game"""
+    for event in events:
+        if isinstance(event, MarbleCaptured):
+            row, col = event.get_coordinates()
+            cells[row * 7 + col] = "X"
+        elif isinstance(event, MarblesShifted):
+            for (old_row, old_col), (new_row, new_col) in event.get_shifts():
+                cells[new_row * 7 + new_col] = cells[old_row * 7 + old_col]
+                cells[old_row * 7 + old_col] = "X"
+    return
+
+
+class TestKubaEvents(unittest.TestCase):
+    """tests the events published by KubaGame.make_move() and KubaGame.try_move()"""
+
+    def setUp(self):
+        """creates a game with a subscriber that keeps every list of events it is passed"""
+        self.game = KubaGame(*PLAYERS)
+        self.batches = []
+        self.game.subscribe(self.batches.append)
+
+    def test_make_move_publishes_one_batch(self):
+        """a move publishes one list of events ending with the turn passing to the opponent"""
+        self.assertTrue(self.game.make_move("A", (6, 6), "F"))
+        self.assertEqual(len(self.batches), 1)
+        events = self.batches[0]
+        self.assertIsInstance(events[0], MarblesShifted)
+        self.assertEqual(events[0].get_shifts(), [((5, 6), (4, 6)), ((6, 6), (5, 6))])
+        self.assertIsInstance(events[-1], TurnChanged)
+        self.assertEqual(events[-1].get_player_name(), "B")
+
+    def test_rejected_move_publishes_nothing(self):
+        """a move that is not made publishes no events"""
+        self.assertFalse(self.game.make_move("A", (0, 5), "B"))
+        self.assertEqual(self.game.try_move("A", (3, 3), "L"), MoveStatus.BLOCKED_BEHIND)
+        self.assertEqual(self.batches, [])
+
+    def test_push_move_and_pop_move_publish_nothing(self):
+        """moves that are made and taken back with push_move() and pop_move() are not published"""
+        self.assertTrue(self.game.push_move("A", (6, 6), "F"))
+        self.assertTrue(self.game.push_move("B", (6, 0), "F"))
+        self.game.pop_move()
+        self.game.pop_move()
+        self.assertEqual(self.batches, [])
+
+    def test_search_leaves_the_event_stream_unchanged(self):
+        """a search between moves publishes nothing, and a copy of the board built from the events stays equal
+        to the board of the game"""
+        cells = list(KubaRender.get_cells(self.game))
+        search = KubaSearch(max_depth=2)
+        player_name = "A"
+        for move_number in range(6):
+            move = search.search(self.game, player_name)
+            self.assertEqual(len(self.batches), move_number)
+            self.assertEqual(self.game.try_move(player_name, move[0], move[1]), MoveStatus.LEGAL)
+            self.assertEqual(len(self.batches), move_number + 1)
+            apply_events(cells, self.batches[-1])
+            self.assertEqual("".join(cells), KubaRender.get_cells(self.game))
+            player_name = self.game.get_current_turn()
+
+    def test_winning_move_publishes_game_finished(self):
+        """a move that wins the game publishes the capture and ends its events with GameFinished"""
+        cells = [KubaCodec.EMPTY] * 49
+        cells[3 * 7 + 0] = KubaCodec.RED
+        cells[3 * 7 + 1] = KubaCodec.PLAYER_1
+        cells[6 * 7 + 6] = KubaCodec.PLAYER_1
+        cells[0 * 7 + 6] = KubaCodec.PLAYER_2
+        self.game.from_bytes(KubaCodec.pack_position(cells, 0, None, 6, None))
+        self.assertTrue(self.game.make_move("A", (3, 1), "L"))
+        events = self.batches[-1]
+        self.assertIsInstance(events[0], MarbleCaptured)
+        self.assertEqual((events[0].get_color(), events[0].get_coordinates()), ("R", (3, 0)))
+        self.assertIsInstance(events[-1], GameFinished)
+        self.assertEqual(events[-1].get_winner(), "A")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,389 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the KubaGame engine checked against brute force: every move
+#               on the board tried one at a time.
+
+# %%
+import random
+import unittest
+
+import KubaCodec
+from KubaBitboard import KubaBitboard
+from KubaGame import DIRECTIONS, KubaGame, MoveStatus
+
+PLAYERS = (("A", "W"), ("B", "B"))
+ALL_MOVES = tuple(((row, col), direction) for row in range(7) for col in range(7) for direction in DIRECTIONS)
+
+
+def brute_force_moves(game, player_name: str) -> tuple:
+    """returns the moves make_move() accepts for the player, found by trying every cell and direction with
+    push_move() and taking each move back, and the number of moves rejected only as a reverse move or for
+    pushing off the player's own marble"""
+    moves = []
+    special = 0
+    for coordinates, direction in ALL_MOVES:
+        status = game.check_move(player_name, coordinates, direction)
+        if status == MoveStatus.REVERSE_MOVE:
+            special += 1
+        if game.push_move(player_name, coordinates, direction):
+            game.pop_move()
+            moves.append((coordinates, direction))
+        elif status == MoveStatus.LEGAL:
+            special += 1            # passed the checks, but would push off the player's own marble
+    return moves, special
+
+
+def make_position(marbles: dict, reverse_move: tuple = None) -> bytes:
+    """returns a position packed by to_bytes() with only the marbles in marbles, a dictionary of (row, col) to
+    KubaCodec cell value, on the board, player A to move, each player having captured six red marbles, and the
+    (coordinates, direction) reverse move passed banned"""
+    cells = [KubaCodec.EMPTY] * 49
+    for (row, col), value in marbles.items():
+        cells[row * 7 + col] = value
+    if reverse_move != None:
+        reverse_move = KubaCodec.encode_move(*reverse_move)
+    return KubaCodec.pack_position(cells, 0, None, 6, reverse_move)
+
+
+# player A's only marble, at (1, 1), is boxed in by player B's marbles, but A can push the red marble in the
+# corner
+ONLY_RED_PUSHES = make_position({(1, 1): KubaCodec.PLAYER_1, (0, 1): KubaCodec.PLAYER_2,
+                                 (1, 0): KubaCodec.PLAYER_2, (1, 2): KubaCodec.PLAYER_2,
+                                 (2, 1): KubaCodec.PLAYER_2, (6, 6): KubaCodec.RED})
+
+# player A's only marble, at (1, 1), can only be pushed forward, which is banned as the reverse move. the red
+# marble at (5, 5) is boxed in by player B's marbles
+ONLY_REVERSE_MOVE = make_position({(1, 1): KubaCodec.PLAYER_1, (0, 1): KubaCodec.PLAYER_2,
+                                   (1, 0): KubaCodec.PLAYER_2, (1, 2): KubaCodec.PLAYER_2,
+                                   (5, 5): KubaCodec.RED, (4, 5): KubaCodec.PLAYER_2,
+                                   (5, 4): KubaCodec.PLAYER_2, (5, 6): KubaCodec.PLAYER_2,
+                                   (6, 5): KubaCodec.PLAYER_2}, ((1, 1), "F"))
+
+# player A to move, with moves to show each reason a move is rejected. (1, 0) F is banned as the reverse move,
+# (1, 1) R is blocked by the marble at (1, 0), and (3, 5) R would push off A's own marble at (3, 6)
+REJECTIONS = make_position({(1, 0): KubaCodec.PLAYER_1, (1, 1): KubaCodec.PLAYER_1, (3, 5): KubaCodec.PLAYER_1,
+                            (3, 6): KubaCodec.PLAYER_1, (0, 6): KubaCodec.PLAYER_2, (5, 5): KubaCodec.PLAYER_2,
+                            (3, 3): KubaCodec.RED}, ((1, 0), "F"))
+
+# each move of REJECTIONS with the status check_move() gives it and the status try_move() gives it
+REJECTED_MOVES = ((("C", (1, 1), "L"), MoveStatus.UNKNOWN_PLAYER, MoveStatus.UNKNOWN_PLAYER),
+                  (("C", (7, 7), "X"), MoveStatus.UNKNOWN_PLAYER, MoveStatus.UNKNOWN_PLAYER),
+                  (("B", (0, 6), "L"), MoveStatus.WRONG_TURN, MoveStatus.WRONG_TURN),
+                  (("B", (7, 1), "X"), MoveStatus.WRONG_TURN, MoveStatus.WRONG_TURN),
+                  (("A", (7, 1), "L"), MoveStatus.OUT_OF_RANGE, MoveStatus.OUT_OF_RANGE),
+                  (("A", (1, -1), "X"), MoveStatus.OUT_OF_RANGE, MoveStatus.OUT_OF_RANGE),
+                  (("A", (2, 2), "L"), MoveStatus.EMPTY_CELL, MoveStatus.EMPTY_CELL),
+                  (("A", (0, 6), "L"), MoveStatus.OPPONENT_MARBLE, MoveStatus.OPPONENT_MARBLE),
+                  (("A", (1, 1), "X"), MoveStatus.BAD_DIRECTION, MoveStatus.BAD_DIRECTION),
+                  (("A", (1, 0), "F"), MoveStatus.REVERSE_MOVE, MoveStatus.REVERSE_MOVE),
+                  (("A", (1, 1), "R"), MoveStatus.BLOCKED_BEHIND, MoveStatus.BLOCKED_BEHIND),
+                  (("A", (3, 5), "R"), MoveStatus.LEGAL, MoveStatus.SELF_CAPTURE))
+
+
+def random_positions(engine, seed: int, games: int, max_moves: int = 60):
+    """plays games of random moves picked from the brute force moves and yields each game after every move,
+    until the game is over or max_moves moves have been made"""
+    generator = random.Random(seed)
+    for number in range(games):
+        game = engine(*PLAYERS)
+        player_name = generator.choice("AB")
+        yield game
+        for move in range(max_moves):
+            moves, special = brute_force_moves(game, player_name)
+            if game.get_winner() != None or len(moves) == 0:
+                break
+            game.make_move(player_name, *generator.choice(moves))
+            player_name = game.get_current_turn()
+            yield game
+
+
+def random_games(engine, seed: int, games: int, max_moves: int = 200):
+    """plays games of random legal moves and yields each game after every move, until the game is over or
+    max_moves moves have been made"""
+    generator = random.Random(seed)
+    for number in range(games):
+        game = engine(*PLAYERS)
+        player_name = generator.choice("AB")
+        for move in range(max_moves):
+            moves = game.legal_moves(player_name)
+            if len(moves) == 0:
+                break
+            game.make_move(player_name, *generator.choice(moves))
+            yield game
+            player_name = game.get_current_turn()
+            if player_name == None:
+                break
+
+
+class TestLegalMoves(unittest.TestCase):
+    """tests legal_moves() against trying every move"""
+
+    def test_matches_brute_force(self):
+        """legal_moves() returns exactly the moves make_move() accepts, in cell order and then direction order,
+        for both engines, including positions where moves are banned as a reverse move or a self-capture"""
+        for engine in (KubaGame, KubaBitboard):
+            special_total = 0
+            for game in random_positions(engine, 2, 5):
+                for player_name in ("A", "B"):
+                    moves, special = brute_force_moves(game, player_name)
+                    legal = game.legal_moves(player_name)
+                    if engine == KubaGame:
+                        self.assertEqual(legal, moves)
+                    else:
+                        self.assertEqual(sorted(legal), sorted(moves))
+                    special_total += special
+            self.assertGreater(special_total, 0)
+
+
+
+class TestGameOver(unittest.TestCase):
+    """tests that a player loses for having no legal moves exactly when legal_pushes() finds none"""
+
+    def test_red_marble_pushes_count(self):
+        """a player whose own marbles are boxed in but who can push a red marble still has legal moves"""
+        for engine in (KubaGame, KubaBitboard):
+            game = engine(*PLAYERS)
+            game.from_bytes(ONLY_RED_PUSHES)
+            self.assertFalse(game.game_over_check())
+            self.assertEqual(game.get_winner(), None)
+            self.assertEqual(game.legal_moves("A"), [((6, 6), direction) for direction in DIRECTIONS])
+            self.assertTrue(game.make_move("A", (6, 6), "L"))
+
+    def test_reverse_move_ban_counts(self):
+        """a player whose only push is the banned reverse move has no legal moves and loses"""
+        for engine in (KubaGame, KubaBitboard):
+            game = engine(*PLAYERS)
+            game.from_bytes(ONLY_REVERSE_MOVE)
+            self.assertEqual(brute_force_moves(game, "A")[0], [])
+            self.assertTrue(game.game_over_check())
+            self.assertEqual(str(game.get_winner()), "B")
+
+    def test_matches_legal_pushes(self):
+        """in random games, both players of an unfinished game have legal pushes and the player to move has a
+        move make_move() accepts, and a game won other than by captures leaves the loser without legal pushes"""
+        for engine in (KubaGame, KubaBitboard):
+            for game in random_positions(engine, 3, 3, 150):
+                winner = game.get_winner()
+                if winner == None:
+                    self.assertNotEqual(brute_force_moves(game, game.get_current_turn() or "A")[0], [])
+                    self.assertNotEqual(game.legal_pushes(0), [])
+                    self.assertNotEqual(game.legal_pushes(1), [])
+                    continue
+                player = ("A", "B").index(str(winner))
+                if game.get_captured(str(winner)) < 7 and game.get_marble_count()[1 - player] > 0:
+                    self.assertEqual(game.legal_pushes(1 - player), [])
+
+
+class TestPositionHash(unittest.TestCase):
+    """tests that the hash kept up to date by make_move() is the hash of the position"""
+
+    def test_matches_compute_hash(self):
+        """after every move of random games, position_hash() equals the hash computed from scratch, and both
+        engines give the same hash for the same position"""
+        captures = 0
+        for engine in (KubaGame, KubaBitboard):
+            for game in random_games(engine, 4, 10):
+                self.assertEqual(game.position_hash(), game.compute_hash())
+                other = (KubaBitboard if engine == KubaGame else KubaGame)(*PLAYERS)
+                other.from_bytes(game.to_bytes())
+                self.assertEqual(other.position_hash(), game.position_hash())
+                captures += game.get_captured("A") + game.get_captured("B")
+        self.assertGreater(captures, 0)
+
+    def test_transposition(self):
+        """the same marbles reached by moves in a different order have the same hash, and the same marbles with
+        the other player to move or a different number of captured red marbles have a different hash"""
+        moves = (("A", (6, 6), "F"), ("B", (6, 0), "F"), ("A", (0, 0), "B"), ("B", (0, 6), "B"))
+        cells = KubaCodec.unpack_position(make_position({(3, 3): KubaCodec.PLAYER_1, (3, 4): KubaCodec.PLAYER_2,
+                                                         (0, 0): KubaCodec.RED}))[0]
+        for engine in (KubaGame, KubaBitboard):
+            game = engine(*PLAYERS)
+            transposed = engine(*PLAYERS)
+            for player_name, coordinates, direction in moves:
+                self.assertTrue(game.make_move(player_name, coordinates, direction))
+            for player_name, coordinates, direction in moves[2:] + moves[:2]:
+                self.assertTrue(transposed.make_move(player_name, coordinates, direction))
+            self.assertNotEqual(transposed.get_reverse_move(), game.get_reverse_move())
+            self.assertEqual(transposed.position_hash(), game.position_hash())
+
+            hashes = set()
+            for turn, captured_red in ((0, 6), (1, 6), (0, 5)):
+                game.from_bytes(KubaCodec.pack_position(cells, turn, None, captured_red, None))
+                hashes.add(game.position_hash())
+            self.assertEqual(len(hashes), 3)
+
+def snapshot(game) -> tuple:
+    """returns the state pop_move() must restore: the packed position, the hash, the turn, the winner, the
+    status, the reverse move, the marble and capture counts, and for KubaGame where every Marble object is"""
+    state = (game.to_bytes(), game.position_hash(), game.get_current_turn(), str(game.get_winner()),
+             game.get_status(), game.get_reverse_move(), game.get_marble_count(), game.get_captured("A"),
+             game.get_captured("B"))
+    if isinstance(game, KubaGame):
+        marbles = tuple((marble.get_position(), marble.is_captured()) for marble in game.get_marbles())
+        captured = tuple((tuple(player.get_captured_neutral()), tuple(player.get_captured_opponent()))
+                         for player in game.get_players())
+        state += (marbles, captured)
+    return state
+
+
+class TestPushPop(unittest.TestCase):
+    """tests that pop_move() takes back push_move() exactly"""
+
+    def test_round_trip(self):
+        """pushing up to four random legal moves and popping them all restores the game, including moves that
+        capture marbles and moves that end the game"""
+        generator = random.Random(5)
+        captures = 0
+        wins = 0
+        for engine in (KubaGame, KubaBitboard):
+            for game in random_games(engine, 6, 10):
+                before = snapshot(game)
+                pushed = 0
+                for depth in range(generator.randint(1, 4)):
+                    player_name = game.get_current_turn()
+                    moves = [] if player_name == None else game.legal_moves(player_name)
+                    if len(moves) == 0:
+                        break
+                    captured = game.get_marble_count()
+                    self.assertTrue(game.push_move(player_name, *generator.choice(moves)))
+                    captures += captured != game.get_marble_count()
+                    wins += game.get_winner() != None
+                    pushed += 1
+                for depth in range(pushed):
+                    self.assertTrue(game.pop_move())
+                self.assertEqual(snapshot(game), before)
+                self.assertFalse(game.pop_move())
+        self.assertGreater(captures, 0)
+        self.assertGreater(wins, 0)
+
+    def test_made_moves_are_not_taken_back(self):
+        """pop_move() only takes back moves made with push_move(), and a rejected push saves no undo record"""
+        for engine in (KubaGame, KubaBitboard):
+            game = engine(*PLAYERS)
+            self.assertFalse(game.pop_move())
+            self.assertTrue(game.make_move("A", (6, 6), "F"))
+            self.assertFalse(game.push_move("A", (6, 5), "F"))
+            self.assertFalse(game.pop_move())
+            self.assertEqual(game.get_current_turn(), "B")
+
+
+def rescan_counts(game) -> tuple:
+    """returns the marble count of each color and the red marbles captured by each player, counted by reading
+    every cell of the board and, for KubaGame, every Marble object"""
+    board = [game.get_marble((row, col)) for row in range(7) for col in range(7)]
+    counts = (board.count("W"), board.count("B"), board.count("R"))
+    if isinstance(game, KubaGame):
+        on_board = [marble.get_color() for marble in game.get_marbles() if marble.is_captured() == False]
+        assert (on_board.count("W"), on_board.count("B"), on_board.count("R")) == counts
+        captured = tuple(len(player.get_captured_neutral()) for player in game.get_players())
+    else:
+        # the bitboard keeps no record of who captured each red marble, only how many are off the board
+        captured = (game.get_captured("A"), 13 - counts[2] - game.get_captured("A"))
+    return counts, captured, (board.count(PLAYERS[0][1]), board.count(PLAYERS[1][1]))
+
+
+class TestCounters(unittest.TestCase):
+    """tests that the counters kept up to date by make_move() match the board"""
+
+    def test_match_rescan(self):
+        """after every move of random games, after taking moves back, and after setting up a position with
+        from_bytes(), the marble and capture counters equal a count of the board"""
+        for engine in (KubaGame, KubaBitboard):
+            for game in random_games(engine, 7, 6):
+                games = [game]
+                copy = engine(*PLAYERS)
+                copy.from_bytes(game.to_bytes())
+                games.append(copy)
+                player_name = game.get_current_turn()
+                if player_name != None and len(game.legal_moves(player_name)) > 0:
+                    self.assertTrue(copy.push_move(player_name, *game.legal_moves(player_name)[-1]))
+                    self.assertTrue(copy.pop_move())
+                for checked in games:
+                    counts = (checked.get_marble_count(), (checked.get_captured("A"), checked.get_captured("B")),
+                              (checked.get_player_marble_count(0), checked.get_player_marble_count(1)))
+                    self.assertEqual(counts, rescan_counts(checked))
+
+
+class TestResolvedMoves(unittest.TestCase):
+    """tests that the pre-resolved move calls do exactly what the string calls do"""
+
+    def test_resolve_move(self):
+        """resolve_move() turns every legal move, in either case of direction, into one of legal_pushes(), and
+        turns an illegal move into None with the reason check_move() gives"""
+        for engine in (KubaGame, KubaBitboard):
+            for game in random_games(engine, 9, 2, 60):
+                player_name = game.get_current_turn()
+                if player_name == None:
+                    continue
+                player = ("A", "B").index(player_name)
+                pushes = game.legal_pushes(player)
+                for coordinates, direction in game.legal_moves(player_name):
+                    self.assertIn(game.resolve_move(player_name, coordinates, direction), pushes)
+                    self.assertIn(game.resolve_move(player_name, coordinates, direction.lower()), pushes)
+                for player_name, coordinates, direction in (("C", (6, 5), "F"), (player_name, (3, 9), "L"),
+                                                            (player_name, (6, 6), "Q")):
+                    self.assertEqual(game.resolve_move(player_name, coordinates, direction), None)
+                    self.assertEqual(game.get_rejection(), game.check_move(player_name, coordinates, direction))
+                    self.assertNotEqual(game.get_rejection(), MoveStatus.LEGAL)
+
+    def test_push_matches_make_move(self):
+        """push() and push_resolved() of each of legal_pushes() leave the same position as make_move() of the
+        same move"""
+        for engine in (KubaGame, KubaBitboard):
+            for game in random_games(engine, 10, 1, 30):
+                player_name = game.get_current_turn()
+                if player_name == None:
+                    continue
+                data = game.to_bytes()
+                for player, cell, index in game.legal_pushes(("A", "B").index(player_name)):
+                    made = engine(*PLAYERS)
+                    made.from_bytes(data)
+                    self.assertTrue(made.make_move(player_name, (cell // 7, cell % 7), DIRECTIONS[index]))
+                    pushed = engine(*PLAYERS)
+                    pushed.from_bytes(data)
+                    self.assertTrue(pushed.push(player, cell, index))
+                    self.assertEqual(pushed.to_bytes(), made.to_bytes())
+                    self.assertEqual(pushed.position_hash(), made.position_hash())
+                    pushed.from_bytes(data)
+                    self.assertTrue(pushed.push_resolved(player, cell, index))
+                    self.assertEqual(pushed.to_bytes(), made.to_bytes())
+                    self.assertTrue(pushed.pop_move())
+                    self.assertEqual(pushed.to_bytes(), data)
+
+
+class TestMoveStatus(unittest.TestCase):
+    """tests the reasons check_move() and try_move() give for rejecting a move"""
+
+    def test_reasons(self):
+        """every rejected move is given the reason of the first check it fails, the game is left unchanged, and
+        get_rejection() and make_move() agree"""
+        for engine in (KubaGame, KubaBitboard):
+            game = engine(*PLAYERS)
+            game.from_bytes(REJECTIONS)
+            for move, checked, tried in REJECTED_MOVES:
+                self.assertIs(game.check_move(*move), checked, move)
+                self.assertIs(game.try_move(*move), tried, move)
+                self.assertEqual(game.to_bytes(), REJECTIONS)
+                self.assertFalse(game.make_move(*move))
+                if checked != MoveStatus.LEGAL:
+                    self.assertEqual(game.resolve_move(*move), None)
+                    self.assertIs(game.get_rejection(), checked)
+
+    def test_legal_and_finished(self):
+        """a legal move is made by try_move(), and every move in a finished game is rejected as FINISHED"""
+        for engine in (KubaGame, KubaBitboard):
+            game = engine(*PLAYERS)
+            game.from_bytes(REJECTIONS)
+            self.assertIs(game.check_move("A", (3, 3), "L"), MoveStatus.LEGAL)
+            self.assertIs(game.try_move("A", (3, 3), "L"), MoveStatus.LEGAL)
+            self.assertEqual(game.get_marble((3, 2)), "R")
+            self.assertEqual(game.get_current_turn(), "B")
+            cells = KubaCodec.unpack_position(REJECTIONS)[0]
+            game.from_bytes(KubaCodec.pack_position(cells, None, 1, 6, None))
+            for move in (("A", (1, 1), "L"), ("B", (0, 6), "L"), ("C", (7, 7), "X")):
+                self.assertIs(game.check_move(*move), MoveStatus.FINISHED)
+                self.assertIs(game.try_move(*move), MoveStatus.FINISHED)
+
+
+if __name__ == "__main__":
+    unittest.main()
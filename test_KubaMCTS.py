@@ -0,0 +1,58 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the KubaMCTS Monte-Carlo tree search player.
+
+# %%
+import unittest
+
+from KubaBitboard import KubaBitboard
+from KubaGame import KubaGame
+from KubaMCTS import KubaMCTS
+
+PLAYERS = (("A", "W"), ("B", "B"))
+
+# the moves of the opening played before the searches, so the positions searched are not the start position
+OPENING = (("A", (6, 6), "F"), ("B", (6, 0), "F"), ("A", (0, 0), "B"), ("B", (0, 6), "B"))
+
+
+def make_game(engine):
+    """returns a new game of the engine class passed, after the opening moves"""
+    game = engine(*PLAYERS)
+    for player_name, coordinates, direction in OPENING:
+        game.make_move(player_name, coordinates, direction)
+    return game
+
+
+class TestKubaMCTS(unittest.TestCase):
+    """tests the moves KubaMCTS returns, the engines it searches, and the shutdown of its worker processes"""
+
+    def test_no_iterations(self):
+        """a search that runs no iterations returns a legal move, with no root counts"""
+        game = make_game(KubaBitboard)
+        player = KubaMCTS(iterations=0, time_limit=None)
+        self.assertIn(player.search(game, "A"), game.legal_moves("A"))
+        self.assertEqual(player.get_root_counts(), {})
+
+    def test_searches_kuba_game(self):
+        """a KubaGame is searched like a KubaBitboard at the same position, and left as it was"""
+        game = make_game(KubaGame)
+        before = (game.to_bytes(), game.position_hash(), game.get_current_turn())
+        move = KubaMCTS(iterations=100, time_limit=None).search(game, "A")
+        self.assertEqual(move, KubaMCTS(iterations=100, time_limit=None).search(make_game(KubaBitboard), "A"))
+        self.assertIn(move, game.legal_moves("A"))
+        self.assertEqual((game.to_bytes(), game.position_hash(), game.get_current_turn()), before)
+
+    def test_with_statement(self):
+        """a player used in a with statement merges the root counts of every worker, and can search again after
+        it is closed"""
+        game = make_game(KubaBitboard)
+        with KubaMCTS(iterations=20, time_limit=None, workers=2) as player:
+            self.assertIn(player.search(game, "A"), game.legal_moves("A"))
+            self.assertEqual(sum(player.get_root_counts().values()), 40)
+        self.assertIn(player.search(game, "A"), game.legal_moves("A"))
+        player.close()
+        player.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
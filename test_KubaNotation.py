@@ -0,0 +1,67 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the Kuba game notation and its streaming reader.
+
+# %%
+import io
+import unittest
+
+import KubaNotation
+
+PLAYERS = (("PlayerA", "W"), ("PlayerB", "B"))
+
+# a short game, an empty game, another short game, and another empty game, in the order they are written
+GAMES = (
+    ("PlayerA", [((6, 5), "F"), ((0, 6), "B"), ((5, 5), "F"), ((1, 6), "B")], None),
+    ("PlayerB", [], None),
+    ("PlayerB", [((0, 6), "B"), ((6, 6), "F")], None),
+    ("PlayerA", [], None),
+)
+
+
+def write_games(games) -> str:
+    """returns the notation of the (first player, moves, winner) games passed, one after another"""
+    return "".join(KubaNotation.format_game(PLAYERS[0], PLAYERS[1], first, moves, winner)
+                   for first, moves, winner in games)
+
+
+class TestKubaNotation(unittest.TestCase):
+    """tests that games written by format_game() are read back one for one by read_games()"""
+
+    def check_games(self, text: str):
+        """checks that the games read from text are the games in GAMES, in order"""
+        records = list(KubaNotation.read_games(io.StringIO(text)))
+        self.assertEqual(len(records), len(GAMES))
+        for number, (record, (first, moves, winner)) in enumerate(zip(records, GAMES), 1):
+            self.assertEqual(record["game"], number)
+            self.assertIsNone(record["error"])
+            self.assertEqual(record["tags"]["First"], first)
+            self.assertEqual(record["tags"]["Result"], KubaNotation.UNFINISHED)
+            self.assertEqual(record["moves"], moves)
+
+    def test_round_trip_with_empty_games(self):
+        """games without moves are read as games of their own, and the games after them keep their numbers"""
+        self.check_games(write_games(GAMES))
+
+    def test_repeated_tag_starts_a_game(self):
+        """without blank lines between games, a Player1 tag in a game that already has one starts the next
+        game"""
+        self.check_games(write_games(GAMES).replace("\n\n", "\n"))
+
+    def test_comment_line_does_not_end_a_game(self):
+        """a line holding only a comment is skipped without ending the game"""
+        text = write_games(GAMES[:1]).replace('[First "PlayerA"]\n', '[First "PlayerA"]\n; opening\n')
+        records = list(KubaNotation.read_games(io.StringIO(text)))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["moves"], GAMES[0][1])
+
+    def test_replay_keeps_game_numbers(self):
+        """every game replays without error and keeps the number it was read with"""
+        results = list(KubaNotation.replay_games(io.StringIO(write_games(GAMES))))
+        self.assertEqual([result["game"] for result in results], [1, 2, 3, 4])
+        self.assertEqual([result["error"] for result in results], [None] * 4)
+        self.assertEqual([result["moves"] for result in results], [4, 0, 2, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
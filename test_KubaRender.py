@@ -0,0 +1,62 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the cached board rendering and the cell feeds for spectators.
+
+# %%
+import unittest
+
+import KubaRender
+from KubaBitboard import KubaBitboard
+from KubaGame import KubaGame
+
+
+class TestKubaRenderer(unittest.TestCase):
+    """tests that a KubaRenderer shared by several games renders each game's own board"""
+
+    def test_swapped_colors(self):
+        """two games in the same position whose players chose swapped colors are rendered with their own
+        colors"""
+        for engine in (KubaGame, KubaBitboard):
+            renderer = KubaRender.KubaRenderer()
+            white_first = engine(("A", "W"), ("B", "B"))
+            black_first = engine(("A", "B"), ("B", "W"))
+            self.assertEqual(white_first.position_hash(), black_first.position_hash())
+            for game in (white_first, black_first, white_first):
+                self.assertEqual(renderer.get_cells(game), KubaRender.get_cells(game))
+                for style in KubaRender.STYLES:
+                    self.assertEqual(renderer.render(game, style),
+                                     KubaRender.RENDERERS[style](KubaRender.get_cells(game)))
+            self.assertTrue(renderer.render(black_first).startswith(" | B | B | X | X | X | W | W | "))
+
+    def test_position_seen_again_is_a_hit(self):
+        """a position rendered again after a move is taken back is looked up rather than rendered"""
+        renderer = KubaRender.KubaRenderer()
+        game = KubaGame(("A", "W"), ("B", "B"))
+        start = renderer.render(game)
+        self.assertTrue(game.push_move("A", (6, 5), "F"))
+        self.assertNotEqual(renderer.render(game), start)
+        game.pop_move()
+        hits = renderer.get_hits()
+        self.assertEqual(renderer.render(game), start)
+        self.assertEqual(renderer.get_hits(), hits + 1)
+
+
+class TestBoardFeed(unittest.TestCase):
+    """tests the changes a BoardFeed passes on to watchers"""
+
+    def test_feeds_sharing_a_renderer(self):
+        """feeds of two games with swapped colors that share a renderer each follow their own board"""
+        renderer = KubaRender.KubaRenderer()
+        games = (KubaGame(("A", "W"), ("B", "B")), KubaGame(("A", "B"), ("B", "W")))
+        feeds = [KubaRender.BoardFeed(game, renderer=renderer) for game in games]
+        for game, feed in zip(games, feeds):
+            self.assertEqual(feed.get_cells(), KubaRender.get_cells(game))
+            self.assertTrue(game.make_move("A", (6, 5), "F"))
+            changes = feed.update()
+            self.assertEqual(feed.get_cells(), KubaRender.get_cells(game))
+            self.assertEqual(changes, [(4, 5, game.get_marble((4, 5))), (6, 5, "X")])
+            self.assertEqual(feed.changes_since(0), changes)
+
+
+if __name__ == "__main__":
+    unittest.main()
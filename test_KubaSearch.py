@@ -0,0 +1,161 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the KubaSearch game tree search engine.
+
+# %%
+import time
+import unittest
+
+import KubaCodec
+from KubaBitboard import KubaBitboard
+from KubaGame import KubaGame
+from KubaSearch import KubaSearch, MARBLE_VALUE, WIN_SCORE
+
+PLAYERS = (("A", "W"), ("B", "B"))
+
+# the moves of the opening played before the searches, so the positions searched are not the start position
+OPENING = (("A", (6, 6), "F"), ("B", (6, 0), "F"), ("A", (0, 0), "B"), ("B", (0, 6), "B"))
+
+
+def make_position(marbles: dict, captured_red: int = 0) -> bytes:
+    """returns a position packed by to_bytes() with only the marbles in marbles, a dictionary of (row, col) to
+    KubaCodec cell value, on the board and player A to move. player A has captured captured_red of the red
+    marbles taken off the board and player B the rest"""
+    cells = [KubaCodec.EMPTY] * 49
+    for (row, col), value in marbles.items():
+        cells[row * 7 + col] = value
+    return KubaCodec.pack_position(cells, 0, None, captured_red, None)
+
+
+# player A wins by pushing the red marble at (3, 0) off the board with (3, 1) L, capturing a seventh red marble
+WINNING_CAPTURE = make_position({(3, 0): KubaCodec.RED, (3, 1): KubaCodec.PLAYER_1, (6, 6): KubaCodec.PLAYER_1,
+                                 (5, 6): KubaCodec.PLAYER_1, (0, 6): KubaCodec.PLAYER_2,
+                                 (0, 5): KubaCodec.PLAYER_2, (2, 3): KubaCodec.RED}, 6)
+
+# player A can push player B's marble at (3, 6) off the board with (3, 4) R, and no move of player B's
+# captures anything back
+OPPONENT_CAPTURE = make_position({(3, 4): KubaCodec.PLAYER_1, (3, 5): KubaCodec.PLAYER_1,
+                                  (3, 6): KubaCodec.PLAYER_2, (0, 0): KubaCodec.PLAYER_1,
+                                  (6, 0): KubaCodec.PLAYER_2, (6, 1): KubaCodec.PLAYER_2,
+                                  (2, 2): KubaCodec.RED}, 6)
+
+
+def make_game(engine, position: bytes = None):
+    """returns a new game of the engine class passed, set up at the packed position passed, or after the
+    opening moves if no position is passed"""
+    game = engine(*PLAYERS)
+    if position != None:
+        game.from_bytes(position)
+        return game
+    for player_name, coordinates, direction in OPENING:
+        game.make_move(player_name, coordinates, direction)
+    return game
+
+
+def snapshot(game) -> tuple:
+    """returns what a search must leave unchanged in a game: the packed position, the hash, the length of the
+    undo stack, the player to move, and the legal moves of each player"""
+    return (game.to_bytes(), game.position_hash(), len(game._undo_stack), game.get_current_turn(),
+            game.legal_moves("A"), game.legal_moves("B"))
+
+
+class TestKubaSearch(unittest.TestCase):
+    """tests the moves and scores KubaSearch finds, its budgets, and that it leaves the game it searches as it
+    found it"""
+
+    def test_finds_winning_capture(self):
+        """a capture that wins the game is found at depth 1 and scored as a win in one move"""
+        for engine in (KubaGame, KubaBitboard):
+            search = KubaSearch(max_depth=3)
+            move = search.search(make_game(engine, WINNING_CAPTURE), "A")
+            self.assertEqual(move, ((3, 1), "L"))
+            self.assertEqual(search.get_score(), WIN_SCORE - 1)
+            self.assertEqual(search.get_depth(), 1)
+
+    def test_finds_opponent_capture(self):
+        """a capture of an opponent marble that cannot be answered is found at shallow depth and scored as a
+        marble up"""
+        for engine in (KubaGame, KubaBitboard):
+            search = KubaSearch(max_depth=2)
+            game = make_game(engine, OPPONENT_CAPTURE)
+            start_score = search.evaluate(game, "A", "B")
+            move = search.search(game, "A")
+            self.assertEqual(move, ((3, 4), "R"))
+            self.assertEqual(search.get_score(), start_score + MARBLE_VALUE)
+
+    def test_node_limit(self):
+        """a search stops once it has visited node_limit positions and still returns a legal move"""
+        game = make_game(KubaGame)
+        search = KubaSearch(node_limit=200)
+        move = search.search(game, "A")
+        self.assertIn(move, game.legal_moves("A"))
+        self.assertLessEqual(search.get_nodes(), 201)
+        self.assertGreaterEqual(search.get_depth(), 1)
+
+    def test_time_limit(self):
+        """a search without a depth or node limit returns soon after its time limit"""
+        game = make_game(KubaGame)
+        search = KubaSearch(time_limit=0.05)
+        start = time.perf_counter()
+        move = search.search(game, "A")
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertIn(move, game.legal_moves("A"))
+
+    def test_table_hit_matches_fresh_search(self):
+        """searching a position again, when the transposition table holds the earlier search, gives the same
+        score as a search with an empty table, while visiting fewer positions"""
+        for engine in (KubaGame, KubaBitboard):
+            fresh = KubaSearch(max_depth=3)
+            fresh.search(make_game(engine), "A")
+            reused = KubaSearch(max_depth=3)
+            reused.search(make_game(engine), "A")
+            first_nodes = reused.get_nodes()
+            reused.search(make_game(engine), "A")
+            self.assertEqual(reused.get_score(), fresh.get_score())
+            self.assertLess(reused.get_nodes(), first_nodes)
+
+    def test_game_is_restored(self):
+        """the position, hash, undo stack, turn and legal moves of the game are the same after a search,
+        including one cut off by its budget in the middle of the tree"""
+        for engine in (KubaGame, KubaBitboard):
+            for search in (KubaSearch(max_depth=3), KubaSearch(node_limit=777)):
+                game = make_game(engine)
+                coordinates, direction = game.legal_moves("A")[0]
+                self.assertTrue(game.push_move("A", coordinates, direction))
+                before = snapshot(game)
+                search.search(game, "B")
+                self.assertEqual(snapshot(game), before)
+                self.assertTrue(game.pop_move())
+                self.assertEqual(snapshot(game), snapshot(make_game(engine)))
+
+
+class TestPlayerColors(unittest.TestCase):
+    """tests that the search scores positions by player, whatever colors the players have"""
+
+    def test_material_by_player(self):
+        """the material score and the moves found are the same for players colored other than W and B as for W
+        and B, and capturing a marble scores a marble up"""
+        for engine in (KubaGame, KubaBitboard):
+            for colors in (("Blue", "Green"), ("B", "W")):
+                game = engine(("A", colors[0]), ("B", colors[1]))
+                game.from_bytes(OPPONENT_CAPTURE)
+                search = KubaSearch(max_depth=2)
+                start_score = search.evaluate(game, "A", "B")
+                self.assertEqual(start_score, search.evaluate(make_game(engine, OPPONENT_CAPTURE), "A", "B"))
+                self.assertEqual(search.search(game, "A"), ((3, 4), "R"))
+                self.assertEqual(search.get_score(), start_score + MARBLE_VALUE)
+                game.make_move("A", (3, 4), "R")
+                self.assertEqual(search.evaluate(game, "A", "B"), start_score + MARBLE_VALUE)
+
+    def test_win_by_player(self):
+        """a winning capture is scored as a win for players colored other than W and B"""
+        for engine in (KubaGame, KubaBitboard):
+            game = engine(("A", "Blue"), ("B", "Green"))
+            game.from_bytes(WINNING_CAPTURE)
+            search = KubaSearch(max_depth=3)
+            self.assertEqual(search.search(game, "A"), ((3, 1), "L"))
+            self.assertEqual(search.get_score(), WIN_SCORE - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
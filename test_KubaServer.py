@@ -0,0 +1,144 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the requests KubaServer handles, good and malformed, and of
+#               KubaClient talking to a running server over a socket.
+
+# %%
+import asyncio
+import json
+import unittest
+
+from KubaGame import MoveStatus
+from KubaServer import KubaServer, connect
+
+PLAYERS = [["A", "W"], ["B", "B"]]
+
+
+class TestKubaServer(unittest.TestCase):
+    """tests that KubaServer.handle_request() answers every request, and answers malformed ones with an error"""
+
+    def setUp(self):
+        """creates a server with one game"""
+        self.server = KubaServer()
+        self.game_id = self.server.handle_request({"op": "create", "players": PLAYERS})["result"]
+
+    def check_error(self, request: dict):
+        """checks that a request is answered with an error and no result"""
+        response = self.server.handle_request(request)
+        self.assertIn("error", response)
+        self.assertNotIn("result", response)
+
+    def test_move(self):
+        """a well formed move is made"""
+        response = self.server.handle_request({"id": 7, "op": "make_move", "game": self.game_id, "player": "A",
+                                               "coordinates": [6, 5], "direction": "F"})
+        self.assertEqual(response, {"id": 7, "result": True})
+
+    def test_skips_ids_chosen_by_clients(self):
+        """a game created without an id is not given an id a client chose, and a taken id is an error"""
+        self.assertEqual(self.server.handle_request({"op": "create", "game": "2", "players": PLAYERS})["result"],
+                         "2")
+        self.assertEqual(self.server.handle_request({"op": "create", "players": PLAYERS})["result"], "3")
+        self.check_error({"op": "create", "game": "3", "players": PLAYERS})
+        self.assertEqual(self.server.get_metrics()["games"], 3)
+
+    def test_import_rejects_taken_id(self):
+        """importing a game under the id of a game the server hosts is an error and leaves that game hosted"""
+        record = self.server.export_game(self.game_id)
+        other_id = self.server.handle_request({"op": "create", "players": PLAYERS})["result"]
+        self.server.handle_request({"op": "make_move", "game": other_id, "player": "A", "coordinates": [6, 5],
+                                    "direction": "F"})
+        with self.assertRaises(ValueError):
+            self.server.import_game(other_id, record)
+        self.assertEqual(self.server.handle_request({"op": "get_current_turn", "game": other_id})["result"], "B")
+        self.server.import_game(self.game_id, record)
+        self.assertEqual(self.server.get_metrics()["games"], 2)
+
+    def test_malformed_coordinates(self):
+        """coordinates that are not a list of two integers are an error"""
+        for coordinates in ({"0": 6, "1": 5}, [6], [6, 5, 4], ["6", "5"], [6.0, 5], [True, 5], "65", None):
+            self.check_error({"op": "make_move", "game": self.game_id, "player": "A",
+                              "coordinates": coordinates, "direction": "F"})
+
+    def test_malformed_players(self):
+        """players that are not a W player and a B player named by strings are an error"""
+        for players in ([["A", "w"], ["B", "b"]], [["A", "W"], ["B", "W"]], [["A", "W"]], [[1, "W"], ["B", "B"]],
+                        [["A", ["W"]], ["B", "B"]], {"A": "W", "B": "B"}, "AB"):
+            self.check_error({"op": "create", "players": players})
+        self.assertEqual(self.server.get_metrics()["created"], 1)
+
+    def test_malformed_strings(self):
+        """player and direction fields that are not strings are an error"""
+        self.check_error({"op": "make_move", "game": self.game_id, "player": ["A"], "coordinates": [6, 5],
+                          "direction": "F"})
+        self.check_error({"op": "make_move", "game": self.game_id, "player": "A", "coordinates": [6, 5],
+                          "direction": 0})
+
+
+class TestKubaClient(unittest.IsolatedAsyncioTestCase):
+    """tests a KubaClient talking to a KubaServer over a socket, including clients that send requests faster
+    than they read the responses and request lines that are too long"""
+
+    async def asyncSetUp(self):
+        """starts a server on a port chosen by the system"""
+        self.server = KubaServer(max_line=65536)
+        self.port = await self.server.start()
+
+    async def asyncTearDown(self):
+        """waits for the server to see every connection close, then stops it"""
+        for _ in range(100):
+            if self.server.get_metrics()["connections"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        await self.server.close()
+
+    async def test_calls(self):
+        """the client creates a game, checks and makes moves, and reads the board"""
+        client = await connect("127.0.0.1", self.port)
+        game_id = await client.create(("A", "W"), ("B", "B"))
+        self.assertEqual(await client.check_move(game_id, "A", (6, 5), "F"), MoveStatus.LEGAL)
+        self.assertEqual(await client.get_current_turn(game_id), None)
+        self.assertEqual(await client.try_move(game_id, "A", (6, 5), "F"), MoveStatus.LEGAL)
+        self.assertEqual(await client.try_move(game_id, "A", (5, 5), "F"), MoveStatus.WRONG_TURN)
+        self.assertEqual(await client.check_move(game_id, "B", (5, 5), "F"), MoveStatus.OPPONENT_MARBLE)
+        self.assertTrue(await client.make_move(game_id, "B", (0, 5), "B"))
+        self.assertEqual(await client.get_marble(game_id, (4, 5)), "W")
+        self.assertEqual(await client.get_marble_count(game_id), (8, 8, 13))
+        with self.assertRaises(RuntimeError):
+            await client.get_winner("no such game")
+        await client.close()
+
+    async def test_backpressure(self):
+        """a client that sends requests without reading the responses stops being read by the server once the
+        responses fill the connection's buffers, and every request is answered once the client reads"""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        count = 400
+        line = json.dumps({"op": "x" * 50000}).encode() + b"\n"      # each is answered with a 50 kB error
+        for _ in range(count):
+            writer.write(line)
+        handled = -1
+        while handled != self.server.get_metrics()["requests"]:
+            handled = self.server.get_metrics()["requests"]
+            await asyncio.sleep(0.1)
+        self.assertLess(handled, count)
+        for _ in range(count):
+            self.assertIn("error", json.loads(await reader.readline()))
+        self.assertEqual(self.server.get_metrics()["requests"], count)
+        writer.close()
+        await writer.wait_closed()
+
+    async def test_oversized_line(self):
+        """a request line longer than max_line closes its connection without an answer, and the server keeps
+        serving other connections"""
+        client = await connect("127.0.0.1", self.port)
+        with self.assertRaises(ConnectionError):
+            await client.create(("A" * 70000, "W"), ("B", "B"))
+        await client.close()
+        client = await connect("127.0.0.1", self.port)
+        self.assertIsInstance(await client.create(("A", "W"), ("B", "B")), str)
+        await client.close()
+        self.assertEqual(self.server.get_metrics()["created"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of how KubaShardHost copes with malformed requests and workers that
+#               stop.
+
+# %%
+import os
+import signal
+import unittest
+
+from KubaShards import KubaShardHost
+
+
+class TestKubaShardHost(unittest.TestCase):
+    """tests that a bad request or a stopped worker is answered with errors instead of stopping the host"""
+
+    def setUp(self):
+        """starts a host with two workers and one game on each"""
+        self.host = KubaShardHost(2)
+        self.game_ids = {}
+        while len(self.game_ids) < 2:
+            game_id = self.host.create_game(("A", "W"), ("B", "B"))
+            self.game_ids.setdefault(self.host.get_owner(game_id), game_id)
+
+    def tearDown(self):
+        """stops the workers"""
+        self.host.close()
+
+    def move(self, game_id: str) -> dict:
+        """returns the request of a legal first move in a game"""
+        return {"id": game_id, "op": "make_move", "game": game_id, "player": "A", "coordinates": [6, 5],
+                "direction": "F"}
+
+    def test_malformed_request_keeps_worker(self):
+        """a malformed request in a batch is answered with an error and the rest of the batch is carried out"""
+        game_id = self.game_ids["shard-0"]
+        bad = {"id": "bad", "op": "make_move", "game": game_id, "player": "A", "coordinates": {"0": 6},
+               "direction": "F"}
+        responses = self.host.submit([bad, self.move(game_id)])
+        self.assertEqual(responses[0]["id"], "bad")
+        self.assertIn("error", responses[0])
+        self.assertEqual(responses[1], {"id": game_id, "result": True})
+        self.assertEqual(self.host.get_metrics()["shard-0"]["restarts"], 0)
+
+    def test_stopped_worker_is_restarted(self):
+        """requests to a worker that has stopped are answered with errors, the worker is restarted empty, and
+        the other worker keeps its games"""
+        os.kill(self.host.get_pids()["shard-0"], signal.SIGKILL)
+        lost, kept = self.game_ids["shard-0"], self.game_ids["shard-1"]
+        responses = self.host.submit([self.move(lost), self.move(kept)])
+        self.assertIn("error", responses[0])
+        self.assertEqual(responses[1], {"id": kept, "result": True})
+        metrics = self.host.get_metrics()
+        self.assertEqual(metrics["shard-0"]["restarts"], 1)
+        self.assertEqual(metrics["shard-0"]["games"], 0)
+        self.assertIn("error", self.host.handle_request(self.move(lost)))
+        self.assertIsInstance(self.host.create_game(("A", "W"), ("B", "B")), str)
+
+
+class TestGameIds(unittest.TestCase):
+    """tests that the ids the host gives new games never take over the games of ids chosen by clients"""
+
+    def setUp(self):
+        """starts a host with two workers"""
+        self.host = KubaShardHost(2)
+
+    def tearDown(self):
+        """stops the workers"""
+        self.host.close()
+
+    def test_skips_ids_chosen_by_clients(self):
+        """games created without an id skip the ids clients chose, and the clients' games are left as they
+        were"""
+        for game_id in ("1", "2", "4"):
+            request = {"op": "create", "game": game_id, "players": [["A", "W"], ["B", "B"]]}
+            self.assertEqual(self.host.handle_request(request)["result"], game_id)
+        self.assertTrue(self.host.handle_request({"op": "make_move", "game": "1", "player": "A",
+                                                  "coordinates": [6, 5], "direction": "F"})["result"])
+        created = self.host.submit([{"op": "create", "players": [["C", "W"], ["D", "B"]]} for _ in range(3)])
+        self.assertEqual(sorted(response["result"] for response in created), ["3", "5", "6"])
+        self.assertEqual(self.host.handle_request({"op": "get_current_turn", "game": "1"})["result"], "B")
+        self.assertEqual(self.host.handle_request({"op": "get_current_turn", "game": "2"})["result"], None)
+        self.assertEqual(sum(metrics["games"] for metrics in self.host.get_metrics().values()), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the KubaSymmetry transforms and canonical forms of positions.
+
+# %%
+import random
+import unittest
+
+import KubaSymmetry
+from KubaBitboard import KubaBitboard
+from KubaGame import KubaGame
+
+PLAYERS = (("A", "W"), ("B", "B"))
+NAMES = ("A", "B")
+
+
+def random_positions(seed: int, games: int, max_moves: int = 80) -> list:
+    """returns the positions, packed by to_bytes(), after every move of games of random legal moves"""
+    generator = random.Random(seed)
+    positions = []
+    for number in range(games):
+        game = KubaBitboard(*PLAYERS)
+        player_name = generator.choice(NAMES)
+        for move in range(max_moves):
+            moves = game.legal_moves(player_name)
+            if len(moves) == 0:
+                break
+            game.make_move(player_name, *generator.choice(moves))
+            positions.append(game.to_bytes())
+            player_name = game.get_current_turn()
+            if player_name == None:
+                break
+    return positions
+
+
+def make_game(engine, position: bytes):
+    """returns a new game of the engine class passed set up at the packed position passed"""
+    game = engine(*PLAYERS)
+    game.from_bytes(position)
+    return game
+
+
+class TestTransforms(unittest.TestCase):
+    """tests that every transform is undone by its inverse and turns legal moves into legal moves"""
+
+    def test_inverse(self):
+        """the inverse of each transform takes every move and position back to where it started"""
+        for transform in range(KubaSymmetry.TRANSFORMS):
+            undo = KubaSymmetry.inverse(transform)
+            for move in range(196):
+                self.assertEqual(KubaSymmetry.transform_move(KubaSymmetry.transform_move(move, transform), undo),
+                                 move)
+            for player in (0, 1):
+                self.assertEqual(KubaSymmetry.transform_player(KubaSymmetry.transform_player(player, transform),
+                                                               undo), player)
+            for position in random_positions(1, 2, 30):
+                transformed = KubaSymmetry.transform_position(position, transform)
+                self.assertEqual(KubaSymmetry.transform_position(transformed, undo), position)
+
+    def test_start_position(self):
+        """the start position is unchanged by a quarter turn with the players swapped, but not by a quarter
+        turn alone"""
+        start = KubaGame(*PLAYERS).to_bytes()
+        self.assertEqual(KubaSymmetry.transform_position(start, 1 | KubaSymmetry.SWAP), start)
+        self.assertNotEqual(KubaSymmetry.transform_position(start, 1), start)
+
+    def test_legal_moves(self):
+        """the legal moves of a transformed position are the transformed legal moves of the position, for the
+        player the transform turns the player to move into, on both engines"""
+        for engine in (KubaGame, KubaBitboard):
+            for position in random_positions(2, 2, 40):
+                game = make_game(engine, position)
+                if game.get_current_turn() == None:
+                    continue
+                player = NAMES.index(game.get_current_turn())
+                moves = game.legal_moves(NAMES[player])
+                for transform in range(KubaSymmetry.TRANSFORMS):
+                    transformed = make_game(engine, KubaSymmetry.transform_position(position, transform))
+                    expected = sorted(KubaSymmetry.move_to_canonical(coordinates, direction, transform)
+                                      for coordinates, direction in moves)
+                    player_name = NAMES[KubaSymmetry.transform_player(player, transform)]
+                    self.assertEqual(sorted(transformed.legal_moves(player_name)), expected)
+
+
+class TestCanonicalForm(unittest.TestCase):
+    """tests that equivalent positions share a canonical form, its hash, and its moves"""
+
+    def test_invariance(self):
+        """every transform of a position has the same canonical form and the same hash of the canonical form,
+        and the transform returned turns the position into its canonical form"""
+        for position in random_positions(3, 2, 60):
+            canonical, transform = KubaSymmetry.canonicalize(position)
+            self.assertEqual(KubaSymmetry.transform_position(position, transform), canonical)
+            canonical_hash = make_game(KubaGame, canonical).position_hash()
+            for other in range(KubaSymmetry.TRANSFORMS):
+                variant = KubaSymmetry.transform_position(position, other)
+                variant_canonical, variant_transform = KubaSymmetry.canonicalize(variant)
+                self.assertEqual(variant_canonical, canonical)
+                self.assertEqual(KubaSymmetry.transform_position(variant, variant_transform), canonical)
+                self.assertEqual(make_game(KubaBitboard, variant_canonical).position_hash(), canonical_hash)
+
+    def test_moves_from_canonical(self):
+        """each move of the canonical position, mapped back with move_from_canonical(), is a legal move of the
+        real position that leads to a position equivalent to the one the canonical move leads to"""
+        for position in random_positions(4, 2, 40):
+            game = make_game(KubaBitboard, position)
+            player_name = game.get_current_turn()
+            if player_name == None:
+                continue
+            canonical, transform = KubaSymmetry.canonical_game(game)
+            canonical_game = make_game(KubaBitboard, canonical)
+            canonical_player = NAMES[KubaSymmetry.transform_player(NAMES.index(player_name), transform)]
+            for coordinates, direction in canonical_game.legal_moves(canonical_player):
+                real_move = KubaSymmetry.move_from_canonical(coordinates, direction, transform)
+                self.assertEqual(KubaSymmetry.move_to_canonical(*real_move, transform), (coordinates, direction))
+                self.assertTrue(game.push_move(player_name, *real_move))
+                self.assertTrue(canonical_game.push_move(canonical_player, coordinates, direction))
+                self.assertEqual(KubaSymmetry.canonicalize(game.to_bytes())[0],
+                                 KubaSymmetry.canonicalize(canonical_game.to_bytes())[0])
+                game.pop_move()
+                canonical_game.pop_move()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# Author:       Tyler Wennstrom
+# Date:         October 18, 2026
+# Description:  This file contains the tests of the tournament runner for Kuba bots.
+
+# %%
+import unittest
+from unittest import mock
+
+import KubaTournament
+
+
+def make_recording_bot(bot_name: str, nodes: int):
+    """returns a random bot that adds its name to MOVES each time it moves"""
+    random_bot = MAKE_BOT("random", nodes)
+
+    def recording_bot(game, player_name: str, generator):
+        """plays a random legal move and records who made it"""
+        MOVES.append((bot_name, player_name))
+        return random_bot(game, player_name, generator)
+    return recording_bot
+
+
+# the (bot name, player name) of every move of the game being played, and make_bot() before it is replaced
+MOVES = []
+MAKE_BOT = KubaTournament.make_bot
+
+
+class TestKubaTournament(unittest.TestCase):
+    """tests who moves first in each game and how results are given to the bots"""
+
+    def play(self, game_number: int, max_moves: int = 500) -> dict:
+        """plays one game between bots named first and second and returns its result"""
+        MOVES.clear()
+        with mock.patch.object(KubaTournament, "make_bot", make_recording_bot):
+            return KubaTournament.play_game((game_number, ("first", "second"), 0, 100, max_moves, "bitboard"))
+
+    def test_first_mover_alternates(self):
+        """bot 1 moves first in even games and bot 2 in odd games, and the bots then take turns"""
+        for game_number in range(4):
+            result = self.play(game_number, 6)
+            expected = ("first", "second") if game_number % 2 == 0 else ("second", "first")
+            self.assertEqual([bot_name for bot_name, player_name in MOVES], list(expected) * 3)
+            self.assertEqual(result["first"], game_number % 2)
+            self.assertEqual(MOVES[0][1], "A")
+
+    def test_winner_is_the_winning_bot(self):
+        """the winner of a finished game is the index of the bot that made the last move"""
+        for game_number in range(4):
+            result = self.play(game_number)
+            if result["winner"] != None:
+                self.assertEqual(result["winner"], ("first", "second").index(MOVES[-1][0]))
+
+    def test_summary(self):
+        """a tournament's wins add up to its finished games"""
+        results = KubaTournament.run_tournament("random", "random", 6, workers=1)
+        self.assertEqual([result["first"] for result in results], [0, 1, 0, 1, 0, 1])
+        summary = KubaTournament.summarize(results)
+        self.assertEqual(sum(summary["wins"]) + summary["unfinished"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()